@@ -0,0 +1,442 @@
+"""
+In-process assembler and linker for the assembly we emit (RV64IM + Zicsr, GNU syntax).
+assemble() turns text into relocatable Object, link() places objects like cpu_testbench/kernel.ld
+"""
+
+import re
+import struct
+from dataclasses import dataclass, field
+from typing import *
+
+from backend.asm.isa import REGS, CSRS, BRANCH_TYPE, encode, li_sequence, hi_lo, fits
+
+TEXT_BASE = 0x80000000
+NOP = 0x00000013
+
+# order of output sections, as in kernel.ld; not listed ones follow
+SECTION_ORDER = [".text", ".data", ".rodata", ".sdata", ".bss"]
+NOBITS = {".bss", ".sbss"}
+
+# placeholders in instruction templates, resolved at link time
+OFF, HI, LO = "OFF", "HI", "LO"
+
+LABEL = re.compile(r"^\s*([A-Za-z_.$][\w.$]*):")
+MEMORY_OPERAND = re.compile(r"^(-?\w*)\((\w+)\)$")
+
+
+@dataclass
+class Fixup:
+    """ reference to symbol, patched at link time """
+    offset: int
+    symbol: str
+    # instructions with OFF (pc-relative offset), HI/LO (parts of it), or None for absolute data
+    template: Optional[List[Tuple[str, Tuple]]] = None
+    size: int = 8  # of absolute data
+    addend: int = 0
+
+
+@dataclass
+class Section:
+    name: str
+    data: bytearray = field(default_factory=bytearray)
+    size: int = 0  # of NOBITS section
+    align: int = 1
+    fixups: List[Fixup] = field(default_factory=list)
+
+    @property
+    def nobits(self) -> bool:
+        return self.name in NOBITS
+
+    def __len__(self):
+        return self.size if self.nobits else len(self.data)
+
+
+@dataclass
+class Object:
+    sections: Dict[str, Section] = field(default_factory=dict)
+    symbols: Dict[str, Tuple[str, int]] = field(default_factory=dict)  # name -> (section, offset)
+    globals: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class Image:
+    """ linked program: output sections placed at absolute addresses """
+    entry: int
+    sections: List[Tuple[str, int, bytes, int]]  # (name, address, data, size)
+    symbols: Dict[str, int]
+    globals: Set[str]
+
+    def section_of(self, addr: int) -> Optional[str]:
+        for name, start, _, size in self.sections:
+            if start <= addr < start + size:
+                return name
+        # labels right after the last byte, e.g. stack_top
+        for name, start, _, size in self.sections:
+            if addr == start + size:
+                return name
+        return None
+
+
+def unescape(text: str) -> bytes:
+    """ contents of string literal with GNU as escapes """
+    res = bytearray()
+    i = 0
+    while i < len(text):
+        c = text[i]
+        i += 1
+        if c != "\\":
+            res += c.encode()
+            continue
+        c = text[i]
+        i += 1
+        if c in "01234567":
+            j = i
+            while j < len(text) and j < i + 2 and text[j] in "01234567":
+                j += 1
+            res.append(int(text[i - 1:j], 8) & 0xff)
+            i = j
+        elif c == "x":
+            j = i
+            while j < len(text) and text[j] in "0123456789abcdefABCDEF":
+                j += 1
+            res.append(int(text[i:j], 16) & 0xff)
+            i = j
+        else:
+            res.append({"n": 10, "t": 9, "r": 13, "b": 8, "f": 12, "v": 11, "a": 7}.get(c, ord(c)))
+    return bytes(res)
+
+
+def split_operands(text: str) -> List[str]:
+    return [i.strip() for i in text.split(",")] if text.strip() else []
+
+
+# branch with inverted condition, to skip over a long jump
+INVERTED = {"beq": "bne", "bne": "beq", "blt": "bge", "bge": "blt", "bltu": "bgeu", "bgeu": "bltu"}
+
+
+class Assembler:
+    def __init__(self, long_branches: Set[int] = frozenset()):
+        self.obj = Object()
+        self.section = self.switch(".text")
+        self.line = 0
+        # lines of conditional branches relaxed to inverted branch over 'jal'
+        self.long_branches = long_branches
+        # (line, section, fixup) of short branches, checked for reach after the pass
+        self.branches: List[Tuple[int, Section, Fixup]] = []
+
+    def err(self, *x):
+        raise Exception(f"asm line {self.line}: " + ' '.join(str(i) for i in x))
+
+    def switch(self, name: str) -> Section:
+        if (res := self.obj.sections.get(name)) is None:
+            res = self.obj.sections[name] = Section(name)
+        self.section = res
+        return res
+
+    """
+    Operands
+    """
+
+    def reg(self, x: str) -> int:
+        if (res := REGS.get(x)) is None:
+            self.err("invalid register", x)
+        return res
+
+    def imm(self, x: str) -> int:
+        try:
+            return int(x, 0)
+        except ValueError:
+            self.err("invalid immediate", x)
+
+    def csr(self, x: str) -> int:
+        return CSRS[x] if x in CSRS else self.imm(x)
+
+    def mem(self, x: str) -> Tuple[int, int]:
+        """ offset(reg) """
+        if (m := MEMORY_OPERAND.match(x)) is None:
+            self.err("invalid memory operand", x)
+        return self.imm(m.group(1) or "0"), self.reg(m.group(2))
+
+    """
+    Output
+    """
+
+    def emit_bytes(self, data: bytes):
+        if self.section.nobits:
+            if any(data):
+                self.err("data in", self.section.name)
+            self.section.size += len(data)
+        else:
+            self.section.data += data
+
+    def emit_word(self, word: int):
+        self.emit_bytes(struct.pack("<I", word))
+
+    def emit_real(self, mnemonic: str, args: Tuple):
+        try:
+            self.emit_word(encode(mnemonic, args))
+        except Exception as e:
+            self.err(e)
+
+    def emit_ref(self, symbol: str, template: List[Tuple[str, Tuple]]):
+        """ pc-relative reference: placeholders are zeros until link """
+        self.section.fixups.append(Fixup(len(self.section), symbol, template))
+        for mnemonic, args in template:
+            self.emit_real(mnemonic, tuple(0 if i in (OFF, HI, LO) else i for i in args))
+
+    def branch(self, mnemonic: str, rs1: int, rs2: int, symbol: str):
+        if self.line in self.long_branches:
+            self.emit_real(INVERTED[mnemonic], (rs1, rs2, 8))
+            self.emit_ref(symbol, [("jal", (0, OFF))])
+            return
+        self.emit_ref(symbol, [(mnemonic, (rs1, rs2, OFF))])
+        self.branches.append((self.line, self.section, self.section.fixups[-1]))
+
+    def out_of_reach(self) -> Set[int]:
+        """ lines of branches to labels of the same section that do not fit 13-bit offset """
+        res = set()
+        for line, section, fix in self.branches:
+            target = self.obj.symbols.get(fix.symbol)
+            if target is not None and target[0] == section.name and not fits(target[1] - fix.offset, 13):
+                res.add(line)
+        return res
+
+    def align(self, n: int):
+        self.section.align = max(self.section.align, n)
+        pad = -len(self.section) % n
+        if self.section.name == ".text" and pad % 4 == 0:
+            for _ in range(pad // 4):
+                self.emit_word(NOP)
+        else:
+            self.emit_bytes(bytes(pad))
+
+    """
+    Statements
+    """
+
+    def directive(self, name: str, rest: str):
+        ops = split_operands(rest)
+        match name:
+            case ".section":
+                self.switch(ops[0])
+            case ".text" | ".data" | ".bss" | ".rodata":
+                self.switch(name)
+            case ".global" | ".globl":
+                self.obj.globals.update(ops)
+            case ".align" | ".p2align":
+                self.align(1 << self.imm(ops[0]))
+            case ".balign":
+                self.align(self.imm(ops[0]))
+            case ".space" | ".zero" | ".skip":
+                self.emit_bytes(bytes(self.imm(ops[0])))
+            case ".string" | ".asciz" | ".ascii":
+                if (m := re.fullmatch(r'"(.*)"', rest.strip())) is None:
+                    self.err("invalid string", rest)
+                self.emit_bytes(unescape(m.group(1)) + (b"" if name == ".ascii" else b"\0"))
+            case ".byte" | ".half" | ".short" | ".word" | ".long" | ".quad" | ".dword" | ".8byte":
+                size = {".byte": 1, ".half": 2, ".short": 2, ".word": 4, ".long": 4}.get(name, 8)
+                for op in ops:
+                    self.data_value(op, size)
+            case ".type" | ".size" | ".file" | ".option" | ".attribute" | ".ident":
+                pass
+            case _:
+                self.err("unknown directive", name)
+
+    def data_value(self, op: str, size: int):
+        try:
+            value = int(op, 0)
+        except ValueError:
+            self.section.fixups.append(Fixup(len(self.section), op, None, size))
+            value = 0
+        self.emit_bytes((value & ((1 << 8 * size) - 1)).to_bytes(size, "little"))
+
+    def instruction(self, m: str, ops: List[str]):
+        reg, imm = self.reg, self.imm
+        # pseudo-instructions first, then real ones by operand shape
+        match m, ops:
+            case "nop", []:
+                self.emit_real("addi", (0, 0, 0))
+            case "li", [rd, value]:
+                for i in li_sequence(reg(rd), imm(value)):
+                    self.emit_real(*i)
+            case "la" | "lla", [rd, symbol]:
+                rd = reg(rd)
+                self.emit_ref(symbol, [("auipc", (rd, HI)), ("addi", (rd, rd, LO))])
+            case "call", [symbol]:
+                self.emit_ref(symbol, [("auipc", (1, HI)), ("jalr", (1, 1, LO))])
+            case "tail", [symbol]:
+                self.emit_ref(symbol, [("auipc", (6, HI)), ("jalr", (0, 6, LO))])
+            case "j", [symbol]:
+                self.emit_ref(symbol, [("jal", (0, OFF))])
+            case "jal", [symbol]:
+                self.emit_ref(symbol, [("jal", (1, OFF))])
+            case "jal", [rd, symbol]:
+                self.emit_ref(symbol, [("jal", (reg(rd), OFF))])
+            case "jr", [rs]:
+                self.emit_real("jalr", (0, reg(rs), 0))
+            case "jalr", [rs]:
+                self.emit_real("jalr", (1, reg(rs), 0))
+            case "jalr", [rd, operand] if "(" in operand:
+                off, rs = self.mem(operand)
+                self.emit_real("jalr", (reg(rd), rs, off))
+            case "ret", []:
+                self.emit_real("jalr", (0, 1, 0))
+            case "mv", [rd, rs]:
+                self.emit_real("addi", (reg(rd), reg(rs), 0))
+            case "not", [rd, rs]:
+                self.emit_real("xori", (reg(rd), reg(rs), -1))
+            case "neg", [rd, rs]:
+                self.emit_real("sub", (reg(rd), 0, reg(rs)))
+            case "negw", [rd, rs]:
+                self.emit_real("subw", (reg(rd), 0, reg(rs)))
+            case "sext.w", [rd, rs]:
+                self.emit_real("addiw", (reg(rd), reg(rs), 0))
+            case "seqz", [rd, rs]:
+                self.emit_real("sltiu", (reg(rd), reg(rs), 1))
+            case "snez", [rd, rs]:
+                self.emit_real("sltu", (reg(rd), 0, reg(rs)))
+            case "sltz", [rd, rs]:
+                self.emit_real("slt", (reg(rd), reg(rs), 0))
+            case "sgtz", [rd, rs]:
+                self.emit_real("slt", (reg(rd), 0, reg(rs)))
+            case "sgt" | "sgtu", [rd, rs1, rs2]:
+                self.emit_real(m.replace("sgt", "slt"), (reg(rd), reg(rs2), reg(rs1)))
+            case "beqz" | "bnez" | "bltz" | "bgez", [rs, symbol]:
+                self.branch("b" + m[1:3], reg(rs), 0, symbol)
+            case "blez" | "bgtz", [rs, symbol]:
+                self.branch({"blez": "bge", "bgtz": "blt"}[m], 0, reg(rs), symbol)
+            case "bgt" | "ble" | "bgtu" | "bleu", [rs1, rs2, symbol]:
+                real = {"bgt": "blt", "ble": "bge", "bgtu": "bltu", "bleu": "bgeu"}[m]
+                self.branch(real, reg(rs2), reg(rs1), symbol)
+            case _, [rs1, rs2, symbol] if m in BRANCH_TYPE:
+                self.branch(m, reg(rs1), reg(rs2), symbol)
+            case "csrr", [rd, csr]:
+                self.emit_real("csrrs", (reg(rd), self.csr(csr), 0))
+            case "csrw" | "csrs" | "csrc", [csr, rs]:
+                self.emit_real("csrr" + m[3], (0, self.csr(csr), reg(rs)))
+            case "csrwi" | "csrsi" | "csrci", [csr, value]:
+                self.emit_real("csrr" + m[3] + "i", (0, self.csr(csr), imm(value)))
+            case "csrrw" | "csrrs" | "csrrc", [rd, csr, rs]:
+                self.emit_real(m, (reg(rd), self.csr(csr), reg(rs)))
+            case "lui" | "auipc", [rd, value]:
+                self.emit_real(m, (reg(rd), imm(value)))
+            case _, [r1, operand] if "(" in operand:
+                # loads and stores: first register is destination of load, source of store
+                off, base = self.mem(operand)
+                self.emit_real(m, (reg(r1), base, off))
+            case _, [rd, rs1, rs2] if rs2 in REGS:
+                self.emit_real(m, (reg(rd), reg(rs1), reg(rs2)))
+            case _, [rd, rs1, value]:
+                self.emit_real(m, (reg(rd), reg(rs1), imm(value)))
+            case _, []:
+                self.emit_real(m, ())
+            case _:
+                self.err("invalid instruction", m, ", ".join(ops))
+
+    def statement(self, text: str):
+        text = text.split("#", 1)[0].strip() if '"' not in text else text.strip()
+        while (m := LABEL.match(text)) is not None:
+            name = m.group(1)
+            if name in self.obj.symbols:
+                self.err("symbol", name, "already defined")
+            self.obj.symbols[name] = (self.section.name, len(self.section))
+            text = text[m.end():].strip()
+        if not text:
+            return
+        name, _, rest = text.replace("\t", " ").partition(" ")
+        if name.startswith("."):
+            self.directive(name, rest)
+        else:
+            self.instruction(name, split_operands(rest))
+
+    def __call__(self, text: str) -> Object:
+        for self.line, line in enumerate(text.splitlines(), 1):
+            self.statement(line)
+        return self.obj
+
+
+def assemble(text: str) -> Object:
+    """
+    branches to labels of the same section that are out of reach are relaxed, as GNU as does:
+    reassemble with them expanded until every remaining one fits (expansions only grow code)
+    """
+    long_branches = set()
+    while True:
+        asm = Assembler(long_branches)
+        obj = asm(text)
+        if not (more := asm.out_of_reach()):
+            return obj
+        long_branches |= more
+
+
+def link(objects: List[Object], base: int = TEXT_BASE, entry: str = "_start") -> Image:
+    """
+    place sections of all objects in kernel.ld order starting at 'base' and patch references.
+    symbols are looked up in the referencing object first, then among globals of all objects
+    """
+    names = [i for i in SECTION_ORDER if any(i in o.sections for o in objects)]
+    names += sorted({i for o in objects for i in o.sections} - set(names))
+
+    # layout: address of each input section
+    placed: Dict[Tuple[int, str], int] = {}
+    output = []
+    addr = base
+    for name in names:
+        parts = [(n, o.sections[name]) for n, o in enumerate(objects) if name in o.sections]
+        addr += -addr % max(s.align for _, s in parts)
+        start = addr
+        data = bytearray()
+        for n, s in parts:
+            addr += -addr % s.align
+            if not s.nobits:
+                data += bytes(addr - start - len(data))
+                data += s.data
+            placed[n, name] = addr
+            addr += len(s)
+        output.append([name, start, data, addr - start])
+
+    local_syms = [{k: placed[n, sec] + off for k, (sec, off) in o.symbols.items()} for n, o in enumerate(objects)]
+    global_syms = {}
+    for n, o in enumerate(objects):
+        for name in o.globals & o.symbols.keys():
+            if name in global_syms:
+                raise Exception(f"link: symbol {name} defined more than once")
+            global_syms[name] = local_syms[n][name]
+
+    def resolve(n: int, symbol: str) -> int:
+        if (res := local_syms[n].get(symbol, global_syms.get(symbol))) is None:
+            raise Exception(f"link: undefined symbol {symbol}")
+        return res
+
+    by_name = {i[0]: i for i in output}
+    for n, o in enumerate(objects):
+        for name, s in o.sections.items():
+            out_name, out_start, data, _ = by_name[name]
+            at = placed[n, name]
+            for fix in s.fixups:
+                pos = at - out_start + fix.offset
+                target = resolve(n, fix.symbol) + fix.addend
+                if fix.template is None:
+                    data[pos:pos + fix.size] = (target & ((1 << 8 * fix.size) - 1)).to_bytes(fix.size, "little")
+                    continue
+                offset = target - (at + fix.offset)
+                if not fits(offset, 32):
+                    raise Exception(f"link: {fix.symbol} is out of reach")
+                hi, lo = hi_lo(offset)
+                values = {OFF: offset, HI: hi, LO: lo}
+                for k, (mnemonic, args) in enumerate(fix.template):
+                    try:
+                        word = encode(mnemonic, tuple(values.get(i, i) if isinstance(i, str) else i for i in args))
+                    except Exception as e:
+                        raise Exception(f"link: reference to {fix.symbol}: {e}")
+                    data[pos + 4 * k:pos + 4 * k + 4] = struct.pack("<I", word)
+
+    symbols = {**{k: v for syms in local_syms for k, v in syms.items()}, **global_syms}
+    if entry not in global_syms and entry not in symbols:
+        raise Exception(f"link: entry {entry} not found")
+    return Image(
+        symbols.get(entry),
+        [(name, start, bytes(data), size) for name, start, data, size in output],
+        symbols,
+        set(global_syms),
+    )
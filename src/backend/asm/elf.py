@@ -0,0 +1,106 @@
+""" Static ELF64 executable for RISC-V from linked Image """
+
+import struct
+from typing import *
+
+from backend.asm.assembler import Image
+
+EM_RISCV = 243
+PT_LOAD = 1
+PF_X, PF_W, PF_R = 1, 2, 4
+SHT_PROGBITS, SHT_SYMTAB, SHT_STRTAB, SHT_NOBITS = 1, 2, 3, 8
+SHF_WRITE, SHF_ALLOC, SHF_EXECINSTR = 1, 2, 4
+STB_LOCAL, STB_GLOBAL = 0, 1
+STT_NOTYPE = 0
+
+EHDR_SIZE, PHDR_SIZE, SHDR_SIZE, SYM_SIZE = 64, 56, 64, 24
+PAGE = 0x1000
+
+
+class StringTable:
+    def __init__(self):
+        self.data = bytearray(b"\0")
+        self.index: Dict[str, int] = {}
+
+    def __call__(self, s: str) -> int:
+        if (res := self.index.get(s)) is None:
+            res = self.index[s] = len(self.data)
+            self.data += s.encode() + b"\0"
+        return res
+
+
+def elf_bytes(image: Image) -> bytes:
+    """ one PT_LOAD segment per output section, plus section headers and symbols for tools """
+    sections = [i for i in image.sections if i[3] > 0]
+    nobits = [name in (".bss", ".sbss") for name, *_ in sections]
+
+    # file layout: headers, section contents (offset congruent to address modulo page), tables
+    offset = EHDR_SIZE + PHDR_SIZE * len(sections)
+    offsets = []
+    for (name, addr, data, size), nb in zip(sections, nobits):
+        offset += (addr - offset) % PAGE
+        offsets.append(offset)
+        if not nb:
+            offset += len(data)
+
+    shstr, strtab = StringTable(), StringTable()
+    symtab = bytearray(SYM_SIZE)
+    ordered = sorted(image.symbols.items(), key=lambda i: (i[0] in image.globals, i[1]))
+    first_global = 1 + sum(name not in image.globals for name, _ in ordered)
+    for name, addr in ordered:
+        sec = image.section_of(addr)
+        shndx = 1 + [i[0] for i in sections].index(sec) if sec in [i[0] for i in sections] else 0xfff1
+        bind = STB_GLOBAL if name in image.globals else STB_LOCAL
+        symtab += struct.pack("<IBBHQQ", strtab(name), (bind << 4) | STT_NOTYPE, 0, shndx, addr, 0)
+
+    tables = []
+    for data in (symtab, strtab.data):
+        offset += -offset % 8
+        tables.append(offset)
+        offset += len(data)
+    shnames = [shstr(i[0]) for i in sections] + [shstr(".symtab"), shstr(".strtab"), shstr(".shstrtab")]
+    offset += -offset % 8
+    shstr_offset = offset
+    offset += len(shstr.data)
+    offset += -offset % 8
+    shoff = offset
+    shnum = 1 + len(sections) + 3
+
+    out = bytearray(shoff + SHDR_SIZE * shnum)
+    struct.pack_into(
+        "<4sBBBBB7xHHIQQQIHHHHHH", out, 0,
+        b"\x7fELF", 2, 1, 1, 0, 0,  # 64-bit, little endian, version, System V ABI
+        2, EM_RISCV, 1, image.entry, EHDR_SIZE, shoff,
+        0,  # flags: soft-float ABI, no compressed instructions
+        EHDR_SIZE, PHDR_SIZE, len(sections), SHDR_SIZE, shnum, shnum - 1,
+    )
+
+    for n, ((name, addr, data, size), nb, off) in enumerate(zip(sections, nobits, offsets)):
+        flags = PF_R | (PF_X if name == ".text" else PF_W)
+        filesz = 0 if nb else len(data)
+        struct.pack_into("<IIQQQQQQ", out, EHDR_SIZE + PHDR_SIZE * n, PT_LOAD, flags, off, addr, addr, filesz, size, PAGE)
+        if not nb:
+            out[off:off + len(data)] = data
+
+    out[tables[0]:tables[0] + len(symtab)] = symtab
+    out[tables[1]:tables[1] + len(strtab.data)] = strtab.data
+    out[shstr_offset:shstr_offset + len(shstr.data)] = shstr.data
+
+    def shdr(i, name, typ, flags, addr, off, size, link=0, info=0, align=1, entsize=0):
+        struct.pack_into("<IIQQQQIIQQ", out, shoff + SHDR_SIZE * i, name, typ, flags, addr, off, size, link, info,
+                         align, entsize)
+
+    for n, ((name, addr, data, size), nb, off) in enumerate(zip(sections, nobits, offsets)):
+        flags = SHF_ALLOC | (SHF_EXECINSTR if name == ".text" else SHF_WRITE)
+        shdr(n + 1, shnames[n], SHT_NOBITS if nb else SHT_PROGBITS, flags, addr, off, size, align=4)
+    k = len(sections) + 1
+    shdr(k, shnames[-3], SHT_SYMTAB, 0, 0, tables[0], len(symtab), link=k + 1, info=first_global, align=8,
+         entsize=SYM_SIZE)
+    shdr(k + 1, shnames[-2], SHT_STRTAB, 0, 0, tables[1], len(strtab.data))
+    shdr(k + 2, shnames[-1], SHT_STRTAB, 0, 0, shstr_offset, len(shstr.data))
+    return bytes(out)
+
+
+def write_elf(image: Image, path: str):
+    with open(path, "wb") as f:
+        f.write(elf_bytes(image))
@@ -0,0 +1,157 @@
+""" RV64IM + Zicsr instruction encoding """
+
+from typing import *
+
+REGS: Dict[str, int] = {
+    "zero": 0, "ra": 1, "sp": 2, "gp": 3, "tp": 4, "t0": 5, "t1": 6, "t2": 7,
+    "s0": 8, "fp": 8, "s1": 9,
+    **{f"a{i}": 10 + i for i in range(8)},
+    **{f"s{i}": 16 + i for i in range(2, 12)},
+    **{f"t{i}": 25 + i for i in range(3, 7)},
+    **{f"x{i}": i for i in range(32)},
+}
+
+CSRS: Dict[str, int] = {
+    "mstatus": 0x300, "misa": 0x301, "mie": 0x304, "mtvec": 0x305,
+    "mscratch": 0x340, "mepc": 0x341, "mcause": 0x342, "mtval": 0x343, "mip": 0x344,
+    "mcycle": 0xb00, "minstret": 0xb02,
+    "cycle": 0xc00, "time": 0xc01, "instret": 0xc02,
+    "mvendorid": 0xf11, "marchid": 0xf12, "mimpid": 0xf13, "mhartid": 0xf14,
+}
+
+# mnemonic -> (opcode, funct3, funct7)
+R_TYPE = {
+    "add": (0x33, 0, 0x00), "sub": (0x33, 0, 0x20), "sll": (0x33, 1, 0x00), "slt": (0x33, 2, 0x00),
+    "sltu": (0x33, 3, 0x00), "xor": (0x33, 4, 0x00), "srl": (0x33, 5, 0x00), "sra": (0x33, 5, 0x20),
+    "or": (0x33, 6, 0x00), "and": (0x33, 7, 0x00),
+    "mul": (0x33, 0, 0x01), "mulh": (0x33, 1, 0x01), "mulhsu": (0x33, 2, 0x01), "mulhu": (0x33, 3, 0x01),
+    "div": (0x33, 4, 0x01), "divu": (0x33, 5, 0x01), "rem": (0x33, 6, 0x01), "remu": (0x33, 7, 0x01),
+    "addw": (0x3b, 0, 0x00), "subw": (0x3b, 0, 0x20), "sllw": (0x3b, 1, 0x00), "srlw": (0x3b, 5, 0x00),
+    "sraw": (0x3b, 5, 0x20), "mulw": (0x3b, 0, 0x01), "divw": (0x3b, 4, 0x01), "divuw": (0x3b, 5, 0x01),
+    "remw": (0x3b, 6, 0x01), "remuw": (0x3b, 7, 0x01),
+}
+I_TYPE = {
+    "addi": (0x13, 0), "slti": (0x13, 2), "sltiu": (0x13, 3), "xori": (0x13, 4), "ori": (0x13, 6),
+    "andi": (0x13, 7), "addiw": (0x1b, 0), "jalr": (0x67, 0),
+}
+SHIFT_TYPE = {
+    # funct6 in upper bits of immediate, 6-bit shamt (5-bit for *w)
+    "slli": (0x13, 1, 0x00, 63), "srli": (0x13, 5, 0x00, 63), "srai": (0x13, 5, 0x10 << 6, 63),
+    "slliw": (0x1b, 1, 0x00, 31), "srliw": (0x1b, 5, 0x00, 31), "sraiw": (0x1b, 5, 0x20 << 5, 31),
+}
+LOAD_TYPE = {"lb": 0, "lh": 1, "lw": 2, "ld": 3, "lbu": 4, "lhu": 5, "lwu": 6}
+STORE_TYPE = {"sb": 0, "sh": 1, "sw": 2, "sd": 3}
+BRANCH_TYPE = {"beq": 0, "bne": 1, "blt": 4, "bge": 5, "bltu": 6, "bgeu": 7}
+CSR_TYPE = {"csrrw": 1, "csrrs": 2, "csrrc": 3, "csrrwi": 5, "csrrsi": 6, "csrrci": 7}
+U_TYPE = {"lui": 0x37, "auipc": 0x17}
+SYSTEM = {"ecall": 0x00000073, "ebreak": 0x00100073, "mret": 0x30200073, "wfi": 0x10500073, "fence": 0x0ff0000f}
+
+
+def fits(value: int, bits: int) -> bool:
+    """ value fits into signed immediate of 'bits' bits """
+    return -(1 << (bits - 1)) <= value < (1 << (bits - 1))
+
+
+def sext(value: int, bits: int) -> int:
+    value &= (1 << bits) - 1
+    return value - (1 << bits) if value >> (bits - 1) else value
+
+
+def hi_lo(offset: int) -> Tuple[int, int]:
+    """ split offset for lui/auipc + 12-bit signed immediate """
+    lo = sext(offset, 12)
+    return ((offset - lo) >> 12) & 0xfffff, lo
+
+
+def check(value: int, bits: int, what: str, align: int = 1):
+    if not fits(value, bits):
+        raise Exception(f"{what} {value} out of range")
+    if value % align:
+        raise Exception(f"{what} {value} is not aligned to {align}")
+
+
+def enc_r(opcode: int, f3: int, f7: int, rd: int, rs1: int, rs2: int) -> int:
+    return (f7 << 25) | (rs2 << 20) | (rs1 << 15) | (f3 << 12) | (rd << 7) | opcode
+
+
+def enc_i(opcode: int, f3: int, rd: int, rs1: int, imm: int) -> int:
+    check(imm, 12, "immediate")
+    return ((imm & 0xfff) << 20) | (rs1 << 15) | (f3 << 12) | (rd << 7) | opcode
+
+
+def enc_s(opcode: int, f3: int, rs1: int, rs2: int, imm: int) -> int:
+    check(imm, 12, "offset")
+    imm &= 0xfff
+    return ((imm >> 5) << 25) | (rs2 << 20) | (rs1 << 15) | (f3 << 12) | ((imm & 0x1f) << 7) | opcode
+
+
+def enc_b(f3: int, rs1: int, rs2: int, offset: int) -> int:
+    check(offset, 13, "branch offset", 2)
+    o = offset & 0x1fff
+    return (((o >> 12) & 1) << 31) | (((o >> 5) & 0x3f) << 25) | (rs2 << 20) | (rs1 << 15) | (f3 << 12) \
+        | (((o >> 1) & 0xf) << 8) | (((o >> 11) & 1) << 7) | 0x63
+
+
+def enc_u(opcode: int, rd: int, imm20: int) -> int:
+    return ((imm20 & 0xfffff) << 12) | (rd << 7) | opcode
+
+
+def enc_j(rd: int, offset: int) -> int:
+    check(offset, 21, "jump offset", 2)
+    o = offset & 0x1fffff
+    return (((o >> 20) & 1) << 31) | (((o >> 1) & 0x3ff) << 21) | (((o >> 11) & 1) << 20) \
+        | (((o >> 12) & 0xff) << 12) | (rd << 7) | 0x6f
+
+
+def li_sequence(rd: int, value: int) -> List[Tuple[str, Tuple]]:
+    """ expansion of 'li' into real instructions: lui/addiw for 32-bit values, shifted parts for wider ones """
+    value = sext(value, 64)
+    if fits(value, 12):
+        return [("addi", (rd, 0, value))]
+    if fits(value, 32):
+        hi, lo = hi_lo(value)
+        res = [("lui", (rd, hi))]
+        if lo:
+            res.append(("addiw", (rd, rd, lo)))
+        return res
+    lo = sext(value, 12)
+    hi = (value - lo) >> 12
+    shift = 12
+    while hi & 1 == 0:
+        hi >>= 1
+        shift += 1
+    res = li_sequence(rd, hi) + [("slli", (rd, rd, shift))]
+    if lo:
+        res.append(("addi", (rd, rd, lo)))
+    return res
+
+
+def encode(mnemonic: str, args: Tuple) -> int:
+    """ encode real instruction with resolved operands (register numbers, immediates, pc-relative offsets) """
+    if (e := R_TYPE.get(mnemonic)) is not None:
+        return enc_r(e[0], e[1], e[2], *args)
+    if (e := I_TYPE.get(mnemonic)) is not None:
+        return enc_i(e[0], e[1], *args)
+    if (e := SHIFT_TYPE.get(mnemonic)) is not None:
+        rd, rs1, shamt = args
+        if not 0 <= shamt <= e[3]:
+            raise Exception(f"shift amount {shamt} out of range")
+        return enc_i(e[0], e[1], rd, rs1, 0) | ((e[2] | shamt) << 20)
+    if (f3 := LOAD_TYPE.get(mnemonic)) is not None:
+        rd, rs1, imm = args
+        return enc_i(0x03, f3, rd, rs1, imm)
+    if (f3 := STORE_TYPE.get(mnemonic)) is not None:
+        rs2, rs1, imm = args
+        return enc_s(0x23, f3, rs1, rs2, imm)
+    if (f3 := BRANCH_TYPE.get(mnemonic)) is not None:
+        return enc_b(f3, *args)
+    if (f3 := CSR_TYPE.get(mnemonic)) is not None:
+        rd, csr, rs1 = args
+        return ((csr & 0xfff) << 20) | (rs1 << 15) | (f3 << 12) | (rd << 7) | 0x73
+    if (opcode := U_TYPE.get(mnemonic)) is not None:
+        return enc_u(opcode, *args)
+    if mnemonic == "jal":
+        return enc_j(*args)
+    if (word := SYSTEM.get(mnemonic)) is not None:
+        return word
+    raise Exception(f"unknown instruction {mnemonic}")
@@ -0,0 +1,523 @@
+"""
+In-process RV64IM + Zicsr simulator for programs we emit, a fast replacement of
+'qemu-system-riscv64 -machine sifive_u' for tests and benchmarks.
+
+Straight-line code is translated on first execution into Python functions (one per basic block)
+that execute its instructions and return next pc; the main loop only dispatches blocks.
+Translations are cached by instruction words, so the runtime and repeated sequences are compiled
+once per process. Memory is the linked image (plus bss and stack) in one bytearray,
+the UART TX register of cpu_testbench/stdlib.c at 0x10010000 is the only device.
+The run stops when main returns (jump to address 0), on 'j .' (the halt loop) or on wfi.
+
+Counters are exact: retired instructions (also seen by the program via instret/cycle CSRs,
+one cycle per instruction as with 'qemu -icount shift=0'), loads, stores, taken conditional branches.
+Stores into text are not seen by already translated code.
+"""
+
+import struct
+from dataclasses import dataclass, field
+from functools import cache
+from typing import *
+
+from backend.asm.assembler import Image, Object, assemble, link, NOBITS
+from backend.asm.isa import R_TYPE, I_TYPE, SHIFT_TYPE, LOAD_TYPE, STORE_TYPE, BRANCH_TYPE, CSR_TYPE, CSRS, sext
+
+UART_BASE = 0x10010000
+UART_TXFIFO = UART_BASE + 0
+
+M = (1 << 64) - 1
+W = (1 << 32) - 1
+
+# instruction budget of a run, like a wall-clock timeout for QEMU
+DEFAULT_LIMIT = 100_000_000
+# instructions between budget checks
+CHUNK = 1 << 16
+
+
+class SimError(Exception):
+    pass
+
+
+class _Stop(Exception):
+    """ raised by handlers: program finished (main returned or halted) """
+    pass
+
+
+class _Csr(Exception):
+    """ raised by handlers of csr instructions: instret/cycle are only known to the main loop """
+
+    def __init__(self, mnemonic: str, rd: int, csr: int, src: int):
+        self.mnemonic, self.rd, self.csr, self.src = mnemonic, rd, csr, src
+
+
+@dataclass
+class SimResult:
+    output: str = ""
+    instret: int = 0
+    loads: int = 0
+    stores: int = 0
+    branches: int = 0  # taken conditional branches
+    error: Optional[str] = None  # fault or exhausted budget; output so far is kept
+    # (instret, loads, stores, branches) at each read of a counter csr, to measure parts of a program
+    marks: List[Tuple[int, int, int, int]] = field(default_factory=list)
+
+    @property
+    def cycles(self) -> int:
+        return self.instret
+
+
+def s64(v: int) -> int:
+    return v - ((v >> 63) << 64)
+
+
+def s32(v: int) -> int:
+    v &= W
+    return v - ((v >> 31) << 32)
+
+
+def _div(a: int, b: int) -> int:
+    if b == 0:
+        return -1
+    q = abs(a) // abs(b)
+    return -q if (a < 0) != (b < 0) else q
+
+
+def _rem(a: int, b: int) -> int:
+    if b == 0:
+        return a
+    return a - b * _div(a, b)
+
+
+# value of rd for R-type ops on unsigned 64-bit operands, result is masked by the caller
+R_OPS: Dict[str, Callable[[int, int], int]] = {
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "sll": lambda a, b: a << (b & 63),
+    "slt": lambda a, b: int(s64(a) < s64(b)),
+    "sltu": lambda a, b: int(a < b),
+    "xor": lambda a, b: a ^ b,
+    "srl": lambda a, b: a >> (b & 63),
+    "sra": lambda a, b: s64(a) >> (b & 63),
+    "or": lambda a, b: a | b,
+    "and": lambda a, b: a & b,
+    "mul": lambda a, b: a * b,
+    "mulh": lambda a, b: (s64(a) * s64(b)) >> 64,
+    "mulhsu": lambda a, b: (s64(a) * b) >> 64,
+    "mulhu": lambda a, b: (a * b) >> 64,
+    "div": lambda a, b: _div(s64(a), s64(b)) if (a, b) != (1 << 63, M) else a,
+    "divu": lambda a, b: a // b if b else M,
+    "rem": lambda a, b: _rem(s64(a), s64(b)) if (a, b) != (1 << 63, M) else 0,
+    "remu": lambda a, b: a % b if b else a,
+    "addw": lambda a, b: s32(a + b),
+    "subw": lambda a, b: s32(a - b),
+    "sllw": lambda a, b: s32(a << (b & 31)),
+    "srlw": lambda a, b: s32((a & W) >> (b & 31)),
+    "sraw": lambda a, b: s32(a) >> (b & 31),
+    "mulw": lambda a, b: s32(a * b),
+    "divw": lambda a, b: s32(_div(s32(a), s32(b))) if (s32(a), s32(b)) != (-1 << 31, -1) else s32(a),
+    "divuw": lambda a, b: s32((a & W) // (b & W)) if b & W else M,
+    "remw": lambda a, b: s32(_rem(s32(a), s32(b))) if (s32(a), s32(b)) != (-1 << 31, -1) else 0,
+    "remuw": lambda a, b: s32((a & W) % (b & W)) if b & W else s32(a),
+}
+
+# I-type ops on unsigned operand and sign-extended immediate
+I_OPS: Dict[str, Callable[[int, int], int]] = {
+    "slti": lambda a, i: int(s64(a) < i),
+    "sltiu": lambda a, i: int(a < (i & M)),
+    "xori": lambda a, i: a ^ i,
+    "ori": lambda a, i: a | i,
+    "andi": lambda a, i: a & i,
+    "addiw": lambda a, i: s32(a + i),
+    "slli": lambda a, i: a << i,
+    "srli": lambda a, i: a >> i,
+    "srai": lambda a, i: s64(a) >> i,
+    "slliw": lambda a, i: s32(a << i),
+    "srliw": lambda a, i: s32((a & W) >> i),
+    "sraiw": lambda a, i: s32(a) >> i,
+}
+
+# struct formats of loads/stores, values of registers are kept unsigned
+LOADS = {"lb": "<b", "lh": "<h", "lw": "<i", "ld": "<Q", "lbu": "<B", "lhu": "<H", "lwu": "<I"}
+STORES = {"sb": ("<B", 0xff), "sh": ("<H", 0xffff), "sw": ("<I", W), "sd": ("<Q", M)}
+# signed compare as unsigned compare of operands with flipped sign bit
+SIGN = 1 << 63
+BRANCHES = {
+    "beq": "{a} == {b}", "bne": "{a} != {b}",
+    "blt": "{a} ^ SIGN < {b} ^ SIGN", "bge": "{a} ^ SIGN >= {b} ^ SIGN",
+    "bltu": "{a} < {b}", "bgeu": "{a} >= {b}",
+}
+# expressions of rd value for common ops, others call R_OPS/I_OPS
+R_INLINE = {
+    "add": "({a} + {b}) & M", "sub": "({a} - {b}) & M", "mul": "({a} * {b}) & M",
+    "and": "{a} & {b}", "or": "{a} | {b}", "xor": "{a} ^ {b}",
+    "sltu": "int({a} < {b})", "slt": "int({a} ^ SIGN < {b} ^ SIGN)",
+    "sll": "({a} << ({b} & 63)) & M", "srl": "{a} >> ({b} & 63)",
+}
+I_INLINE = {
+    "addi": "({a} + {i}) & M", "andi": "{a} & {u}", "ori": "{a} | {u}", "xori": "{a} ^ {u}",
+    "slli": "({a} << {i}) & M", "srli": "{a} >> {i}", "sltiu": "int({a} < {u})",
+}
+
+# longest translated block
+MAX_BLOCK = 64
+
+# namespace of translated blocks
+BLOCK_GLOBALS = {
+    "M": M, "SIGN": SIGN, "s64": s64, "s32": s32, "Stop": _Stop, "SimError": SimError,
+    **{f"R_{k}": v for k, v in R_OPS.items()},
+    **{f"I_{k}": v for k, v in I_OPS.items()},
+    **{f"LD_{k}": struct.Struct(v).unpack_from for k, v in LOADS.items()},
+    **{f"ST_{k}": struct.Struct(v).pack_into for k, (v, _) in STORES.items()},
+}
+
+_R = {(op, f3, f7): m for m, (op, f3, f7) in R_TYPE.items()}
+_I = {(op, f3): m for m, (op, f3) in I_TYPE.items()}
+_SHIFT = {(op, f3, f6 >> 6 if op == 0x13 else f6 >> 5): m for m, (op, f3, f6, _) in SHIFT_TYPE.items()}
+_LOAD = {f3: m for m, f3 in LOAD_TYPE.items()}
+_STORE = {f3: m for m, f3 in STORE_TYPE.items()}
+_BRANCH = {f3: m for m, f3 in BRANCH_TYPE.items()}
+_CSR = {f3: m for m, f3 in CSR_TYPE.items()}
+
+
+def decode(word: int) -> Tuple[str, Tuple]:
+    """ instruction word -> (mnemonic, operands) in the operand order of isa.encode() """
+    opcode = word & 0x7f
+    rd, f3, rs1, rs2, f7 = (word >> 7) & 31, (word >> 12) & 7, (word >> 15) & 31, (word >> 20) & 31, word >> 25
+    imm_i = sext(word >> 20, 12)
+    if opcode in (0x33, 0x3b):
+        if (m := _R.get((opcode, f3, f7))) is not None:
+            return m, (rd, rs1, rs2)
+    elif opcode in (0x13, 0x1b):
+        if f3 in (1, 5):
+            shamt = (word >> 20) & (63 if opcode == 0x13 else 31)
+            funct = word >> 26 if opcode == 0x13 else word >> 25
+            if (m := _SHIFT.get((opcode, f3, funct))) is not None:
+                return m, (rd, rs1, shamt)
+        elif (m := _I.get((opcode, f3))) is not None:
+            return m, (rd, rs1, imm_i)
+    elif opcode == 0x67 and f3 == 0:
+        return "jalr", (rd, rs1, imm_i)
+    elif opcode == 0x03 and f3 in _LOAD:
+        return _LOAD[f3], (rd, rs1, imm_i)
+    elif opcode == 0x23 and f3 in _STORE:
+        return _STORE[f3], (rs2, rs1, sext((f7 << 5) | rd, 12))
+    elif opcode == 0x63 and f3 in _BRANCH:
+        offset = ((word >> 31) << 12) | (((word >> 7) & 1) << 11) | (((word >> 25) & 0x3f) << 5) \
+                 | (((word >> 8) & 0xf) << 1)
+        return _BRANCH[f3], (rs1, rs2, sext(offset, 13))
+    elif opcode == 0x6f:
+        offset = ((word >> 31) << 20) | (((word >> 12) & 0xff) << 12) | (((word >> 20) & 1) << 11) \
+                 | (((word >> 21) & 0x3ff) << 1)
+        return "jal", (rd, sext(offset, 21))
+    elif opcode in (0x37, 0x17):
+        return ("lui" if opcode == 0x37 else "auipc"), (rd, word >> 12)
+    elif opcode == 0x73:
+        if f3 in _CSR:
+            return _CSR[f3], (rd, word >> 20, rs1)
+        if word == 0x00000073:
+            return "ecall", ()
+        if word == 0x00100073:
+            return "ebreak", ()
+        if word == 0x10500073:
+            return "wfi", ()
+    elif opcode == 0x0f:
+        return "fence", ()
+    raise SimError(f"illegal instruction {word:#010x}")
+
+
+def reg(r: int) -> str:
+    return f"x[{r}]" if r else "0"
+
+
+def translate(words: Sequence[int]) -> Tuple[str, int]:
+    """
+    source of a block factory for straight-line code starting at words[0]:
+    instructions up to and including the first control transfer, stopping before
+    csr/system instructions (those are executed by the main loop).
+    The code is position independent, the factory binds jump targets for the block address.
+    returns (source, number of instructions)
+    """
+    body, targets = [], []
+    loads = stores = size = 0
+    end = None
+    for word in words[:MAX_BLOCK]:
+        try:
+            m, args = decode(word)
+        except SimError:
+            break
+        if m in CSR_TYPE or m in ("ecall", "ebreak", "wfi"):
+            break
+        at = 4 * size
+        size += 1
+        if m == "fence":
+            continue
+        if m in LOADS:
+            rd, rs1, imm = args
+            loads += 1
+            n = struct.calcsize(LOADS[m])
+            value = f"(LD_{m}(mem, a)[0] if 0 <= a <= end{n} else mmio_load(a + base, '{LOADS[m]}'))"
+            body.append(f"a = (({reg(rs1)} + {imm}) & M) - base")
+            body.append(f"{'x[%d]' % rd if rd else '_'} = {value}{' & M' if m in ('lb', 'lh', 'lw') else ''}")
+        elif m in STORES:
+            rs2, rs1, imm = args
+            stores += 1
+            fmt, mask = STORES[m]
+            n = struct.calcsize(fmt)
+            value = reg(rs2) if mask == M else f"{reg(rs2)} & {mask}"
+            body.append(f"a = (({reg(rs1)} + {imm}) & M) - base")
+            body.append(f"if 0 <= a <= end{n}: ST_{m}(mem, a, {value})")
+            body.append(f"else: mmio_store(a + base, {value})")
+        elif m in BRANCH_TYPE:
+            rs1, rs2, offset = args
+            targets.append(at + offset)
+            cond = BRANCHES[m].format(a=reg(rs1), b=reg(rs2))
+            body.append(f"if {cond}:")
+            body.append(f"    counts[2] += 1")
+            body.append(f"    return t{len(targets) - 1}")
+            end = f"return pc + {at + 4}"
+            break
+        elif m == "jal":
+            rd, offset = args
+            if offset == 0:
+                end = "raise Stop()"  # 'j .': the halt loop
+                break
+            targets.append(at + offset)
+            if rd:
+                body.append(f"x[{rd}] = pc + {at + 4}")
+            end = f"return t{len(targets) - 1}"
+            break
+        elif m == "jalr":
+            rd, rs1, imm = args
+            body.append(f"t = ({reg(rs1)} + {imm}) & {M - 1}")
+            if rd:
+                body.append(f"x[{rd}] = pc + {at + 4}")
+            end = f"return t if ts <= t < te else leave(t, pc + {at})"
+            break
+        elif m == "lui":
+            if args[0]:
+                body.append(f"x[{args[0]}] = {sext(args[1] << 12, 32) & M}")
+        elif m == "auipc":
+            if args[0]:
+                body.append(f"x[{args[0]}] = (pc + {at + sext(args[1] << 12, 32)}) & M")
+        elif args[0] == 0:
+            pass  # no side effects: nop, hints
+        elif m in R_TYPE:
+            rd, rs1, rs2 = args
+            a, b = reg(rs1), reg(rs2)
+            body.append(f"x[{rd}] = " + (R_INLINE[m].format(a=a, b=b) if m in R_INLINE else f"R_{m}({a}, {b}) & M"))
+        else:
+            rd, rs1, imm = args
+            a = reg(rs1)
+            if m == "addi" and rs1 == 0:
+                expr = str(imm & M)
+            elif m in I_INLINE:
+                expr = I_INLINE[m].format(a=a, i=imm, u=imm & M)
+            else:
+                expr = f"I_{m}({a}, {imm}) & M"
+            body.append(f"x[{rd}] = {expr}")
+    if end is None:
+        end = f"return pc + {4 * size}"
+    if size == 0:
+        return "", 0
+
+    counters = []
+    if loads:
+        counters.append(f"counts[0] += {loads}")
+    if stores:
+        counters.append(f"counts[1] += {stores}")
+    lines = [
+        "def make(pc0, x, mem, counts, base, ts, te, mmio_load, mmio_store, leave):",
+        "    end1, end2, end4, end8 = len(mem) - 1, len(mem) - 2, len(mem) - 4, len(mem) - 8",
+        *(f"    t{k} = pc0 + {off} if ts <= pc0 + {off} < te else te" for k, off in enumerate(targets)),
+        "    def block(pc):",
+        *("        " + i for i in counters + body + [end]),
+        "    return block",
+    ]
+    return "\n".join(lines) + "\n", size
+
+
+@cache
+def block_factory(words: Tuple[int, ...]) -> Tuple[Optional[Callable], int]:
+    """ translated blocks are shared between machines: runtime and common sequences are compiled once """
+    source, size = translate(words)
+    if not size:
+        return None, 0
+    namespace = {}
+    exec(compile(source, "<block>", "exec"), BLOCK_GLOBALS, namespace)
+    return namespace["make"], size
+
+
+class Machine:
+    """ single hart with flat memory over the loaded image """
+
+    def __init__(self, image: Image, stack: int = 0x8000):
+        self.base = min(addr for _, addr, _, _ in image.sections)
+        end = max(addr + size for _, addr, _, size in image.sections)
+        # room above the image like in kernel.ld ('. += 0x8000; stack_top = .')
+        self.mem = bytearray(end - self.base + stack)
+        for name, addr, data, size in image.sections:
+            if name not in NOBITS:
+                self.mem[addr - self.base:addr - self.base + len(data)] = data
+        text = [i for i in image.sections if i[0] == ".text"] or image.sections[:1]
+        self.text_start = text[0][1]
+        self.text_end = text[0][1] + text[0][3] // 4 * 4
+        self.entry = image.entry
+        self.x = [0] * 32
+        self.csrs: Dict[int, int] = {CSRS["mhartid"]: 0}
+        self.uart = bytearray()
+        self.counts = [0, 0, 0]  # loads, stores, taken branches
+        self.marks: List[Tuple[int, int, int, int]] = []
+
+        # block starting at each instruction, translated on first execution, and its length.
+        # last entry catches execution past the end of text (also targets of jumps out of it)
+        count = (self.text_end - self.text_start) // 4
+        self.code: List[Callable[[int], int]] = [self.first_run] * count + [self.past_text]
+        self.sizes: List[int] = [0] * (count + 1)
+
+    def words(self, pc: int, count: int) -> Tuple[int, ...]:
+        at = pc - self.base
+        count = min(count, (self.text_end - pc) // 4)
+        return struct.unpack_from(f"<{count}I", self.mem, at)
+
+    def first_run(self, pc: int) -> int:
+        """ translate block at pc and run it, the main loop then counts its instructions """
+        index = (pc - self.text_start) >> 2
+        make, size = block_factory(self.words(pc, MAX_BLOCK))
+        if make is None:
+            self.code[index], size = self.special(pc, *self.decode_at(pc)), 1
+        else:
+            self.code[index] = make(pc, self.x, self.mem, self.counts, self.base, self.text_start, self.text_end,
+                                    self.mmio_load, self.mmio_store, self.leave)
+        self.sizes[index] = size
+        return self.code[index](pc)
+
+    def past_text(self, pc: int) -> int:
+        raise SimError(f"execution left text")
+
+    def leave(self, target: int, pc: int) -> int:
+        """ indirect jump out of text """
+        if target == 0:
+            raise _Stop()  # return from main, ra is 0 at _start
+        raise SimError(f"jump to {target:#x} outside of text at {pc:#x}")
+
+    def decode_at(self, pc: int) -> Tuple[str, Tuple]:
+        word = self.words(pc, 1)[0]
+        try:
+            return decode(word)
+        except SimError:
+            # data in text or padding: fault only when executed
+            return "illegal", (word,)
+
+    """
+    Memory outside of the image: devices
+    """
+
+    def mmio_load(self, addr: int, fmt: str) -> int:
+        if addr == UART_TXFIFO:
+            return 0  # TX FIFO is never full
+        raise SimError(f"load from unmapped address {addr:#x}")
+
+    def mmio_store(self, addr: int, value: int):
+        if addr == UART_TXFIFO:
+            self.uart.append(value & 0xff)
+            return
+        raise SimError(f"store to unmapped address {addr:#x}")
+
+    """
+    Instructions outside of blocks, single-instruction handlers (pc -> next pc)
+    """
+
+    def special(self, pc: int, m: str, args: Tuple) -> Callable[[int], int]:
+        if m in CSR_TYPE:
+            rd, csr, src = args
+
+            def csr_op(pc):
+                raise _Csr(m, rd, csr, src)
+
+            return csr_op
+        if m == "wfi":
+            def wfi(pc):
+                raise _Stop()
+
+            return wfi
+        what = f"illegal instruction {args[0]:#010x}" if m == "illegal" else m
+
+        def trap(pc):
+            raise SimError(f"{what} at {pc:#x}")
+
+        return trap
+
+    def csr(self, e: _Csr, instret: int):
+        counter = e.csr in (CSRS["cycle"], CSRS["instret"], CSRS["time"], CSRS["mcycle"], CSRS["minstret"])
+        old = instret if counter else self.csrs.get(e.csr, 0)
+        if counter:
+            self.marks.append((instret, *self.counts))
+        src = e.src if e.mnemonic.endswith("i") else self.x[e.src]
+        op = e.mnemonic.rstrip("i")
+        new = src if op == "csrrw" else old | src if op == "csrrs" else old & ~src
+        if e.rd:
+            self.x[e.rd] = old & M
+        # csrrs/csrrc with x0 (csrr) do not write
+        if not counter and (op == "csrrw" or e.src):
+            self.csrs[e.csr] = new & M
+
+    def run(self, limit: int = DEFAULT_LIMIT) -> SimResult:
+        """ run from entry until main returns, halt, fault or instruction limit """
+        code, sizes, text_start = self.code, self.sizes, self.text_start
+        pc, n, error = self.entry, 0, None
+        if not text_start <= pc < self.text_end:
+            return SimResult(error=f"entry {pc:#x} is outside of text")
+        while True:
+            try:
+                # block sizes are added after the block, instret seen by csr instructions is exact
+                while n < limit:
+                    index = (pc - text_start) >> 2
+                    pc = code[index](pc)
+                    n += sizes[index]
+                error = f"instruction limit {limit} exceeded"
+                break
+            except _Csr as e:
+                self.csr(e, n)
+                pc += 4
+                n += 1
+            except _Stop:
+                n += sizes[(pc - text_start) >> 2]
+                break
+            except SimError as e:
+                error = str(e)
+                break
+        loads, stores, branches = self.counts
+        return SimResult(self.uart.decode(errors="replace"), n, loads, stores, branches, error, self.marks)
+
+
+def load_elf(data: bytes) -> Image:
+    """ loadable segments of static ELF64 executable (ours or GNU ld output) """
+    if data[:4] != b"\x7fELF" or data[4] != 2:
+        raise SimError("not an ELF64 file")
+    entry, phoff = struct.unpack_from("<QQ", data, 24)
+    phentsize, phnum = struct.unpack_from("<HH", data, 54)
+    sections = []
+    for i in range(phnum):
+        typ, flags, offset, vaddr, _, filesz, memsz, _ = struct.unpack_from("<IIQQQQQQ", data, phoff + i * phentsize)
+        if typ == 1 and memsz:
+            # executable segment is the one to decode
+            name = ".text" if flags & 1 else f".load{i}"
+            sections.append((name, vaddr, data[offset:offset + filesz], memsz))
+    return Image(entry, sorted(sections, key=lambda i: i[1]), {}, set())
+
+
+def run_image(image: Image, limit: int = DEFAULT_LIMIT) -> SimResult:
+    return Machine(image).run(limit)
+
+
+def run_elf(data: bytes, limit: int = DEFAULT_LIMIT) -> SimResult:
+    return run_image(load_elf(data), limit)
+
+
+def run_asm(asm_text: str, runtime: Sequence[Object] = (), limit: int = DEFAULT_LIMIT) -> SimResult:
+    """ assemble, link with runtime objects (e.g. cpu_testbench/stdlib.s) and run """
+    try:
+        image = link([assemble(asm_text), *runtime])
+    except Exception as e:
+        return SimResult(error=str(e))
+    return run_image(image, limit)
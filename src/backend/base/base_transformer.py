@@ -1,10 +1,43 @@
 from collections.abc import generator
 from typing import *
 
-from utils import str_class_hierarchy, flatten
+from utils import type_hierarchy, flatten
 
 
-class BaseVisitor:
+DispatchTable = Dict[Type, Tuple[Callable, ...]]
+
+
+def resolve_handlers(owner: Type, node_type: Type) -> Tuple[Callable, ...]:
+    """
+    methods of 'owner' named same as classes in hierarchy of 'node_type',
+    ordered from 'object' to most specific class
+    """
+    return tuple(
+        getattr(owner, t.__name__)
+        for t in type_hierarchy(node_type)[::-1]
+        if hasattr(owner, t.__name__)
+    )
+
+
+class Dispatcher:
+    """
+    Handlers are resolved once per (transformer class, node class) pair
+    and cached in a per-class dispatch table
+    """
+    _dispatch: DispatchTable = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+
+    def handlers(self, node) -> Tuple[Callable, ...]:
+        table = self.__class__._dispatch
+        if (res := table.get(node.__class__)) is None:
+            res = table[node.__class__] = resolve_handlers(self.__class__, node.__class__)
+        return res
+
+
+class BaseVisitor(Dispatcher):
     """
     For each node gets class hierarchy and calls in sequence functions
     named same as classnames from 'object' to most specific class
@@ -17,19 +50,17 @@ class BaseVisitor:
             for i in node:
                 self(i)
         else:
-            fired = False
-            for node_name in str_class_hierarchy(node)[::-1]:
-                if hasattr(self, node_name):
-                    getattr(self, node_name)(node)
-                    fired = True
-            if not fired:
+            handlers = self.handlers(node)
+            for handler in handlers:
+                handler(self, node)
+            if not handlers:
                 print(f"no transformer for node: \n{node}\n")
 
     def throw(self, *x):
         raise Exception("invalid transform: " + ' '.join(str(i) for i in x))
 
 
-class BaseTransformer:
+class BaseTransformer(Dispatcher):
     def __call__(self, node):
         if node is None:
             return node
@@ -37,12 +68,10 @@ class BaseTransformer:
         if isinstance(node, List | Tuple | generator):
             return [self(i) for i in node]
 
-        fired = False
-        for node_name in str_class_hierarchy(node)[::-1]:
-            if hasattr(self, node_name):
-                node = getattr(self, node_name)(node)
-                fired = True
-        if not fired:
+        handlers = self.handlers(node)
+        for handler in handlers:
+            node = handler(self, node)
+        if not handlers:
             # print("no transform for", type(node))
             if hasattr(self, "fallback"):
                 node = getattr(self, "fallback")(node)
@@ -4,6 +4,7 @@ from typing import List
 
 class RegisterType(IntEnum):
     LOCAL = auto()
+    TEMPORARY = auto()  # caller-saved, for values not live across calls
     SCRATCH = auto()
     ARGUMENT = auto()
     RETURN = auto()
@@ -43,6 +44,10 @@ class Reg(Enum):
     def locals(cls) -> List['Reg']:
         return cls.by(RegisterType.LOCAL)
 
+    @classmethod
+    def temporaries(cls) -> List['Reg']:
+        return cls.by(RegisterType.TEMPORARY)
+
     @classmethod
     def caller_saved(cls) -> List['Reg']:
         return cls.by(RegisterType.CALLER_SAVED)
@@ -11,21 +11,21 @@ class RV64Reg(Reg):
     FP = ("fp", [RegisterType.CALLEE_SAVED])
 
     T0 = ("t0", [RegisterType.CALLER_SAVED]) # RegisterType.SCRATCH
-    T1 = ("t1", [RegisterType.CALLER_SAVED]) # RegisterType.SCRATCH
+    T1 = ("t1", [RegisterType.CALLER_SAVED]) # breaks cycles of call argument moves
     T2 = ("t2", [RegisterType.SCRATCH, RegisterType.CALLER_SAVED])
     T3 = ("t3", [RegisterType.SCRATCH, RegisterType.CALLER_SAVED])
     T4 = ("t4", [RegisterType.SCRATCH, RegisterType.CALLER_SAVED])
     T5 = ("t5", [RegisterType.SCRATCH, RegisterType.CALLER_SAVED])
     T6 = ("t6", [RegisterType.SCRATCH, RegisterType.CALLER_SAVED])
 
-    A0 = ("a0", [RegisterType.ARGUMENT, RegisterType.CALLER_SAVED, RegisterType.RETURN])
-    A1 = ("a1", [RegisterType.ARGUMENT, RegisterType.CALLER_SAVED, RegisterType.RETURN])
-    A2 = ("a2", [RegisterType.ARGUMENT, RegisterType.CALLER_SAVED])
-    A3 = ("a3", [RegisterType.ARGUMENT, RegisterType.CALLER_SAVED])
-    A4 = ("a4", [RegisterType.ARGUMENT, RegisterType.CALLER_SAVED])
-    A5 = ("a5", [RegisterType.ARGUMENT, RegisterType.CALLER_SAVED])
-    A6 = ("a6", [RegisterType.ARGUMENT, RegisterType.CALLER_SAVED])
-    A7 = ("a7", [RegisterType.ARGUMENT, RegisterType.CALLER_SAVED])
+    A0 = ("a0", [RegisterType.ARGUMENT, RegisterType.TEMPORARY, RegisterType.CALLER_SAVED, RegisterType.RETURN])
+    A1 = ("a1", [RegisterType.ARGUMENT, RegisterType.TEMPORARY, RegisterType.CALLER_SAVED, RegisterType.RETURN])
+    A2 = ("a2", [RegisterType.ARGUMENT, RegisterType.TEMPORARY, RegisterType.CALLER_SAVED])
+    A3 = ("a3", [RegisterType.ARGUMENT, RegisterType.TEMPORARY, RegisterType.CALLER_SAVED])
+    A4 = ("a4", [RegisterType.ARGUMENT, RegisterType.TEMPORARY, RegisterType.CALLER_SAVED])
+    A5 = ("a5", [RegisterType.ARGUMENT, RegisterType.TEMPORARY, RegisterType.CALLER_SAVED])
+    A6 = ("a6", [RegisterType.ARGUMENT, RegisterType.TEMPORARY, RegisterType.CALLER_SAVED])
+    A7 = ("a7", [RegisterType.ARGUMENT, RegisterType.TEMPORARY, RegisterType.CALLER_SAVED])
 
     # S0 = ("s0", [RegisterType.CALLEE_SAVED]) -> FP
     S1 = ("s1", [RegisterType.LOCAL, RegisterType.CALLEE_SAVED])
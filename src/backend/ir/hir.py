@@ -6,13 +6,13 @@ from typing import Dict, List
 from backend.hw.reg import Reg
 
 
-@dataclass
+@dataclass(slots=True)
 class HVar:
     def __str__(self):
         return self.__repr__()
 
 
-@dataclass
+@dataclass(slots=True)
 class HStackVar(HVar):
     pos: int = 0
     size: int = 8
@@ -21,7 +21,7 @@ class HStackVar(HVar):
     def __repr__(self):
         return f"HStkVar@{self.pos}"
 
-@dataclass
+@dataclass(slots=True)
 class HStackRegCopy(HStackVar):
     pos: int = 0
     reg: Reg = None
@@ -31,7 +31,16 @@ class HStackRegCopy(HStackVar):
         return f"HStkVar@{self.pos}(copy of {self.reg.code if self.reg else '?'})"
 
 
-@dataclass
+@dataclass(slots=True)
+class HArgVar(HStackVar):
+    """ parameter passed on stack: in frame of caller, 'pos' is relative to sp of callee """
+    index: int = 0  # among parameters passed on stack
+
+    def __repr__(self):
+        return f"HArgVar#{self.index}@{self.pos}"
+
+
+@dataclass(slots=True)
 class HRegVar(HVar):
     reg: Reg
     name: str = ""
@@ -40,7 +49,7 @@ class HRegVar(HVar):
         return f"HRegVar({self.reg.code if self.reg else '?'})"
 
 
-@dataclass
+@dataclass(slots=True)
 class HMemVar(HVar):
     label: str
 
@@ -52,3 +61,10 @@ class HMemVar(HVar):
 class HFunLayout:
     mem_slots: Dict[str, HVar] = field(default_factory=dict)
     stack: List[HStackVar] = field(default_factory=list)
+    align: int = 1  # of frame size
+    outgoing: int = 0  # bytes at bottom of frame for arguments passed on stack to called functions
+
+    @property
+    def frame_size(self) -> int:
+        size = self.outgoing + sum(i.size for i in self.stack)
+        return -(-size // self.align) * self.align
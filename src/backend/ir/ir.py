@@ -1,10 +1,11 @@
 """ Intermediate representation code objects """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import StrEnum, auto
 from typing import *
 
 from backend.ir.hir import HFunLayout, HVar
+from backend.ir.symbols import SymbolTable
 
 """
 Data
@@ -18,12 +19,12 @@ class IRType(StrEnum):
     STRING = auto()
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class IRValue:
     type: IRType = IRType.INT
 
 
-@dataclass
+@dataclass(slots=True)
 class IRIntValue(IRValue):
     value: int
 
@@ -31,7 +32,7 @@ class IRIntValue(IRValue):
         self.type = IRType.INT
 
 
-@dataclass
+@dataclass(slots=True)
 class IRCharValue(IRValue):
     value: str
 
@@ -40,7 +41,7 @@ class IRCharValue(IRValue):
         assert len(self.value) == 1
 
 
-@dataclass
+@dataclass(slots=True)
 class IRStringValue(IRValue):
     value: str
 
@@ -53,25 +54,31 @@ class IRStringValue(IRValue):
 """
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class IRStatement:
+    """
+    statements are slotted records: no per-instance __dict__.
+    v_inputs/v_outputs are tuples of used/defined variables, computed once per statement:
+    whoever reassigns operands in place calls refresh()
+    """
     label: Optional[str] = None
+    v_inputs: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    v_outputs: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
 
-    @property
-    def v_inputs(self) -> List[str]:
-        return []
-    @property
-    def v_outputs(self) -> List[str]:
-        return []
+    def __post_init__(self):
+        self.refresh()
 
-@dataclass
+    def refresh(self):
+        pass
+
+
+@dataclass(slots=True)
 class IRStStoreValue(IRStatement):
     dest: str
     value: IRValue
 
-    @property
-    def v_outputs(self):
-        return [self.dest]
+    def refresh(self):
+        self.v_outputs = self.dest,
 
 
 class IRBOp(StrEnum):
@@ -92,19 +99,16 @@ class IRBOp(StrEnum):
     LOG_OR = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class IRStBinOp(IRStatement):
     operation: IRBOp
     dest: str
     arg1: str
     arg2: str
 
-    @property
-    def v_inputs(self):
-        return [self.arg1, self.arg2]
-    @property
-    def v_outputs(self):
-        return [self.dest]
+    def refresh(self):
+        self.v_inputs = self.arg1, self.arg2
+        self.v_outputs = self.dest,
 
 
 class IRUOp(StrEnum):
@@ -114,21 +118,18 @@ class IRUOp(StrEnum):
     COPY = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class IRStUnOp(IRStatement):
     operation: IRUOp
     dest: str
     arg: str
 
-    @property
-    def v_inputs(self):
-        return [self.arg]
-    @property
-    def v_outputs(self):
-        return [self.dest]
+    def refresh(self):
+        self.v_inputs = self.arg,
+        self.v_outputs = self.dest,
 
 
-@dataclass
+@dataclass(slots=True)
 class IRStJump(IRStatement):
     target: str
 
@@ -138,38 +139,33 @@ class IRCJumpType(StrEnum):
     JNZ = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class IRStCJump(IRStatement):
     check_type: IRCJumpType
     checked_var: str
     jump_to: str
 
-    @property
-    def v_inputs(self):
-        return [self.checked_var]
+    def refresh(self):
+        self.v_inputs = self.checked_var,
 
 
-@dataclass
+@dataclass(slots=True)
 class IRStCall(IRStatement):
     fun_name: str
     arg_vars: List[str]
     assign_var: Optional[str] = None
 
-    @property
-    def v_inputs(self):
-        return self.arg_vars
+    def refresh(self):
+        self.v_inputs = tuple(self.arg_vars)
+        self.v_outputs = (self.assign_var,) if self.assign_var is not None else ()
 
-    @property
-    def v_outputs(self):
-        return [self.assign_var] if self.assign_var is not None else []
 
-@dataclass
+@dataclass(slots=True)
 class IRStReturn(IRStatement):
     var: Optional[str] = None
 
-    @property
-    def v_inputs(self):
-        return [self.var]
+    def refresh(self):
+        self.v_inputs = (self.var,) if self.var is not None else ()
 
 
 """
@@ -192,7 +188,7 @@ class IRFun:
     layout: Optional[HFunLayout] = None
 
     def __post_init__(self):
-        self.exit_label = f"__exit_{self.name}"
+        self.exit_label = f".L{self.name}.exit"
         self.is_impl = self.body is not None
 
 
@@ -207,6 +203,7 @@ class IRGlobal:
 class IRProg:
     functions: List[IRFun]
     globals: List[IRGlobal]
+    symbols: SymbolTable = field(default_factory=SymbolTable, repr=False, compare=False)
 
 
 """
@@ -216,7 +213,7 @@ class IRProg:
 
 # псевдо-инструкция для перемещения данных
 # между физическими локациями переменных уровня IR
-@dataclass
+@dataclass(slots=True)
 class HIRMove(IRStatement):
     src: HVar
     dst: HVar
@@ -0,0 +1,63 @@
+""" Names generated during compilation """
+
+from typing import Dict
+
+# generated names contain '.', which cannot appear in source identifiers,
+# so they never collide with user variables, functions or globals
+TEMP_PREFIX = "__t."
+SPILL_PREFIX = "__s."
+
+
+class SymbolScope:
+    """
+    Fresh names local to one function.
+    Numbering depends only on the order of requests inside the function,
+    so identical functions get identical names in any translation unit
+    """
+
+    def __init__(self, table: 'SymbolTable', name: str):
+        self.table = table
+        self.name = name
+        self.counters: Dict[str, int] = {}
+
+    def fresh(self, prefix: str) -> str:
+        n = self.counters.get(prefix, 0)
+        self.counters[prefix] = n + 1
+        return f"{prefix}{n}"
+
+    def var(self) -> str:
+        return self.fresh(TEMP_PREFIX)
+
+    def spill(self) -> str:
+        return self.fresh(SPILL_PREFIX)
+
+    def label(self) -> str:
+        # '.L' labels are local to the assembled object
+        return self.fresh(f".L{self.name}.")
+
+    def string(self) -> str:
+        return self.fresh(f".L{self.name}.str")
+
+
+class SymbolTable:
+    """
+    Per-compilation generator of names: fresh names are handed out by per-function scopes,
+    deterministic in place of random ones
+    """
+
+    def __init__(self):
+        self.scopes: Dict[str, SymbolScope] = {}
+
+    def scope(self, name: str) -> SymbolScope:
+        if (res := self.scopes.get(name)) is None:
+            res = self.scopes[name] = SymbolScope(self, name)
+        return res
+
+
+def is_temp(name: str) -> bool:
+    return name.startswith(TEMP_PREFIX)
+
+
+def data_label(name: str) -> str:
+    """ label of data pointed to by global 'name' (e.g. characters of a string) """
+    return f"{name}.data"
@@ -7,7 +7,9 @@ from backend.ir.hir import HRegVar
 from backend.ir.ir import *
 from middlend.opt import RV64IR2HIRTransformer
 from backend.hw.rv64 import DEC_RV64_IRCJumpType, RV64Reg, RV64_IRBOp_decoder
-from utils import string_escape, random_string
+from backend.ir.symbols import data_label
+from instrument import run_pass, stage
+from utils import string_escape
 
 
 @dataclass
@@ -36,6 +38,8 @@ class RV64IR2ASMTransformer(BaseVisitor, Emitter):
         super().__init__()
         self.ctx = Context()
         self.regmap = RV64Reg
+        # emitted lines of each function; functions already present here are not emitted again
+        self.fragments: Dict[str, List[str]] = {}
 
     @property
     def fun(self) -> Optional[IRFun]:
@@ -86,7 +90,7 @@ class RV64IR2ASMTransformer(BaseVisitor, Emitter):
 
             case IRGlobal(_, IRType.STRING, IRStringValue(x)):
                 val = '"' + string_escape(x) + '"'
-                ptr = random_string(16)
+                ptr = data_label(name)
                 self.emit_label(ptr)
                 self.emit(f".{typ}", val)
                 self.emit_label(name)
@@ -100,13 +104,18 @@ class RV64IR2ASMTransformer(BaseVisitor, Emitter):
 
     def IRFun(self, x: IRFun):
         if not x.is_impl: return
+        if (fragment := self.fragments.get(x.name)) is not None:
+            self.data.extend(fragment)
+            return
+        fragment_start = len(self.data)
         m_layout = x.layout
 
         # PROLOGUE
         self.emit_label(x.name)
         # allocate locals on stack
-        stack_size = sum(i.size for i in m_layout.stack)
-        self.emit("addi", "sp", "sp", -stack_size)
+        stack_size = m_layout.frame_size
+        if stack_size:
+            self.emit("addi", "sp", "sp", -stack_size)
         # save regs
         for slot in m_layout.stack:
             if isinstance(slot, HStackRegCopy):
@@ -116,6 +125,12 @@ class RV64IR2ASMTransformer(BaseVisitor, Emitter):
             param_slot = m_layout.mem_slots[param.name]
             if isinstance(param_slot, HStackVar):
                 self.emit("sd", param_reg.code, f"{param_slot.pos}(sp)")
+        # args allocated to registers other than they come in
+        self.parallel_move([
+            (HRegVar(param_reg), param_slot)
+            for param_reg, param in zip(self.regmap.params(), x.params)
+            if isinstance(param_slot := m_layout.mem_slots[param.name], HRegVar)
+        ])
 
         # BODY
         self.ctx.current_function = x
@@ -129,10 +144,13 @@ class RV64IR2ASMTransformer(BaseVisitor, Emitter):
             if isinstance(slot, HStackRegCopy):
                 self.emit("ld", slot.reg.code, f"{slot.pos}(sp)")
         # deallocate locals
-        self.emit("addi", "sp", "sp", stack_size)
+        if stack_size:
+            self.emit("addi", "sp", "sp", stack_size)
         # return back
         self.emit("jr", "ra")
 
+        self.fragments[x.name] = self.data[fragment_start:]
+
     def IRProg(self, x: IRProg):
         self.emit(".align", 2)
 
@@ -171,6 +189,8 @@ class RV64IR2ASMTransformer(BaseVisitor, Emitter):
 
     def HIRMove(self, x: HIRMove):
         match x:
+            case HIRMove(HRegVar(src_reg), HRegVar(dst_reg)) if src_reg == dst_reg:
+                pass
             case HIRMove(HRegVar(src_reg), HRegVar(dst_reg)):
                 self.emit("addi", dst_reg.code, src_reg.code, 0)
             case HIRMove(HRegVar(src_reg), HStackVar(dst_stk_pos, _)):
@@ -214,14 +234,38 @@ class RV64IR2ASMTransformer(BaseVisitor, Emitter):
             self.throw("not existing function", x.fun_name)
         if len(fun.params) != len(x.arg_vars):
             self.throw("args invalid for function", x.fun_name)
-        self([
-            HIRMove(src=self.slot(src_var), dst=HRegVar(param_reg))
+        # аргументы сверх регистров - на стек, в начало кадра (psABI)
+        for i, src_var in enumerate(x.arg_vars[len(self.regmap.params()):]):
+            src = self.slot(src_var)
+            if not isinstance(src, HRegVar):
+                self(HIRMove(src=src, dst=HRegVar(self.regmap.T0)))
+                src = HRegVar(self.regmap.T0)
+            self(HIRMove(src=src, dst=HStackVar(pos=8 * i)))
+        # пишем из переменных в регистры по calling conv
+        self.parallel_move([
+            (self.slot(src_var), HRegVar(param_reg))
             for param_reg, src_var in zip(self.regmap.params(), x.arg_vars)
-        ]) # пишем из переменных в регистры по calling conv
+        ])
         self.emit("call", x.fun_name)
         if x.assign_var is not None:
             self([HIRMove(src=HRegVar(RV64Reg.ret()[0]), dst=self.slot(x.assign_var))])
 
+    def parallel_move(self, moves: List[Tuple[HVar, HRegVar]]):
+        """
+        moves into distinct registers: a register is not overwritten while it is a source of other move.
+        cycles (a0 <- a1, a1 <- a0) go through t1
+        """
+        pending = [(src, dst) for src, dst in moves if not (isinstance(src, HRegVar) and src.reg == dst.reg)]
+        while pending:
+            sources = [src.reg for src, _ in pending if isinstance(src, HRegVar)]
+            ready = next((n for n, (_, dst) in enumerate(pending) if dst.reg not in sources), None)
+            if ready is not None:
+                self(HIRMove(*pending.pop(ready)))
+                continue
+            parked, tmp = pending[0][0].reg, HRegVar(self.regmap.T1)
+            self(HIRMove(pending[0][0], tmp))
+            pending = [(tmp if isinstance(src, HRegVar) and src.reg == parked else src, dst) for src, dst in pending]
+
     def IRStJump(self, x: IRStJump):
         self.emit("j", x.target)
 
@@ -288,11 +332,12 @@ class RV64IR2ASMTransformer(BaseVisitor, Emitter):
         ))
 
 
-def do_asm(ir: IRProg):
-    opt = RV64IR2HIRTransformer(RV64Reg)
-    ir = opt(ir)
+def do_asm(ir: IRProg, opt: str = "O0"):
+    hir = RV64IR2HIRTransformer(RV64Reg, opt)
+    ir = run_pass("ir2hir", hir, ir)
 
     trf = RV64IR2ASMTransformer()
-    trf(ir)
+    with stage("emit"):
+        trf(ir)
 
     return trf.get()
@@ -0,0 +1,72 @@
+"""
+usage: python -m driver [-o OUT_DIR] [-j JOBS] [-m MANIFEST] [-O {O0,O1,O2}] [--summary FILE] [--cache-dir DIR]
+                        [--time-passes {text,detail,json,trace}] [--time-passes-file FILE] [FILE ...]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from driver.batch import run_batch, read_manifest
+from middlend.opt import OPT_LEVELS
+from instrument import format_table, chrome_events
+
+
+def report_passes(records, fmt: str, file: str = None):
+    match fmt:
+        case "text" | "detail":
+            text = format_table(records, fmt == "text") + "\n"
+        case "json":
+            text = json.dumps(records, indent=2)
+        case "trace":
+            text = json.dumps({"traceEvents": chrome_events(records)})
+    if file is None:
+        sys.stderr.write(text)
+    else:
+        with open(file, "w") as f:
+            f.write(text)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(prog="python -m driver", description="compile C sources to RV64 assembly")
+    ap.add_argument("files", nargs="*", help="source files")
+    ap.add_argument("-m", "--manifest", action="append", default=[], help="file with list of sources, one per line")
+    ap.add_argument("-o", "--out-dir", help="directory for .s files, with the same layout as sources (default: next to sources)")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    ap.add_argument("-O", dest="opt", choices=OPT_LEVELS, default="O0",
+                    help="optimization level: O0 allocates registers by use counts, O1 by live intervals, "
+                         "O2 by graph coloring with coalescing of copies (slower compilation)")
+    ap.add_argument("--summary", help="write JSON summary to file ('-' for stdout)")
+    ap.add_argument("--cache-dir", help="persistent cache of compiled functions")
+    ap.add_argument("--time-passes", choices=["text", "detail", "json", "trace"],
+                    help="report time and memory of each stage: aggregated or detailed table, JSON or Chrome trace")
+    ap.add_argument("--time-passes-file", help="write pass report to file instead of stderr")
+    args = ap.parse_args()
+
+    inputs = list(args.files)
+    for i in args.manifest:
+        inputs.extend(read_manifest(i))
+    if not inputs:
+        ap.error("no input files")
+
+    summary = run_batch(inputs, args.out_dir, args.jobs, args.cache_dir, args.time_passes is not None, args.opt)
+
+    for i in summary.files:
+        if not i.ok:
+            print(f"{i.input}: {i.error}", file=sys.stderr)
+    if args.summary == "-":
+        json.dump(summary.to_json(), sys.stdout, indent=2)
+        print()
+    elif args.summary is not None:
+        with open(args.summary, "w") as f:
+            json.dump(summary.to_json(), f, indent=2)
+    if args.time_passes is not None:
+        report_passes([r for i in summary.files for r in i.passes or []], args.time_passes, args.time_passes_file)
+    print(f"compiled {len(summary.files) - summary.failed}/{len(summary.files)} files "
+          f"in {summary.wall_s:.2f}s with {summary.jobs} jobs", file=sys.stderr)
+    return 1 if summary.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
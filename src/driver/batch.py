@@ -0,0 +1,150 @@
+""" Compilation of many translation units in one long-lived process """
+
+import os
+import time
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+from os import path
+from typing import *
+
+from driver.cache import FunctionCache
+from driver.pipeline import do_compile
+from frontend.astdef import do_parse_ast, ast_parser
+from instrument import recording
+
+# state of current process: worker processes get their own
+_cache: Optional[FunctionCache] = None
+_time_passes = False
+_opt = "O0"
+
+
+@dataclass
+class FileResult:
+    input: str
+    output: Optional[str] = None
+    error: Optional[str] = None
+    parse_s: float = 0
+    compile_s: float = 0
+    write_s: float = 0
+    passes: Optional[List[dict]] = None  # PassRecord of each stage with time_passes
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchSummary:
+    files: List[FileResult] = field(default_factory=list)
+    jobs: int = 1
+    wall_s: float = 0
+
+    @property
+    def failed(self) -> int:
+        return sum(not i.ok for i in self.files)
+
+    def to_json(self) -> dict:
+        return {
+            "jobs": self.jobs,
+            "wall_s": self.wall_s,
+            "total": len(self.files),
+            "failed": self.failed,
+            # stage records are exported separately, see instrument
+            "files": [asdict(i, dict_factory=lambda x: {k: v for k, v in x if k != "passes"}) | {"ok": i.ok}
+                      for i in self.files],
+        }
+
+
+def read_manifest(manifest: str) -> List[str]:
+    """ one input path per line, relative to manifest; empty lines and '#' comments are skipped """
+    base = path.dirname(manifest)
+    with open(manifest) as f:
+        lines = (i.strip() for i in f)
+        return [path.join(base, i) for i in lines if i and not i.startswith("#")]
+
+
+def output_paths(inputs: List[str], out_dir: Optional[str]) -> List[str]:
+    """ .s next to each input, or under 'out_dir' at its path relative to the common directory of inputs """
+    names = [path.splitext(i)[0] + ".s" for i in inputs]
+    if out_dir is None or not names:
+        return names
+    base = path.commonpath([path.dirname(path.abspath(i)) for i in names])
+    return [path.join(out_dir, path.relpath(path.abspath(i), base)) for i in names]
+
+
+def init_worker(cache_dir: Optional[str], memory_cache: bool = False, time_passes: bool = False, opt: str = "O0"):
+    """ warm up parser once per process """
+    global _cache, _time_passes, _opt
+    ast_parser()
+    _time_passes = time_passes
+    _opt = opt
+    _cache = FunctionCache(path=cache_dir) if cache_dir is not None or memory_cache else None
+
+
+def compile_file(input: str, output: str) -> FileResult:
+    res = FileResult(input)
+    with recording() if _time_passes else nullcontext() as rec:
+        compile_file_into(res, input, output)
+    if rec is not None:
+        res.passes = rec.to_json()
+    return res
+
+
+def compile_file_into(res: FileResult, input: str, output: str):
+    try:
+        t = time.perf_counter()
+        with open(input) as f:
+            prog = do_parse_ast(f.read())
+        res.parse_s = time.perf_counter() - t
+
+        t = time.perf_counter()
+        asm = do_compile(prog, _cache, opt=_opt)
+        res.compile_s = time.perf_counter() - t
+
+        t = time.perf_counter()
+        with open(output, "w") as f:
+            f.write(asm)
+        res.write_s = time.perf_counter() - t
+        res.output = output
+    except Exception as e:
+        res.error = f"{type(e).__name__}: {e}"
+
+
+def run_batch(inputs: List[str],
+              out_dir: Optional[str] = None,
+              jobs: int = 1,
+              cache_dir: Optional[str] = None,
+              time_passes: bool = False,
+              opt: str = "O0") -> BatchSummary:
+    """ compile each input into .s file; results are in order of inputs """
+    start = time.perf_counter()
+    outputs = output_paths(inputs, out_dir)
+    if out_dir is not None:
+        for i in sorted({path.dirname(i) for i in outputs}):
+            os.makedirs(i, exist_ok=True)
+
+    # inputs differing only in extension (or listed twice) would overwrite output of each other,
+    # an input that is itself an output path (x.s) would be overwritten
+    sources = {path.abspath(i) for i in inputs}
+    first: Dict[str, int] = {}
+    collisions: Dict[int, FileResult] = {}
+    for n, o in enumerate(outputs):
+        if path.abspath(o) in sources:
+            collisions[n] = FileResult(inputs[n], error=f"output {o} would overwrite an input")
+        elif (other := first.setdefault(o, n)) != n:
+            collisions[n] = FileResult(inputs[n], error=f"output {o} is already written for {inputs[other]}")
+    todo = [n for n in range(len(inputs)) if n not in collisions]
+    todo_inputs, todo_outputs = [inputs[n] for n in todo], [outputs[n] for n in todo]
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(cache_dir, False, time_passes, opt)) as pool:
+            # large chunks: per-file work is small compared to inter-process round trip
+            chunk = max(1, len(todo) // (jobs * 8))
+            compiled = list(pool.map(compile_file, todo_inputs, todo_outputs, chunksize=chunk))
+    else:
+        init_worker(cache_dir, False, time_passes, opt)
+        compiled = [compile_file(i, o) for i, o in zip(todo_inputs, todo_outputs)]
+
+    files = collisions | dict(zip(todo, compiled))
+    return BatchSummary([files[n] for n in range(len(inputs))], jobs, time.perf_counter() - start)
@@ -0,0 +1,193 @@
+""" Content-addressed cache of compiled functions """
+
+import dataclasses
+import glob
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+from os.path import join
+from typing import *
+
+from backend.ir.ir import IRFun, IRGlobal
+from frontend.astdef import DeclFun, Prog, ExCall, ExRdVar, StAsn, _Ast
+from utils import dirpath
+
+
+@dataclass
+class FunctionArtifact:
+    """ everything compilation of one function contributes to the program """
+    fun: IRFun  # lowered IR with HFunLayout
+    strings: List[IRGlobal]  # string literals extracted to globals
+    asm: List[str]  # emitted assembly fragment
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    bytes: int = 0
+    entries: int = 0
+
+    def __add__(self, other: 'CacheStats') -> 'CacheStats':
+        """ stats of caches of several processes together """
+        return CacheStats(*(getattr(self, f.name) + getattr(other, f.name) for f in dataclasses.fields(self)))
+
+    def __str__(self):
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0
+        return (f"function cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), "
+                f"{self.entries} entries, {self.bytes} bytes, {self.evictions} evictions")
+
+
+@cache
+def compiler_digest() -> str:
+    """ hash of compiler sources: any change to the compiler invalidates cached functions """
+    root = join(dirpath(__file__), "..")
+    h = hashlib.sha256()
+    for path in sorted(glob.glob(join(root, "**", "*.py"), recursive=True) + [join(root, "frontend", "grammar.lark")]):
+        if "grammar_tables" in path:
+            continue
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def ast_references(node, calls: Set[str], names: Set[str]):
+    """ collect names of called functions and of all read or assigned variables """
+    match node:
+        case ExCall(name=name):
+            calls.add(name)
+        case ExRdVar(name=name) | StAsn(dst=name):
+            names.add(name)
+    if isinstance(node, list | tuple):
+        for i in node:
+            ast_references(i, calls, names)
+    elif isinstance(node, _Ast) and dataclasses.is_dataclass(node):
+        for f in dataclasses.fields(node):
+            ast_references(getattr(node, f.name), calls, names)
+
+
+def function_key(fun: DeclFun, prog: Prog, opt: str = "O0") -> str:
+    """
+    key of function compilation result: optimization level, normalized AST of the function,
+    signatures of functions it calls and declarations of globals it references
+    """
+    calls, names = set(), set()
+    ast_references(fun.body, calls, names)
+    glob_decls = {i.sig.name: i for i in prog.globals}
+
+    h = hashlib.sha256(compiler_digest().encode())
+    h.update(opt.encode())
+    h.update(repr(fun).encode())
+    for name in sorted(calls):
+        callee = prog.functions.get(name, None)
+        h.update(repr(callee.sig if callee is not None else name).encode())
+    for name in sorted(names & glob_decls.keys()):
+        h.update(repr(glob_decls[name]).encode())
+    return h.hexdigest()
+
+
+class FunctionCache:
+    """
+    LRU cache of FunctionArtifact limited by total size of pickled entries.
+    With 'path' entries are also stored as files, so that cache survives between runs and is shared
+    by worker processes. Each process keeps its own LRU in memory and reads files on first request;
+    the directory is kept within the same limit by removing files with the oldest modification time.
+    Another process may remove a file at any moment: a missing file is a miss
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.entries: OrderedDict[str, bytes] = OrderedDict()
+        self.stats = CacheStats()
+        self.disk_bytes = 0  # estimate: other processes write to the directory too
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self.disk_bytes = sum(size for _, _, size in self._files())
+
+    def _file(self, key: str) -> str:
+        return join(self.path, f"{key}.pickle")
+
+    def _files(self) -> List[Tuple[float, str, int]]:
+        """ (modification time, path, size) of cached files """
+        res = []
+        for i in os.scandir(self.path):
+            if not i.name.endswith(".pickle"):
+                continue
+            try:
+                st = i.stat()
+            except FileNotFoundError:
+                continue
+            res.append((st.st_mtime, i.path, st.st_size))
+        return res
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._file(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _touch(self, key: str):
+        try:
+            os.utime(self._file(key))
+        except FileNotFoundError:
+            pass  # removed by other process, the copy in memory is still valid
+
+    def _prune(self):
+        """ remove least recently used files, the newest one stays """
+        files = sorted(self._files())
+        self.disk_bytes = sum(size for _, _, size in files)
+        for _, file, size in files[:-1]:
+            if self.disk_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+            self.disk_bytes -= size
+
+    def _insert(self, key: str, data: bytes):
+        if key in self.entries:
+            self.stats.bytes -= len(self.entries.pop(key))
+        self.entries[key] = data
+        self.stats.bytes += len(data)
+        while self.stats.bytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.stats.bytes -= len(old)
+            self.stats.evictions += 1
+        self.stats.entries = len(self.entries)
+
+    def get(self, key: str) -> Optional[FunctionArtifact]:
+        if (data := self.entries.get(key, None)) is not None:
+            self.entries.move_to_end(key)
+        elif self.path is not None and (data := self._read(key)) is not None:
+            self._insert(key, data)
+        if data is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        if self.path is not None:
+            self._touch(key)
+        # every hit gets its own copy, later passes are free to modify it
+        return pickle.loads(data)
+
+    def put(self, key: str, artifact: FunctionArtifact):
+        data = pickle.dumps(artifact, pickle.HIGHEST_PROTOCOL)
+        self.stats.stores += 1
+        self._insert(key, data)
+        if self.path is not None:
+            # readers in other processes never see a partially written file
+            tmp = f"{self._file(key)}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._file(key))
+            self.disk_bytes += len(data)
+            if self.disk_bytes > self.max_bytes:
+                self._prune()
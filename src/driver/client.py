@@ -0,0 +1,94 @@
+"""
+Thin client of driver.daemon. Imports nothing of the compiler unless the daemon is not running.
+
+usage: python -m driver.client [--socket PATH] [-o OUT] [-O LEVEL] FILE
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+from os import path
+from typing import *
+
+
+def default_socket() -> str:
+    # same as driver.daemon.default_socket, duplicated to keep client startup cheap
+    if (res := os.environ.get("CC_SOCKET", None)) is not None:
+        return res
+    base = os.environ.get("XDG_RUNTIME_DIR", None) or tempfile.gettempdir()
+    return path.join(base, f"c-compiler-rv-{os.getuid()}.sock")
+
+
+class CompilerClient:
+    def __init__(self, socket_path: Optional[str] = None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path or default_socket())
+        self.file = self.sock.makefile("rwb")
+
+    def request(self, **request) -> dict:
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise Exception("compiler daemon closed connection")
+        return json.loads(line)
+
+    def compile(self, text: str, opt: str = "O0") -> str:
+        res = self.request(op="compile", source=text, opt=opt)
+        if not res["ok"]:
+            raise Exception(res["error"])
+        return res["asm"]
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def compile_text(text: str, socket_path: Optional[str] = None, opt: str = "O0") -> str:
+    """ same as driver.pipeline.compile_text, compiled by daemon when it is running """
+    try:
+        client = CompilerClient(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        from driver.pipeline import compile_text as compile_local
+        return compile_local(text, opt=opt)
+    with client:
+        return client.compile(text, opt)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(prog="python -m driver.client")
+    ap.add_argument("file", help="source file, '-' for stdin")
+    ap.add_argument("-o", "--output", help="assembly output (default: stdout)")
+    ap.add_argument("--socket", default=None)
+    ap.add_argument("-O", dest="opt", default="O0", help="optimization level, as of python -m driver")
+    args = ap.parse_args()
+
+    if args.file == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.file) as f:
+            text = f.read()
+    try:
+        asm = compile_text(text, args.socket, args.opt)
+    except Exception as e:
+        print(f"{args.file}: {e}", file=sys.stderr)
+        return 1
+    if args.output is None:
+        sys.stdout.write(asm)
+    else:
+        with open(args.output, "w") as f:
+            f.write(asm)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
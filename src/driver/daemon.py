@@ -0,0 +1,158 @@
+"""
+Resident compiler: keeps parser, transformers and function cache warm
+and serves compile requests over a Unix domain socket.
+
+Protocol: one JSON object per line in both directions, any number of requests per connection.
+    {"op": "compile", "source": "...", "opt": "O1"}  ->  {"ok": true, "asm": "..."} | {"ok": false, "error": "..."}
+    {"op": "ping"}                                   ->  {"ok": true, "pid": ...}
+    {"op": "stats"}                                  ->  {"ok": true, "served": ..., "cache": "...", "workers": ...}
+    {"op": "shutdown"}                               ->  {"ok": true}
+
+usage: python -m driver.daemon [--socket PATH] [-j JOBS] [--cache-dir DIR]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from os import path
+from typing import *
+
+import driver.batch as batch
+from driver.batch import init_worker
+from driver.cache import CacheStats
+from driver.pipeline import compile_text
+
+
+def default_socket() -> str:
+    if (res := os.environ.get("CC_SOCKET", None)) is not None:
+        return res
+    base = os.environ.get("XDG_RUNTIME_DIR", None) or tempfile.gettempdir()
+    return path.join(base, f"c-compiler-rv-{os.getuid()}.sock")
+
+
+def compile_source(text: str, opt: str = "O0") -> Tuple[Optional[str], Optional[str], int, Optional[CacheStats]]:
+    """
+    task of compiler process, uses its warm parser and function cache.
+    diagnostics are returned as text: parser exceptions can not be pickled.
+    the process reports its pid and stats of its cache, which lives only there
+    """
+    stats = lambda: (os.getpid(), batch._cache.stats if batch._cache is not None else None)
+    try:
+        return compile_text(text, batch._cache, opt=opt), None, *stats()
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", *stats()
+
+
+def daemon_answers(socket_path: str) -> bool:
+    """ whether some process accepts connections on the socket, a stale one refuses them """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    server: 'CompilerServer'
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                res = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                res = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(res).encode() + b"\n")
+            self.wfile.flush()
+
+
+class CompilerServer(socketserver.ThreadingUnixStreamServer):
+    """
+    connections are served by threads, compilation runs in 'jobs' warm worker processes.
+    with single job compilation runs in this process, one request at a time.
+    each worker has its own function cache: stats are the sum of the latest ones workers reported
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, jobs: int = 1, cache_dir: Optional[str] = None):
+        if path.exists(socket_path):
+            if daemon_answers(socket_path):
+                raise Exception(f"daemon already listens on {socket_path}")
+            os.remove(socket_path)  # left by killed daemon
+        super().__init__(socket_path, RequestHandler)
+        self.socket_path = socket_path
+        self.executor: Executor
+        if jobs > 1:
+            # workers are started on demand, when threads serving connections already run: no fork()
+            self.executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(cache_dir, True),
+                                                mp_context=multiprocessing.get_context("forkserver"))
+        else:
+            init_worker(cache_dir, True)
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        self.served = 0
+        self.cache_stats: Dict[int, CacheStats] = {}  # worker pid -> stats after its last compilation
+        self.lock = threading.Lock()
+
+    def dispatch(self, request: dict) -> dict:
+        match request.get("op", None):
+            case "compile":
+                start = time.perf_counter()
+                asm, error, pid, stats = self.executor.submit(
+                    compile_source, request["source"], request.get("opt", "O0")).result()
+                with self.lock:
+                    self.served += 1
+                    if stats is not None:
+                        self.cache_stats[pid] = stats
+                if error is not None:
+                    return {"ok": False, "error": error}
+                return {"ok": True, "asm": asm, "time_s": time.perf_counter() - start}
+            case "ping":
+                return {"ok": True, "pid": os.getpid()}
+            case "stats":
+                with self.lock:
+                    served, workers = self.served, list(self.cache_stats.values())
+                cache = str(sum(workers, CacheStats())) if workers else None
+                return {"ok": True, "served": served, "cache": cache, "workers": len(workers)}
+            case "shutdown":
+                threading.Thread(target=self.shutdown).start()
+                return {"ok": True}
+            case op:
+                raise Exception(f"unknown op {op}")
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(cancel_futures=True)
+        if path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def main():
+    ap = argparse.ArgumentParser(prog="python -m driver.daemon")
+    ap.add_argument("--socket", default=default_socket())
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    ap.add_argument("--cache-dir", help="persistent cache of compiled functions")
+    args = ap.parse_args()
+
+    try:
+        server = CompilerServer(args.socket, args.jobs, args.cache_dir)
+    except Exception as e:
+        ap.exit(1, f"{e}\n")
+    with server:
+        print(f"listening on {args.socket}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+""" Whole compilation pipeline with per-function reuse of compiled code """
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import *
+
+from backend.hw.rv64 import RV64Reg
+from backend.ir.ir import IRProg, IRFun, IRGlobal
+from backend.ir2asm import RV64IR2ASMTransformer
+from driver.cache import FunctionCache, FunctionArtifact, function_key
+from frontend.astdef import Prog, DeclFun, do_parse_ast
+from instrument import run_pass, stage
+from middlend.ast2ir import AST2IR
+from middlend.opt import RV64IR2HIRTransformer
+
+
+def compile_function(decl: DeclFun, globals: List[IRGlobal], signatures: Dict[str, IRFun],
+                     opt: str = "O0") -> FunctionArtifact:
+    """
+    lowering, register allocation and emission of one function.
+    depends only on its arguments, so functions may be compiled in any order and in any process
+    """
+    lowering = AST2IR()
+    ir = IRProg([], list(globals), lowering.symbols)
+    hir = RV64IR2HIRTransformer(RV64Reg, opt)
+    hir.ctx = ir
+    fun = hir.process_function(run_pass("ast2ir", lowering, decl, decl.sig.name))
+
+    emitter = RV64IR2ASMTransformer()
+    emitter.ctx.functions = signatures
+    with stage("emit", fun.name):
+        emitter(fun)
+    return FunctionArtifact(fun, ir.globals[len(globals):], emitter.fragments.get(fun.name, []))
+
+
+def compile_functions(decls: List[DeclFun], globals: List[IRGlobal], signatures: Dict[str, IRFun],
+                      opt: str = "O0") -> List[FunctionArtifact]:
+    """ one task of worker process: program-wide arguments are sent once per batch of functions """
+    return [compile_function(i, globals, signatures, opt) for i in decls]
+
+
+def batches(items: List, count: int) -> List[List]:
+    """ split into at most 'count' contiguous batches of near equal size """
+    size, extra = divmod(len(items), count)
+    res, start = [], 0
+    for i in range(min(count, len(items))):
+        end = start + size + (i < extra)
+        res.append(items[start:end])
+        start = end
+    return res
+
+
+def run_batches(executor: Executor, jobs: int, decls: List[DeclFun],
+                globals: List[IRGlobal], signatures: Dict[str, IRFun], opt: str = "O0") -> List[FunctionArtifact]:
+    # few batches per worker to even out functions of different size
+    tasks = [executor.submit(compile_functions, i, globals, signatures, opt) for i in batches(decls, 4 * max(jobs, 1))]
+    return [artifact for task in tasks for artifact in task.result()]
+
+
+def do_compile(prog: Prog,
+               cache: Optional[FunctionCache] = None,
+               jobs: int = 1,
+               executor: Optional[Executor] = None,
+               opt: str = "O0") -> str:
+    """
+    AST -> assembly, same output as do_asm(do_ir(prog), opt).
+    functions found in cache skip lowering, register allocation and emission,
+    the rest are compiled by 'jobs' worker processes (or by given executor)
+    and stitched together in declaration order
+    """
+    lowering = AST2IR()
+    globals = lowering(prog.globals)
+    signatures = {name: lowering(DeclFun(decl.sig)) for name, decl in prog.functions.items()}
+
+    artifacts: Dict[str, FunctionArtifact] = {}
+    keys: Dict[str, str] = {}
+    if cache is not None:
+        with stage("cache lookup"):
+            for name, decl in prog.functions.items():
+                keys[name] = key = function_key(decl, prog, opt)
+                if (artifact := cache.get(key)) is not None:
+                    artifacts[name] = artifact
+
+    missed = [decl for name, decl in prog.functions.items() if name not in artifacts]
+    if executor is None and jobs > 1 and len(missed) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            compiled = run_batches(pool, jobs, missed, globals, signatures, opt)
+    elif executor is not None:
+        compiled = run_batches(executor, jobs, missed, globals, signatures, opt)
+    else:
+        compiled = compile_functions(missed, globals, signatures, opt)
+
+    for decl, artifact in zip(missed, compiled):
+        artifacts[decl.sig.name] = artifact
+        if cache is not None:
+            cache.put(keys[decl.sig.name], artifact)
+
+    # stitch: string literals and code of functions in declaration order
+    ir = IRProg([], globals, lowering.symbols)
+    emitter = RV64IR2ASMTransformer()
+    with stage("stitch"):
+        for name in prog.functions:
+            artifact = artifacts[name]
+            ir.globals.extend(artifact.strings)
+            ir.functions.append(artifact.fun)
+            emitter.fragments[name] = artifact.asm
+        emitter(ir)
+    return emitter.get()
+
+
+def compile_text(text: str, cache: Optional[FunctionCache] = None, jobs: int = 1, opt: str = "O0") -> str:
+    return do_compile(do_parse_ast(text), cache, jobs, opt=opt)
@@ -1,12 +1,15 @@
 import sys
+from functools import cache
 from dataclasses import dataclass
 from enum import StrEnum, auto
 from multiprocessing.managers import Token
 from typing import *
 
-from lark import ast_utils, Transformer, v_args, Tree, Token
+from lark import ast_utils, Transformer, v_args, Tree, Token, Lark
 
 from frontend.extypes import UOP_MATCH, UOp, BOp, BOP_MATCH
+from frontend.parser import make_parser
+from instrument import stage
 from utils import string_unescape
 
 """
@@ -228,7 +231,8 @@ class ToAst(Transformer):
         return DataType[str(s).upper()]
 
     def CNAME(self, s):
-        return str(s)
+        # same identifiers share one string object across AST and IR
+        return sys.intern(str(s))
 
     def SIG_INTEGER(self, s):
         return int(s)
@@ -272,10 +276,14 @@ class ToAst(Transformer):
                 return None
         return ExUnary(UOP_MATCH[cmd], exp)
 
-    @v_args(inline=True)
     def BOP(self, x):
         return BOP_MATCH[str(x)]
 
+    # binary operators are separate terminals, grouped into rules by precedence
+    MAT_PLUS = MAT_MINUS = MAT_STAR = MAT_DIV = MAT_MOD = BOP
+    LOG_AND = LOG_OR = LOG_LAND = LOG_LOR = LOG_RIGHT = LOG_LEFT = BOP
+    CMP_LE = CMP_LT = CMP_GE = CMP_GT = CMP_EQ = CMP_NE = BOP
+
     def start(self, x):
         funcs = {i.sig.name: i for i in x if isinstance(i, DeclFun)}
         funcs.update({i.name: DeclFun(i, None) for i in x if isinstance(i, DeclFunSig)})
@@ -289,4 +297,20 @@ transformer = ast_utils.create_transformer(sys.modules[__name__], ToAst())
 
 
 def do_ast(tree: Tree) -> Prog:
-    return transformer.transform(tree)
+    with stage("ast"):
+        return transformer.transform(tree)
+
+
+@cache
+def ast_parser() -> Lark:
+    return make_parser(transformer=transformer)
+
+
+def do_parse_ast(text: str) -> Prog:
+    """
+    parse text and build AST in a single pass:
+    transformer callbacks run on each reduction, parse tree is never built.
+    use do_parse + do_ast to inspect the parse tree
+    """
+    with stage("parse+ast"):
+        return ast_parser().parse(text)
@@ -0,0 +1,6 @@
+# generated by `python -m frontend.parser`, do not edit
+GRAMMAR_HASH = '34ccbdafa59964d5e9c42c277e830b39f8fe23fc34c12bd074e684a95ce031a9'
+LARK_VERSION = '1.2.2'
+import base64, pickle, zlib
+DATA = pickle.loads(zlib.decompress(base64.b64decode(b'eJztnQd3G+W6hU1wdwpJ6C29QHpCXINLHCeRx91yL2OVUUF9RmMpYINpsgNz+vAPWOv+zfsVKX4IOSYcHBbce85Zi+13NBq939773TMay8pWww89Vp3636Z/0WvMh2zHsn35c2vaKlu2GcllY6puKVp2JpkNpR1/xb+46Xsv9ftGnbPpJ5qNlzQc0PCyhnoNDRoaNTRpaNbQoqFVQ5uGgxoOaTis4YiGVzQc1XBMw3ENr2p4TcPrGt7Q8KaGtzS8reEdDe9qeE/D+xpOaDip4ZSG0xrOaDir4ZyG8xouaLio4QPH8hqT8WzOtiRp3oG5ad9rGhwfHR0aC/re0dGZkWBgJDA2ZNa2Wd6huGlbcatsxtKhuCMo9lpcxzLDj4qW4z+uyVJ8lLd8r1WoU7TKRTeU9r1mU201Td9rGZE7DUrpXK9Ni7qrZIPtpq2qiqLJD3WvlzRc1nBFw1UN1zRc13BDw00NtzR8pOG2hnYNHRo6NXRp6NbQo+GOho819Gro09CvYUDDXQ2DGu5pGNJwX8MDDQ81BDQMazA0jGgY1TCmYVzDhIZJDVMapjUENcxomNUwp2Few4KGRQ1LGpY1rGhY1WBqWNMQ0hDWENEQ1WBpiGmIa0hoSGr4RENKQ1pDRkNWQ05DXkNBg63B0VDU4GpY11DSUNbwSMOnGj7TsKFhU8PnGr7QsKXhSw1fafhawzcavtVQ0bCtYUfDYw3fafhegydGqsEphuyiMHDix9ATe+uJqE+H0raf6PFaJ9RmPQOJl1S6FXMpK+vIGRBT1ZpOFk2naCezcd94yWuSZTJb9I0DXnPetiJmxk37xsteqyrcbMh+5Bv1XuvM+IQ5MTV0PzDvGw1eoxhU8UzfaPQOqh3zOacYS5Z9o8lrmJwZDw75RrMYTbGPZYspNVq8ZvlKkUTI9o1Wr2FwbGBU7NPm1Y9MDEz5xkGvSRwyEkqLfQ95reLnJ0c87LVNBx6YgbHg0IMhsesRr0U8bEfNdXmsV1QlelD7HhWvKcpQMZfxjWNe8727I9VujnvHTUGZlf1M7CB2d5xkLrvpG696TWoBVsE3XqtSEMnkfeP1ahGKRn3jjSofTiIZE6t+s/qknGjgrep+aVm8XXtSVjzpHe+o6Vj5p17wXa9F76/2ec9rw8O+8b53TD7n+lNPOuHVTymeTnr1QyPTYj2nvMapu1MDg+LH016LMWdODQVnpsZ844zXJqrB8bFgYGxGPHrWa5h7GBgRP53zXg4uTPjGeU+MsHl3amjA8I0L3oHAfd+46NWfHRq75xsfeC2jA0FzVDx52jc+9BoHRyfMoUnfuOQ1jYw/MEfGRReXvWa508SI3OeK1ySLe4FZ37jqNcqd5D7XvJbpodHA4PjIuOjquj6QbOOG/vFB0Ddu6mMOyBe+pQ8zOi5+/qi6t9jltn6p6aBcfbswjjhjDPhGh9esulFP7aweURy8q7p96L54brc4I4hiKvDgoah69F5jYq87Xpvy8/h0UBn6Y+/1mjkU+cJZppOMbwrme73jUSuSNmNuVm6Su4Uy4vzU5zUMTc4MjPhGv3fYNNVoqv+a131jwDvIJ/nGXe+gqbbE07mwnIdBr7m2h2/c846oQjy9mIxoXw8lfjTue03VTnzjgdfmFOVD6ji+8dBrFHXIEU8PeK3qqVbGkoM87L1qmrsbHN3VDd8wZIKYyZhvjHjN4qdSIpm2fGPUaxGFbRVdWxxszGsSTxAjIMw5Lsy5exzfmPDe/glN9KigalKMWNgORazP8Cyxfco7FE7nIikxLiIQsuIlp4VNquYNeg3qQd+Y8Rqng1OBsQe+MSv0MNXs1JTQi7jpG3OC7Z9o5Bvz3qGf7OsbCyIy1KHMwYfSN4uicfNns6iPeUtcKzSqfqsRqf4j/v92RQSkwCMCDwg0Bb4s0BZYL/AHgQ0C/yqwUeBjgU0CtwQ2CzwjsEXgqwJbBf5LYJvAEwIPCiwKPCRwWuBhgdcFHhGYFfiKQF/gUYHdAo8JbBd4XOBnFd81ZLIbr4rqW7H1Wd3eE/iawE8Evi5wHt2/ITD1G1bxpsCcwLcELgh8W2CTwHcEZrC62mqfXuW7AsMC3xP4z+dY9fsCb+2u3jghl6/Ot5KKA5IK+dD47ku6xsty68nqjptiR+MUiyYWrSwOszjN4hiLNhZnWNSzOMviHIvzLC6wuIjCNerlQmq9b7P3bfa+zd632fs2e99m79tsapsL2eZCtrmQbba7zYVsq3YbZLu1FVzmC1xWjzfKxz+obvpEPv4hi0ssLrO4wuIEi6ssrrG4zuIGi5ssbrH4iMVtFu0sOlh0suhi0c2iB4VrNEkmbgq/hrCgCS5ogi80wRYmyNUE1z2hjt28KbfUGccrvmO0bO4e/5Ejt7RqEeqMrxXLIj9A1grJWiFZK5RrhWStsLkVNrdCuVa4uhUyt8KlrpDGFdK4QhpXuO4Vte62fxfetTgcfQFx+Etx99yhfnCv7p/u+td2K1d5+0V0fWgvM63STKs00yrNtEozrdJMqzTTKs20SjOt0kyrNNMqzbRKM63STKs006oy02FG2beMsm/V40cYZQ6X47Bph1HmMMocLsfhchx245BDhxw6TC+Ha3NIqMMoc8iuKu6w6GDRyaKLxXUWPShc4xVJS7vwQRmr+1o9dFQ+9LF4yKkaryCwV+CmwL7qrte49mvqeceqcXZNhtdxnhC7eELs4gmxiyfELp4Qu3hC7OIJsYsid/GE2MUTYhdPiF08IXbxhKiKkyhc41VapkjLFGmZIi1TpGWKtEyRlimStiItU6RlirRMkZYp0jJFWqZIyxRpmSItU6RlirRMkZYp0jJFRctrkpZ+IfDriv86IyFwQODfBd4VeFjgoMBHAu8J3BA4JPBzgfcFliq7l02X1CFfl4d8+lBPH6L2VPkSgzjEh+oQb7zoOP7+RcTxm7Lr06JKiq0PBJ4W+PQ7hYcCK1UCJp+xuto7hwsCDwgMCKzHqmunzF9a/bDAqT1YkKs/X/n37ygMgZ+qMawzvnkOlvjO4mbVS94z2BsReEmNap3R/ww2RwU2CxwTeEwNe52xJnBc4Me7bD+JoQfKMG89602ZbGl2D4pf1JuzGoX7Zqy3mV0us8tldrnMLpfZ5TK7XGaXy+xymV0us8tldrnMLpfZ5TK7XGaXy+xymV0us8tldrnMLpfZ5SrR3+HpaIenox2ejnZ4Otrh6WiHp6Mdno52eDra4eloh6ejHZ6Odng62uHpaEe1++6mlnZYnkrf4xXOdb7adbXz+1xbB9fWwbV1cG0dXFsH19bBtXXw1Tq4tg6urYNr6+DaOri2Dp5qO1TvJ37LHRKZHxP7OIxP59rz5thzD+dJDmeUwxnlcEY5nFEOZ5TDGeVwRjmcUU5DlJMa5aRGOalRDmeUwxnlcEY5j1HOY5TzGOXcRzmPUaX7KXq2l57tpWd76dleeraXnu2lZ3vp2V56tpee7aVne+nZXnq2l57tVb2frl7nDsnhPENJs5Q0S0mzlDRLSbOUNEtJs5Q0SxWzVDFLFbPkPUtJs5Q0S0mzzNss9c1S3yz1zdJhWeqbVRydlbTI65auypPzu2uck1trQg9TzmHqNEwFh6nGMHUapjTDtM0wbTNMpwzTKcP0wzD9oIpTKFzjvOxdJsFL4qEJgT0V+W6ozvhSYM0AGRogQwNkaIAMDZChzBkaIEPNM9Q8Q80z1DxDzTPUPEOZM5Q5Q5kzlDlDmTOUOaNIubAfl7GTApcrP7+c/bXXXFMCP0LcTwt88xmxHxR4p/LnuayVl/XnKruXt09OJxdrQ9bBIftgc9dOtxyZUR8yoyxa1KJFLVrUokUtZpRFi1o0r0W3WDSvRfNaNK9Fv1r0q8WMsuhXi3616FeLo2DRr5by6yWedtp52mlnfrQzP9qZU+0Mk3aGSTtDq51x1s6YaWfMtDPO2hl07cy2dtX7ZaqYooopqpiiiimqmKKKKaqYooopCpeicCkKlyLVKaqYooopqphiBKUoaYqSpihpiqZKUdKUouWKpKVHmH9FMVJntGGV02x/mkue5qtPs8lpsjlNZqbVC179I/5S7+lskhn01R4Z9dyXrNc4Md2cmG5OTDcnppsT082J6ebEdHNiujkx3ZyYbk5MNyemmxPTzYnpVkpd58Ssc2LWqfE6J2adE7POiVmnfdbpi3VOzDott86JWefErHNi1jkx6zTjOidmnZ5d58Ssc2LWOTHrnJh1RcuNZ/1Ka5Krm+QLTbKfSRI3SRIm1bFvVq+Nd+R555b6lVadsS6Lj2ikfhqpn0bqp5H6aaR+GqmfRuqnkfpppH4aqZ9G6qeR+mmkfhqpX63qtuy9W6zkL4rmOiMKwecp+DxdNk+N50njPGmcp8vmqcM8NZ6nKPPUeJ4az1OUedV+u9BhRnT9rtShQ9/4149/x5f+Tu3c+XvEm4ytG3vE3L7dDuviah9ztY/VarsZEQmKl6BECUZEghGR4DETFC9BIRKMiAQdk2BEJBgRCdonwYhI0EsJRkSCJknQPglGRIL2SdA+CUVLD2lJk5Y0aUmTljRpSZOWNGlJk5Y0aUmTljRpSZOWNGlJk5Y0aUmTljRpSZOWNGlJk5Y0aUkrWu7w/WuA4RRg6gSYRwFmS4CpE2DQBBiCAYZggLkXYO4FmG4BppsqTqFwjY835ZY642UZAr0cC49aeWrnvtpvB8+Kh2YFrmKXr9Qu/Xibcc+RBx3AlkG15a48jJzxD5AltQyozXxtpmsZU51h1xjkfc8KOa2oDu7Jx2+Lvf+hrFJnfKEMWGcsVnbfkZs0r0nzmjSvSQ5M+tWkRU1a1KQrTbrSpBFNes+k90x6z6T3THrP5MSYaulDPJl28mTaSR910ked9GsnTdVJU3WS6E7aupN266TdOmnrThq+kx7vVL3f3+tkukSCl6jdEgleIsFLVHWJQi5RyCVSv0RRlkj9EqlfIvVLqv0Hm9rCD6XBHzInS2y3xKZKtFqJOVliuyW2W+JLl2jCEjkqMSdLdGSJhJWYkyWyV2JOlkhLiYSV6NUSCSuRsJLiKKA/1ldn5BFDfbRpH23aR5v20aZ9tGkfbdpHm/bRpn20aR9t2keb9tGmfartYapZppplqlmmmmWqWaaaZapZppplqlmmmmWqWaaaZapZppplqlmmmmWqWaaaZapZppplqllWtBjI9Tsq10ckUbVNn8lnTKNwjVH5+A2hv6tes854Q71CnXFQLaLO+BvWPEOiZ7iYGbI+Q25nyO0MlznD/mfI+oxqbYwaR/jSEb5ahBpHqHGEfUTYR4SvFiGpEQoeoeARCh6hxhFqHCEtEa43QlkjlDVC+0RIS0QxMf5Hunf7e92zlfeIA5U/wL3biep7Y0vO06SUQv4uYRsO+lipNPUiPiiyn3el9lKjpkJNlafVkOy88zuq8ZQKT05N9xXV04yGJKMhyWhIMhqSjIYkoyHJaEgyGpJMgyTTIMk0SHJ+k4yGJKMhyWhIMv6TzIkkcyLJnEgyqZLMiaSiJbjX9doC218gZwvseIFNLpDNBXK2QM4W2PEC17LAjhfY8QJ5XlDtz1QHbUQO2qxcS4eo4uhnlP2Msp9RHm5UHW6Ob0qu8CLkinp8fq/P2S5T+WVSt0zqlkndMqlbZqvLbHWZ1C2TumVSt0zll+mwZfK4zIUvq4UtyIVdEgt6C/0YbMHgkwz1pMVnfTjvP733LdPqZGUf/zxn6XneQIaoTIj8hxgEITIRohghih6i6CHyH6LoIYoeooAhShuimiFORYhqhihMSAmzzD+8eeggC1XRxKKVxWEWp1kcY9HG4gyLehZnWZxjcZ7FBRYXUbjGyi/9LcF3lT/w3xKs1u6zXIR7vlQLM5/HnGs05xrNuUZzrtGcazTnGs25RnOu0ZxrNOcazblGc67RnGs05xrNuUZzrtGca2rpa7WPWpyocnVBbg3Vbkxfqfz+v3fbN8XDzzoDjVC5EYo1QnZGFDsRfbGoN/3sY/hPjnmNh9Ef0I/uNSu/9CFhyWjrczC1b+ls8XJsg0bfIF0bNPoGL8c2yMAGXb9B1jY4AhscgQ1ejm1wHjY4Dxu8HNugBhu8HNvgpGxwUjY4KRuclA1OygaTWRXTLFpZHGZxmsUxFm0szrE4w6KexVkWF1icR+EaManfVaFmJxgZp3TjFGic9IxToHF1uPiv+b1UzcxPfxL+Px3//fqYtnyjFKPJE5v6RY7Kq9Pkn+GTBf/pJwrke7n07tKfqHtXqfvJr7ljFGQYBDlwQdorSHsFOf9Bei3IGQvSeEHVWmqv9z9zzIs59jXHiJhjk3Nsco5NzrHJOUbEHDueY0TMsf05tj+n2k/j7t2AI22WwV+afq62ZBm1Nldhs1ebUWszam2uwuYqbHZkM2ptUmczam1GrU0ebUatTVJtRq1NtmzyaDNqbfJok0dbUZd7VoKNkZExrnuMrzrGdY+pw+X/P95we9G3duQNvVOV57jhVpDsz4lqBq8qWe4TOC+wBVJ+qgSzORZhjkWYJghzLMIcizDtEeZYhGmPMH0Y5oyEOSNhzkiYYxHmWIQ5FmF6MsxJCHMSwpy4MCchrJhweMP/Ji89bqrHi2SqQKYKZKpApgpkqkCmCmSqQKYKJKdAcgokp8DlFMhUgUwVyFSBAVIgbQXSViBtBQpXIG0FRYv7ov828X7lBbxFWaeYWxRzi/ptUb8tSrZFYbZI/xbp3yLjWyR5iyRvUcwtkrxFb23RJ1v0yRatsUVlt6jfFi24RWtsKTFLtZv0d/FCH6mHys9z4SYTr7fy572Ae+KPR7wFetWp7L5zuKrY+JQfTrjtVHbftKiilcVhFqdZHGPRxuIcizMs6lmcZXGBxXkWJ1G4xmf0fo7ez9FsOQ5CjoOQo4tynIocDZqjQXOclxzdmqP3c5ykHCcpR7fmOFY52j3HGctxxnIchBxnLKdo2ah+rHNOXi1u8mRwgyeDG2rnz8XOX+z3jd8PK/t4a2FLfvuUKB7I5Xz5f/1d1wCX/hU/+fU9zfq9Eu/rf3fKWqr8gb5Y6xu8qRlypIrf7vVnAFMcsCkO5RTnY4pjNMV5n+LsTimiKtWReF+++vZv/TNW40/gpSfs7zDgexjwPQz4HgZ8DwO+hwHfw4DvYcD3MOB7GPA9DPgeBnwPA76HAd+jZHsse78jVnK5snsbPcagj1H4GIM+xqCPcXZi9FSMZokxWWNM/RhNGWPqxxj0MQZ9jA6N0bsxZnuM2R7jOSTGbI8pRr77NbdeZsnULLuZJW2zJGeW5Myy6Vl2M0vaZlVr3+9162WR/C2yr0Xyt8gmF9nkIptcZJOLJHORHS9SzkW2v8j2F1X7XvXmXkRGxF9+6833Q79nwP6V10F5kpsnhXmOR57jkSe5eZKbJ1F5TkSeiuY5EXl6OE958xyPPLXO8zooTxHzlDfPWclT3jzlzStF/7Yfb+hkzgefQ8x9e0P3d33BVmc0VHZvIMkbPO9VntwAco1/7Ocl2y8ZUXI09mvW8M/ab0qviq2LAl+Bv75R4vzrWX+h/Zv/MvsEi5/8ZfZP/mZ7f/9Mu53FPv/Nts/RjpOWOGmJk5Y4aYmTljhpiZOWOPuIk6M4OYqTozhpiZOWOGmJk4k4mYiTiTgZj5OJuGLih9/T8b/kdDkRjXC86x188nXF+ltvEz8arzleq5WN/mTb546b6PGOyK8UT2bj9235rfvZqO8m+lb++yX6//0S/T/ll+g35fLFZE5/Hb7XELXCbtx/LL8A2k5GiuKnIynLypuhdNqsfm3+Y6+1aFuWGUmHHMcf8xoioUjCEpub5DfUp62yP5Z4KfE/XoP6Fyr8RLfXVrRDWSeWszOiHkv8uKK+sL85bydzdrL4yPcas+Ix+W9XtIQy4WTcVRvrQ24x53sN6l/BEIc/nrdz+VBcTKP8Kvykblr0V/33SUSH4VAkJdfhHcuEHoXFbulQxErk0lHLdvwd77AVTRbN3X++ZCzRYdQlOh97B3O22MUSs24V5Y4Hk5l8TsRBPlRMyH8fw2tzcq4dsdQGseJmcWQ3nlScyUCoHwnZKd+9+r8oBhg4')))
+MEMO = pickle.loads(zlib.decompress(base64.b64decode(b'eJy9W1ts29YZtu6yYifNdU3SNo26JJIdx0narpfETh1bcdQjSo4sN2kth6UtOiItS45E5VLLXdddGrd6GFDuYcC6hwF729OwYdgG7GnD0PVlA4pdsL5swLa8bC8rNmDAgB1eJJ6jw0PSItcgkG2S3/m//zv//5+f5NFboW/w6QH135acAMpHO1jl1nm5HWWmCuxcZmFebkc2OEni61VZOR26w1Wa8LxvVG6HVivcrYa8JLcDde4u/IyPxiGSZaX7GzzLyu3YnIacl+pysx3dqAu1uiDdl8FAeai9q8DX14UqV5nhV+Um8MHRy/72oGKXSWeh4XJQORRu+8bkcnRJLseggbG4XB4qDzfLu5UxynuawK/hVL7zham8ARsxYCMELKDBIgpsJv2KgRo3UOMEKoigmNyMgTphoE4QqJCOyuRm2aksgjppoE4SqLCGCiuoHOJWywC1CFBEV0MBZVBb/pNdY8H4SdJaFOGYQcz5Wy0D1yINDurTpuDy6dmrBQM5OWkgJycJZAylmrqCAC9eNIAXLxLAXbow08wcBCKwCQQ2QcCGUJhhzXfR0JO0NYyAZhFbk4itSdLWbhSG2Jo0bJGC7EFAqWuGrQnE1gRp6xEElkUoHkdgx0nYXg0WW8jNsXP51JX0jS50V+LSi8dbxTdbxbGkPka2HWbvCiWpDLM9AXzAx8MMHtTTO5+SkYH3aQPvUgfOzRfQkYfhyMWx4lirOFoc7Y5dbiqD+oEfDlq+iwy1Xx8KXGenc9kCrAqGf9GVWlUSqrAW6V7G4p0jhK8H9FCD41zOp6ZAd5DQcp3n1jojROLqnwT8oB7jEJ5PFRby2S4+XOelJqyM+gDRuPY3McIhbYRA4dW5LvbRxEqZq7eEqtRqSHWheqt1pyaUksXlzmhHxmlXwBqlShYA4a5kfs3S5zRLoensFGOI9SzUHf5f5MbeWGotTo29tpRssUntYO/xxbNjLyzBs8kRfH587w4O6P98vRP1qD5R8+lZNp0tpGZTecRP1UZxVAmn5CXFnGIhOep8+MOd4Qv5dHaWnb6KlPlHFm/Gi8WlVrG4WJWU3zry7RvvPdORzUdG2hE9iTQL3cEPKmx7RtkJ8aPasP7r81hyLT45OBzb0UCP6eV5OscwqaxRUQaL40XoZ2ypu9gNjWuHitWlkY7DfouRH9dG3sssZArpTDqbYnttDI8XRxJnWrHkyKXiyDjOOWgx8hN62synmPR0LpMz0sZ3waiDF4hkOaaHcOrawlTGwEwYGLKaPalhgqnMvBH1Qb7S6JaHcFz5iwAe12cofcWonMKqUTmFVQIS1/ldv5pGlp/Q3bJQ4Y1Sov5JYJ/SsdcWcgUD6ztl+HaKwHxer14zlzM9sLjBsxgncCd0TTJzaFeUMEwlCMhJHZLHIEkDkiQgpzptyuX81DTCbdMAbRKghA7K94C2DNAWAUp2ShuMzykDc9rAnCYwI0rPGoZd5y1B7V+VFa/C1dfOVPh7fB22sIXaGl+V31ca3/wCnM52qCFxdQm2qMoqJ8lQBtiqZmvVTrcKG9lB/t4GV20ItSpcDbVBd7OsilM/2bMQJB70DQw0uXaoVi9BS2CgHeIqAteQs+1IbUOC4IbaUO9Z4/kNlqtUWEmh0pC32xF1/NI5ebu8O9veI/HrGxVO4tlGrVlf4eEAw/CIdJ8VqiVhhW/ISYVivlnhc/q4TXggqByAffUoNCIO+dQOv+wXD8DfOuTEQ/BzSRaPwB/AJx6FP7LiY9ql4hPw57Z4TPmELMQn1ZPH4Se0JsYVOPz5lPITnMZNPAJ/S4h74Wd7iC3xKxX2VqW2DJUDH4DdHU0xBno4DKkXrzarbEO41b1GPVf+eTu2KlRgt8HWmpL8ADoYNWaE11wY6N+FMdyF06RKOsc9Kkc4y5Kwwt7h6r00xXPwD0hPPK8c5F1re8aWmF4dOtoZoafZ9vdve5w6rxHouTpJ4F9gn9WUqh2Pqsl2RxOsQcFPuZ/Hs1TKhkBMzAcO9BmHsGOs1FbWugfdMz5HTx6MBpPwgUPeSa2d2o+aYDe4Orfe8NC381TfTA0zCz7wqKmLGttDyoV8dZNt8BtnN/UQ3NrqjXgXhJ+mEibynnnbB45YzUc3R/AK8Su8QujZy1YEWNtgLfNO/GdwX25TKocoISc41/XqWaqCMVU9fp2vSjLzUx84ZjHTcBFmlS7Ms4n9Ak7rbYoY7Sg0rDdynknynK3tTjsEjXONqqMlxUVZf94pn12QjxLESug7IhXon9QLTkkNQlKdu24HlIL9U3rRKaUIjGx2Zb3kiFCof0IXHE8cCzvIOt9QW1QnpML9k7pITXgsfJgzfvCUV+XS1D/3FXMCd+UHlCIh/sjnZcWcpAqoV0HmFT84YSFd+bdmGu3vLJaGVFs9vcyw2suwtTpcfap8j/C/NhuUgnAv/SVchF/QQtvUV/FD5HLtyEfIkZ024Ynt7e0HkkxwfIneW3ZXDeZbfnDKaq4+8Xau3Cs/RfUKqbTMb/wgaeXWe59hml7GGT+kpGkvJ/eZOk2VqrNyM//0g1GrKkfvxT/TSjdDv7PrrGXMvgAYs2jRjIfpuDPue7UUTi7gp/Rq2GsBUxIu5voKfVkz+lh4y5IKgPMWKh1gWeRy7enQOQ/72lmc5j5SK9dKXKWvT9q9MHMzAJ620GA/u1znVvhNRAgv79nSVH49NZPZDIBnrG468Ft798xexpklaIGM3hl511cAiwhGigpzPgguWOU5vHKFrdTqHgqToa+kXWvMy0EwAfxUXoPalVy15JzYAztiDE7sJXLGEjRV9C628/7c7GmLCWWsN1EeLLPLQpWr35f7YZ+lL+WGZeb9IHjJQteIeulOptuWVw7nVaCqaiKQLnd3P4OZrgRlT1Wdo6+VHbvMJ0EwbaGpFi3ehuo1nFaZKiqhzpb+wkbbV2ImKMnXU0XzNumvhumxELhiG6b8bQ8VncdptWySn4zS7gYfepAihD2VtGATpNAuUwqBtG2QrqxveCjpAk7r6zZBiqijB6m+F4YepChfTxV9xSF18Zv+npvP7lYcE9biB37ixlR7lCd+G57ph+h1m2xSFGK+HwIZi7mPqVc2ysIq0YG4mP0bOLPv2SQUOpWIkBnzVxdmlD0NgFcdshd/aB4AmYJpAPyYGgA/6TMAXnNJdNY8Uk2IBtwRXXRL1LGiQXdEi9SUQqOOORwGOftVv+Tlqr+EM/s9NaXM0gPtpZQNlxZLf+n/tPTfdMhf/BMRAsgWU7Mo+As1r/7aZxSwdm0KFIlphkHeNgbWmxUPY+B1nNendn1Kieimu3u76RGAUvY0AjiH7MX/khFg7A03iwBfgBYB/kB/EbBsEwGKSMxHYbBgu7Q2Vb28i4GVHmYB6xhAZxOJAXW/PH1xxUl7GgUlh/zFw4HeKOhu2TeLgcepMfBEnzHAu2SqfE3AIdOAO6arNquWNp3MWATcsIjXIfXajVpDWhXueRixt3B2z5A66kkOAwtSMDGuR14YXtCsbfQVdmWqRLjbjBABi1ZlnYUkOKm27qFAAs5thiZQTBHIfHo8UEikKoRMDPPdCLhp9ZoD/VbBDuuLi8eKa/QEQDRjfhkBr1tu/zLNAO0c9q0GrzevVaj8I5D/CleBq83fI2C5vxdM7SPY9in0XeOWh5OwbhlA9ZK2eeq5KFi1ehRv5oX7585VKjclZSoC7OnTUVC2ehpObNRyz6pG7zK6ZYZZjALR8h2LxRtk9xQ3cIrv0GpTR0bTutSX5dsOLXczpMe0i31SdYemkbjuMe5iP1TDIig6Icj8LApuWwRFBF7ICuRLJReBIOG0vkPTJKqYVr695GEoNB3ajim2tS9MeRgNd+jFuSMz8+8oaFrMB/b1KK9r2116wHTnghkaBHestnH82XQPAvq1K7OdCz0o92vIPfpCjswtMzII7lp589DMm85XvMwceei1I/cxR9q78Z3L5lEyrFxEXuM8QrBX9KpFGbwAIppSFKJv4Ip/TOaW4/QV/6jcv5ib2cTNrPlo27z+YbbN6+PeO6zyp/1OGLb2a2unDDIgailSC2f/4Y7YW23K9MIN8W9QHVsXtnAX4rSnL+X/mLuAbH3BXBAHFAqeTIa6WUSGdSpm6cmbeGrtI7ta8/Taq6aXyz4J1f0Piu52+fVFXHdf0EV+RYLU/HoLN1OjPawwzy+U1WcdmF/Cmf+O+kDLfJ9w+5Cy0Qqpm9pWq/N93Nig0RhUxpTBCRC2JP+2LXntxGFEYOf9kHiMPuFfxi0Hybiy3RIO7wtZIic0+Z52J5/4OKRjK95XbF3QTiT7E+8MXbyv4pYP+ygNJf4tRu+a6a/Z2k+QZ7QjzweJp4cuOut3cCIH+9io5kKGB7bWE+QZ7ciMpzJs40SO0pJJDPt6Fzsyv903j+86pXO0t27vhKALvd7DCY7uWK+kp3q1ndIZdayXCcH+9Wqe+R/G1Igf')))
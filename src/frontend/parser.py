@@ -1,9 +1,97 @@
-from os.path import dirname, realpath, join
+import base64
+import hashlib
+import os
+import pickle
+import sys
+import zlib
+from os.path import join, expanduser
+from typing import Optional
 
+import lark
 from lark import Lark, Tree
+from lark.grammar import Rule
+from lark.lexer import TerminalDef
 
-parser = Lark(open(join(dirname(realpath(__file__)), "grammar.lark")))
+from instrument import stage
+from utils import dirpath
+
+GRAMMAR_PATH = join(dirpath(__file__), "grammar.lark")
+TABLES_MODULE = "frontend.grammar_tables"
+TABLES_PATH = join(dirpath(__file__), "grammar_tables.py")
+# empty value disables on-disk cache of analysed grammar
+CACHE_DIR = os.environ.get("CC_CACHE_DIR", join(expanduser("~"), ".cache", "c-compiler-rv"))
+
+
+def grammar_hash() -> str:
+    with open(GRAMMAR_PATH, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def cache_path() -> Optional[str]:
+    """
+    cache file for analysed grammar and LALR tables,
+    versioned by grammar content and lark version (lark also validates its options on load)
+    """
+    if not CACHE_DIR:
+        return None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+    except OSError:
+        return None
+    return join(CACHE_DIR, f"grammar-{grammar_hash()[:16]}-lark-{lark.__version__}.cache")
+
+
+def build_parser(algorithm: str = "lalr", **options) -> Lark:
+    """
+    build parser from grammar at runtime.
+    'lalr' is linear in input size and is cached on disk, 'earley' is kept for debugging the grammar
+    """
+    if algorithm == "lalr" and "cache" not in options:
+        options["cache"] = cache_path() or False
+    with open(GRAMMAR_PATH) as f:
+        return Lark(f, parser=algorithm, **options)
+
+
+def generate_tables(path: str = TABLES_PATH):
+    """
+    write standalone module with serialized LALR tables,
+    so that parser could be loaded without grammar analysis.
+    the module is committed: regenerate it after editing grammar.lark, with the lark version of poetry.lock
+    """
+    data, memo = build_parser().memo_serialize([TerminalDef, Rule])
+    with open(path, "w") as f:
+        f.write("# generated by `python -m frontend.parser`, do not edit\n")
+        f.write(f"GRAMMAR_HASH = {grammar_hash()!r}\n")
+        f.write(f"LARK_VERSION = {lark.__version__!r}\n")
+        f.write("import base64, pickle, zlib\n")
+        for name, obj in [("DATA", data), ("MEMO", memo)]:
+            blob = base64.b64encode(zlib.compress(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)))
+            f.write(f"{name} = pickle.loads(zlib.decompress(base64.b64decode({blob!r})))\n")
+
+
+def load_tables(**options) -> Optional[Lark]:
+    """ load pre-generated parser if it exists and was built from the current grammar """
+    try:
+        __import__(TABLES_MODULE)
+    except ImportError:
+        return None
+    tables = sys.modules[TABLES_MODULE]
+    if tables.GRAMMAR_HASH != grammar_hash() or tables.LARK_VERSION != lark.__version__:
+        return None
+    return Lark._load_from_dict(tables.DATA, tables.MEMO, **options)
+
+
+def make_parser(**options) -> Lark:
+    return load_tables(**options) or build_parser(**options)
+
+
+parser = make_parser()
 
 
 def do_parse(text: str) -> Tree:
-    return parser.parse(text)
+    with stage("parse"):
+        return parser.parse(text)
+
+
+if __name__ == "__main__":
+    generate_tables(sys.argv[1] if len(sys.argv) > 1 else TABLES_PATH)
@@ -0,0 +1,180 @@
+"""
+Per-pass timing and memory instrumentation.
+Stages report themselves through stage()/run_pass(), which cost nothing unless recording() is active.
+
+Number of allocations a stage makes is not measured: CPython counts only live blocks
+(sys.getallocatedblocks, tracemalloc snapshots), so a stage reports blocks it retained and
+the peak of traced memory, which together bound what it allocated
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, field
+from typing import *
+
+
+@dataclass(slots=True)
+class PassRecord:
+    name: str
+    fun: Optional[str]  # function processed by per-function pass
+    depth: int  # nesting level of stage
+    start: float  # perf_counter, seconds
+    wall: float = 0
+    retained_blocks: int = 0  # net change of live memory blocks: kept after the stage, not all it allocated
+    peak: int = 0  # peak of traced memory over its level at stage start, bytes
+    ir_before: Optional[int] = None  # IR instructions in pass input
+    ir_after: Optional[int] = None  # IR instructions in pass output
+    pid: int = field(default_factory=os.getpid)
+    _peak_abs: int = field(default=0, repr=False)
+
+
+def ir_size(x) -> Optional[int]:
+    """ number of IR statements in IRProg, IRFun or list of IRFun """
+    if isinstance(x, list):
+        sizes = [ir_size(i) for i in x]
+        return sum(i for i in sizes if i is not None)
+    if hasattr(x, "functions"):
+        return ir_size(x.functions)
+    if hasattr(x, "body") and hasattr(x, "layout"):
+        return len(x.body) if x.body is not None else 0
+    return None
+
+
+class Recorder:
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.records: List[PassRecord] = []
+        self._stack: List[PassRecord] = []
+
+    @contextmanager
+    def stage(self, name: str, fun: Optional[str] = None) -> Iterator[PassRecord]:
+        rec = PassRecord(name, fun, len(self._stack), 0)
+        self.records.append(rec)
+        start_mem = 0
+        if self.memory:
+            # peak is reset for each stage: keep what enclosing stage has seen so far
+            if self._stack:
+                parent = self._stack[-1]
+                parent._peak_abs = max(parent._peak_abs, tracemalloc.get_traced_memory()[1])
+            start_mem = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._stack.append(rec)
+        live_blocks = sys.getallocatedblocks()
+        rec.start = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec.wall = time.perf_counter() - rec.start
+            rec.retained_blocks = sys.getallocatedblocks() - live_blocks
+            self._stack.pop()
+            if self.memory:
+                rec._peak_abs = max(rec._peak_abs, tracemalloc.get_traced_memory()[1])
+                rec.peak = rec._peak_abs - start_mem
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent._peak_abs = max(parent._peak_abs, rec._peak_abs)
+
+    def run(self, name: str, fn: Callable, x, fun: Optional[str] = None):
+        with self.stage(name, fun) as rec:
+            rec.ir_before = ir_size(x)
+            res = fn(x)
+            rec.ir_after = ir_size(res)
+        return res
+
+    def to_json(self) -> List[dict]:
+        res = []
+        for i in self.records:
+            d = asdict(i)
+            del d["_peak_abs"]
+            res.append(d)
+        return res
+
+    def chrome_trace(self) -> dict:
+        """ trace event format, open in chrome://tracing or ui.perfetto.dev """
+        return {"traceEvents": chrome_events(self.to_json())}
+
+    def table(self, aggregate: bool = True) -> str:
+        return format_table(self.to_json(), aggregate)
+
+
+def chrome_events(records: List[dict]) -> List[dict]:
+    return [
+        {
+            "name": i["name"] if i["fun"] is None else f"{i['name']} {i['fun']}",
+            "cat": "pass",
+            "ph": "X",
+            "ts": i["start"] * 1e6,
+            "dur": i["wall"] * 1e6,
+            "pid": i["pid"],
+            "tid": i["pid"],
+            "args": {k: i[k] for k in ("fun", "retained_blocks", "peak", "ir_before", "ir_after") if i[k] is not None},
+        }
+        for i in records
+    ]
+
+
+def format_table(records: List[dict], aggregate: bool = True) -> str:
+    """ text report; with 'aggregate' runs of the same pass (e.g. over all functions) are summed up """
+    rows: Dict[Tuple, dict] = {}
+    for n, i in enumerate(records):
+        key = (i["depth"], i["name"]) if aggregate else n
+        if (row := rows.get(key)) is None:
+            rows[key] = dict(i, count=1)
+            continue
+        row["count"] += 1
+        row["wall"] += i["wall"]
+        row["retained_blocks"] += i["retained_blocks"]
+        row["peak"] = max(row["peak"], i["peak"])
+        for k in ("ir_before", "ir_after"):
+            if i[k] is not None:
+                row[k] = (row[k] or 0) + i[k]
+
+    total = sum(i["wall"] for i in rows.values() if i["depth"] == 0) or 1
+    lines = ["# retained: net change of live memory blocks (allocations are not counted), "
+             "peak: traced memory over its level at stage start",
+             f"{'pass':<36}{'runs':>6}{'wall, ms':>11}{'%':>7}{'retained':>10}{'peak, KiB':>11}{'IR in':>8}{'IR out':>8}"]
+    for i in rows.values():
+        name = "  " * i["depth"] + i["name"] + (f" [{i['fun']}]" if not aggregate and i["fun"] else "")
+        ir_in = "" if i["ir_before"] is None else i["ir_before"]
+        ir_out = "" if i["ir_after"] is None else i["ir_after"]
+        lines.append(f"{name:<36}{i['count']:>6}{i['wall'] * 1e3:>11.2f}{100 * i['wall'] / total:>7.1f}"
+                     f"{i['retained_blocks']:>10}{i['peak'] / 1024:>11.1f}{ir_in:>8}{ir_out:>8}")
+    return "\n".join(lines)
+
+
+_active: Optional[Recorder] = None
+
+
+@contextmanager
+def recording(memory: bool = True) -> Iterator[Recorder]:
+    """ record all stages run inside; 'memory' traces allocations, which slows compilation down """
+    global _active
+    prev, _active = _active, Recorder(memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield _active
+    finally:
+        if started:
+            tracemalloc.stop()
+        _active = prev
+
+
+@contextmanager
+def stage(name: str, fun: Optional[str] = None) -> Iterator[Optional[PassRecord]]:
+    if _active is None:
+        yield None
+        return
+    with _active.stage(name, fun) as rec:
+        yield rec
+
+
+def run_pass(name: str, fn: Callable, x, fun: Optional[str] = None):
+    """ fn(x), recorded along with IR size of input and output """
+    if _active is None:
+        return fn(x)
+    return _active.run(name, fn, x, fun)
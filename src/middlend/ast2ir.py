@@ -1,30 +1,12 @@
 from collections.abc import generator
-from contextlib import contextmanager
 
 from backend.base.base_transformer import BaseTransformer, TCtx, CtxTransformer
 from backend.ir.ir import *
 from backend.ir.ir import IRType
+from backend.ir.symbols import SymbolTable, SymbolScope, is_temp
 from frontend.astdef import *
 from frontend.astdef import _Literal, _Expression, ExRdVar
-from utils import flatten, random_string
-
-
-def gvar():
-    return "__" + random_string()
-
-
-@contextmanager
-def var() -> str:
-    yield gvar()
-
-
-@contextmanager
-def vars(n: int) -> str:
-    yield [gvar() for _ in range(n)]
-
-
-def is_generated(x: str):
-    return x.startswith("__")
+from instrument import run_pass
 
 
 @dataclass
@@ -40,6 +22,8 @@ class AST2IR(BaseTransformer, CtxTransformer):
 
     def __init__(self):
         super().__init__()
+        self.symbols = SymbolTable()
+        self.names: Optional[SymbolScope] = None
         self.ex_translator = AST2IRExpr()
 
     """
@@ -49,7 +33,8 @@ class AST2IR(BaseTransformer, CtxTransformer):
     def Prog(self, p: Prog):
         return IRProg(
             self(i for i in p.functions.values()),
-            self(p.globals)
+            self(p.globals),
+            self.symbols
         )
 
     def DeclStaticVar(self, x: DeclStaticVar) -> IRGlobal:
@@ -63,11 +48,13 @@ class AST2IR(BaseTransformer, CtxTransformer):
         return IRType[x.name]
 
     def DeclFun(self, x: DeclFun) -> IRFun:
+        # generated names are numbered per function
+        self.names = self.ex_translator.names = self.symbols.scope(x.sig.name)
         return IRFun(
             x.sig.name,
             self(x.sig.ret_type),
             params=self(x.sig.args),
-            body=flatten(self(x.body)) if x.body is not None else None
+            body=list(self.block(x.body)) if x.body is not None else None
         )
 
     def _Literal(self, x: _Literal) -> IRValue:
@@ -86,10 +73,16 @@ class AST2IR(BaseTransformer, CtxTransformer):
         Statements
     """
 
+    def block(self, x: Optional[Block]) -> Generator[IRStatement]:
+        """ statements are lowered lazily, one after another, into a flat stream """
+        if x is None:
+            return
+        for st in x:
+            yield from self(st)
+
     def StAsn(self, x: StAsn) -> Generator[IRStatement]:
         """ root of expression translation """
-        cmds, dst = self.ex_translator.start(x.expr)
-        yield from cmds
+        dst = yield from self.ex_translator.start(x.expr)
         yield IRStUnOp(IRUOp.COPY, x.dst, dst)
 
     def StVarDecl(self, x: StVarDecl) -> Generator[IRStatement]:
@@ -100,9 +93,9 @@ class AST2IR(BaseTransformer, CtxTransformer):
         if x is None:
             yield IRStReturn()
             return
-        with var() as v:
-            yield from self(StAsn(v, x.value))
-            yield IRStReturn(v)
+        v = self.names.var()
+        yield from self(StAsn(v, x.value))
+        yield IRStReturn(v)
 
     def StContinue(self, _) -> Generator[IRStatement]:
         if (lctx := self.cpeek(LoopCtx)) is None:
@@ -115,45 +108,48 @@ class AST2IR(BaseTransformer, CtxTransformer):
         yield IRStJump(lctx.loop_post_label)
 
     def StWhile(self, x: StWhile) -> Generator[IRStatement]:
-        with vars(5) as (pre_label, post_label, body_label, chk_label, chk_var):
-            self.cpush(LoopCtx(pre_label, post_label, body_label, chk_label))
+        pre_label, post_label, body_label, chk_label = (self.names.label() for _ in range(4))
+        chk_var = self.names.var()
+        self.cpush(LoopCtx(pre_label, post_label, body_label, chk_label))
 
-            yield IRStatement(label=pre_label)
-            yield IRStatement(label=chk_label)
+        yield IRStatement(label=pre_label)
+        yield IRStatement(label=chk_label)
 
-            yield from self(StAsn(chk_var, x.check_expr))
-            yield IRStCJump(IRCJumpType.JZ, chk_var, post_label)
+        yield from self(StAsn(chk_var, x.check_expr))
+        yield IRStCJump(IRCJumpType.JZ, chk_var, post_label)
 
-            yield IRStatement(label=body_label)
-            yield from self(x.body)
-            yield IRStJump(chk_label)
+        yield IRStatement(label=body_label)
+        yield from self.block(x.body)
+        yield IRStJump(chk_label)
 
-            yield IRStatement(label=post_label)
+        yield IRStatement(label=post_label)
 
-            self.cpop(LoopCtx)
+        self.cpop(LoopCtx)
 
     def StIf(self, x: StIf) -> Generator[IRStatement]:
-        with vars(3) as (chk_var, false_label, post_label):
-            yield from self(StAsn(chk_var, x.check_expr))
-            yield IRStCJump(IRCJumpType.JZ, chk_var, false_label)
+        chk_var = self.names.var()
+        false_label, post_label = self.names.label(), self.names.label()
+
+        yield from self(StAsn(chk_var, x.check_expr))
+        yield IRStCJump(IRCJumpType.JZ, chk_var, false_label)
 
-            yield from self(x.br_true)
-            yield IRStJump(post_label)
+        yield from self.block(x.br_true)
+        yield IRStJump(post_label)
 
-            yield IRStatement(label=false_label)
-            if x.br_false is not None:
-                yield from self(x.br_false)
-            yield IRStatement(label=post_label)
+        yield IRStatement(label=false_label)
+        yield from self.block(x.br_false)
+        yield IRStatement(label=post_label)
 
     def fallback(self, x):
         if isinstance(x, _Expression):
-            yield from list(self(StAsn("__", x)))[:-1]
+            yield from self.ex_translator.start(x)
 
 class AST2IRExpr(BaseTransformer, CtxTransformer):
 
     def __init__(self):
         super().__init__()
         self.top_var: Optional[str] = None
+        self.names: Optional[SymbolScope] = None
 
     def LitInt(self, x: LitInt) -> IRValue:
         return IRIntValue(x.value)
@@ -165,9 +161,9 @@ class AST2IRExpr(BaseTransformer, CtxTransformer):
         return IRStringValue(x.value)
 
     def ExLit(self, x: ExLit):
-        with var() as tgt:
-            yield IRStStoreValue(tgt, value=self(x.value))
-            self.top_var = tgt
+        tgt = self.names.var()
+        yield IRStStoreValue(tgt, value=self(x.value))
+        self.top_var = tgt
 
     def ExRdVar(self, x: ExRdVar):
         self.top_var = x.name
@@ -179,7 +175,7 @@ class AST2IRExpr(BaseTransformer, CtxTransformer):
             yield from self.unwrap_call(in_ex)
             args.append(self.top_var)
 
-        self.top_var = gvar()
+        self.top_var = self.names.var()
         yield IRStCall(
             fun_name=x.name,
             arg_vars=args,
@@ -222,7 +218,7 @@ class AST2IRExpr(BaseTransformer, CtxTransformer):
         self.top_var = None
         yield from self.unwrap_call(x.exp2)
         arg2 = self.top_var
-        dst = arg1 if is_generated(arg1) else gvar()
+        dst = arg1 if is_temp(arg1) else self.names.var()
         yield IRStBinOp(op, dst, arg1, arg2)
         self.top_var = dst
 
@@ -254,15 +250,16 @@ class AST2IRExpr(BaseTransformer, CtxTransformer):
 
     def unwrap_call(self, x):
         """ with no yields generator would look line None instead """
-        res = self(x)
-        return list(res) if isinstance(res, generator) else []
+        if isinstance(res := self(x), generator):
+            yield from res
 
-    def start(self, x: _Expression):
+    def start(self, x: _Expression) -> Generator[IRStatement, None, str]:
+        """ streams expression commands, returns name of variable holding the result """
         self.top_var = None
-        res = self.unwrap_call(x)
-        return res, self.top_var
+        yield from self.unwrap_call(x)
+        return self.top_var
 
 
 def do_ir(prog: Prog) -> IRProg:
     t = AST2IR()
-    return t(prog)
+    return run_pass("ast2ir", t, prog)
@@ -0,0 +1,148 @@
+"""
+Constant folding and propagation over IR, before register allocation.
+
+Known values of variables flow forward over CFG (as in Wegman-Zadeck conditional constant propagation,
+without SSA): a block is entered with values agreed on by all predecessors reached so far,
+and a conditional jump on a known value leads only to the block it actually takes.
+Operations on known values become stores of the result, computed with the arithmetic of
+the code we generate (the same as the interpreter's: RV64 64-bit wrap-around), jumps on known
+conditions become unconditional or disappear, code of blocks that are never reached is dropped.
+Globals are never known: any call may change them.
+
+Folding leaves definitions nobody reads (the literals that were operands), drop_dead_code removes them.
+"""
+
+from typing import *
+
+from backend.ir.ir import *
+from middlend.interp import BIN_OPS, UN_OPS, wrap
+from middlend.passes import CFG, AnalysisManager, Liveness
+
+Env = Dict[str, int]
+
+
+def literal(x: IRValue) -> Optional[int]:
+    """ value of int or char literal, strings are addresses known only to linker """
+    match x:
+        case IRIntValue(v):
+            return wrap(v)
+        case IRCharValue(v):
+            return ord(v[0])
+    return None
+
+
+def evaluate(st: IRStatement, env: Env) -> Optional[int]:
+    """ value the statement defines, if it is known """
+    match st:
+        case IRStStoreValue(_, value):
+            return literal(value)
+        case IRStBinOp(op, _, arg1, arg2) if arg1 in env and arg2 in env:
+            return BIN_OPS[op](env[arg1], env[arg2])
+        case IRStUnOp(op, _, arg) if arg in env:
+            return UN_OPS[op](env[arg])
+    return None
+
+
+def transfer(st: IRStatement, env: Env, exclude: Collection[str]):
+    value = evaluate(st, env)
+    for v in st.v_outputs:
+        env.pop(v, None)
+        if value is not None and v not in exclude:
+            env[v] = value
+
+
+def taken(st: IRStCJump, env: Env) -> Optional[bool]:
+    """ whether conditional jump on known value is taken """
+    if st.checked_var not in env:
+        return None
+    return (env[st.checked_var] == 0) == (st.check_type == IRCJumpType.JZ)
+
+
+def successors(cfg: CFG, b: int, st: IRStatement, env: Env) -> List[int]:
+    """ blocks reached from block 'b' ending with 'st', when it is left with values 'env' """
+    if isinstance(st, IRStCJump) and (jump := taken(st, env)) is not None:
+        if jump:
+            return cfg.target(st.jump_to)
+        return [b + 1] if b + 1 < len(cfg.blocks) else []
+    return cfg.succ[b]
+
+
+def meet(a: Env, b: Env) -> Env:
+    return {k: v for k, v in a.items() if b.get(k) == v}
+
+
+def fold_constants(fun: IRFun, am: AnalysisManager, exclude: Collection[str] = ()) -> IRFun:
+    """ 'exclude' variables (globals) are never known """
+    cfg = am.get(CFG)
+    body = fun.body
+    # values on entry of each block, None for blocks not reached (yet)
+    entry: List[Optional[Env]] = [None] * len(cfg.blocks)
+    if cfg.blocks:
+        entry[0] = {}
+    order = cfg.postorder()[::-1]
+    changed = True
+    while changed:
+        changed = False
+        for b in order:
+            if entry[b] is None:
+                continue
+            start, end = cfg.blocks[b]
+            env = dict(entry[b])
+            for st in body[start:end]:
+                transfer(st, env, exclude)
+            for s in successors(cfg, b, body[end - 1], env):
+                new = dict(env) if entry[s] is None else meet(entry[s], env)
+                if new != entry[s]:
+                    entry[s] = new
+                    changed = True
+
+    res = []
+    for b, (start, end) in enumerate(cfg.blocks):
+        env = entry[b]
+        for st in body[start:end]:
+            if env is None:
+                # jumps to the label are dropped too, but the label itself is harmless
+                if st.label is not None:
+                    res.append(IRStatement(label=st.label))
+                continue
+            match st:
+                case IRStCJump(_, _, target) if (jump := taken(st, env)) is not None:
+                    if jump:
+                        res.append(IRStJump(target, label=st.label))
+                    elif st.label is not None:
+                        res.append(IRStatement(label=st.label))
+                case IRStBinOp(_, dest) | IRStUnOp(_, dest) if (value := evaluate(st, env)) is not None:
+                    res.append(IRStStoreValue(dest, IRIntValue(value), label=st.label))
+                case _:
+                    res.append(st)
+            transfer(st, env, exclude)
+    fun.body = res
+    return fun
+
+
+def drop_dead_code(fun: IRFun, am: AnalysisManager, exclude: Collection[str] = ()) -> IRFun:
+    """
+    remove stores and operations whose result is not read afterwards,
+    except those to 'exclude' variables (globals, visible to other functions).
+    operations have no side effects: division by zero does not trap on RISC-V
+    """
+    live = am.get(Liveness)
+    body = fun.body
+    keep = [True] * len(body)
+    for b, (start, end) in enumerate(live.cfg.blocks):
+        # live sets are recomputed here, as removed statements do not read their inputs
+        alive = set(live.live_out[b])
+        for n in range(end - 1, start - 1, -1):
+            st = body[n]
+            if isinstance(st, IRStStoreValue | IRStBinOp | IRStUnOp) and st.dest not in alive and st.dest not in exclude:
+                keep[n] = False
+                continue
+            alive = (alive - set(st.v_outputs)) | set(st.v_inputs)
+    res = []
+    for st, k in zip(body, keep):
+        if k:
+            res.append(st)
+        elif st.label is not None:
+            res.append(IRStatement(label=st.label))
+    fun.body = res
+    return fun
@@ -0,0 +1,321 @@
+"""
+Reference interpreter of IR: runs IRProg as produced by ast2ir (or after IR optimizations),
+without register allocation and assembly. Arithmetic follows the code we generate for RV64
+(64-bit wrap-around, RISC-V division by zero, logical right shift, 'logical' ops on bit 0).
+
+Runtime functions of cpu_testbench/stdlib are built in: puts, putc, putn, rdinstret/rdcycle
+(these two return number of statements executed so far).
+Dynamic statement counts are reported per function, labels alone are not statements.
+"""
+
+from dataclasses import dataclass, field
+from typing import *
+
+from backend.ir.ir import *
+
+M = (1 << 64) - 1
+SIGN = 1 << 63
+
+# addresses of string data in interpreter memory, 0 stays an invalid pointer
+HEAP_BASE = 0x1000
+
+DEFAULT_LIMIT = 10_000_000
+
+
+class IRInterpError(Exception):
+    pass
+
+
+def wrap(v: int) -> int:
+    """ two's complement 64-bit value as signed python int """
+    return ((v + SIGN) & M) - SIGN
+
+
+def div(a: int, b: int) -> int:
+    if b == 0:
+        return -1
+    q = abs(a) // abs(b)
+    return wrap(-q if (a < 0) != (b < 0) else q)
+
+
+def rem(a: int, b: int) -> int:
+    if b == 0:
+        return a
+    return wrap(a - b * div(a, b))
+
+
+BIN_OPS: Dict[IRBOp, Callable[[int, int], int]] = {
+    IRBOp.ADD: lambda a, b: wrap(a + b),
+    IRBOp.SUB: lambda a, b: wrap(a - b),
+    IRBOp.MUL: lambda a, b: wrap(a * b),
+    IRBOp.DIV: div,
+    IRBOp.REM: rem,
+    IRBOp.CLT: lambda a, b: int(a < b),
+    IRBOp.CGT: lambda a, b: int(a > b),
+    IRBOp.CEQ: lambda a, b: int(a == b),
+    IRBOp.CNE: lambda a, b: int(a != b),
+    IRBOp.BIT_AND: lambda a, b: a & b,
+    IRBOp.BIT_OR: lambda a, b: a | b,
+    IRBOp.BIT_LSH: lambda a, b: wrap(a << (b & 63)),
+    IRBOp.BIT_RSH: lambda a, b: wrap((a & M) >> (b & 63)),
+    IRBOp.LOG_AND: lambda a, b: a & b & 1,
+    IRBOp.LOG_OR: lambda a, b: (a | b) & 1,
+}
+
+UN_OPS: Dict[IRUOp, Callable[[int], int]] = {
+    IRUOp.MINUS: lambda a: wrap(-a),
+    IRUOp.BIT_NEG: lambda a: ~a,
+    IRUOp.LOG_NEG: lambda a: ~a & 1,
+    IRUOp.COPY: lambda a: a,
+}
+
+# kinds of compiled statements
+EXEC, JUMP, CJUMP, CALL, RET = range(5)
+
+
+@dataclass
+class IRRunResult:
+    output: str = ""
+    value: Optional[int] = None  # returned by entry function
+    steps: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)  # function -> statements executed
+    calls: Dict[str, int] = field(default_factory=dict)  # function -> times called
+    error: Optional[str] = None  # output and counts so far are kept
+
+
+@dataclass
+class Frame:
+    fun: str
+    code: List[Tuple]
+    env: Dict[str, int]
+    pc: int = 0
+    assign_var: Optional[str] = None  # in caller
+
+
+class IRInterpreter:
+    """ one run of a program: globals, string memory, output """
+
+    def __init__(self, prog: IRProg):
+        self.prog = prog
+        self.functions = {i.name: i for i in prog.functions}
+        self.memory = bytearray()
+        self.strings: Dict[str, int] = {}
+        self.globals: Dict[str, int] = {i.name: self.value(i.val) if i.val is not None else 0 for i in prog.globals}
+        self.output = bytearray()
+        self.steps = 0
+        self.code: Dict[str, List[Tuple]] = {}
+        self.builtins: Dict[str, Callable[..., int]] = {
+            "puts": self.puts,
+            "putc": self.putc,
+            "putn": self.putn,
+            "rdinstret": self.rdinstret,
+            "rdcycle": self.rdinstret,
+        }
+
+    """
+    Data
+    """
+
+    def string(self, text: str) -> int:
+        """ address of zero-terminated string data, equal literals share it """
+        if (addr := self.strings.get(text)) is None:
+            addr = self.strings[text] = HEAP_BASE + len(self.memory)
+            self.memory += text.encode() + b"\0"
+        return addr
+
+    def value(self, x: IRValue) -> int:
+        match x:
+            case IRIntValue(v):
+                return wrap(v)
+            case IRCharValue(v):
+                return ord(v[0])
+            case IRStringValue(v):
+                return self.string(v)
+        raise IRInterpError(f"invalid value {x}")
+
+    """
+    Runtime
+    """
+
+    def puts(self, ptr: int) -> int:
+        start = ptr - HEAP_BASE
+        if not 0 <= start < len(self.memory):
+            raise IRInterpError(f"puts: invalid pointer {ptr:#x}")
+        self.output += self.memory[start:self.memory.index(0, start)]
+        return 0
+
+    def putc(self, c: int) -> int:
+        self.output.append(c & 0xff)
+        return 0
+
+    def putn(self, n: int) -> int:
+        self.output += str(n).encode()
+        return 0
+
+    def rdinstret(self) -> int:
+        return self.steps
+
+    """
+    Statements -> compiled form: (EXEC, closure over env) or control tuples with resolved labels
+    """
+
+    def compile(self, fun: IRFun) -> List[Tuple]:
+        if (res := self.code.get(fun.name)) is not None:
+            return res
+        labels: Dict[str, int] = {}
+        body = []
+        for st in fun.body:
+            if st.label is not None:
+                labels[st.label] = len(body)
+            if type(st) is not IRStatement:
+                body.append(st)
+        labels[fun.exit_label] = len(body)
+
+        def target(label: str) -> int:
+            if label not in labels:
+                raise IRInterpError(f"{fun.name}: unknown label {label}")
+            return labels[label]
+
+        res = [self.statement(fun, st, target) for st in body] + [(RET, None)]
+        self.code[fun.name] = res
+        return res
+
+    def statement(self, fun: IRFun, st: IRStatement, target: Callable[[str], int]) -> Tuple:
+        g = self.globals
+        local = all(i not in g for i in (*st.v_inputs, *st.v_outputs))
+        match st:
+            case IRStStoreValue(dest, value):
+                v = self.value(value)
+                if dest not in g:
+                    def store(env):
+                        env[dest] = v
+                else:
+                    def store(env):
+                        g[dest] = v
+                return EXEC, store
+            case IRStBinOp(op, dest, arg1, arg2):
+                f = BIN_OPS[op]
+                if local:
+                    def binop(env):
+                        env[dest] = f(env[arg1], env[arg2])
+                else:
+                    def binop(env):
+                        self.write(env, dest, f(self.read(env, arg1), self.read(env, arg2)))
+                return EXEC, binop
+            case IRStUnOp(op, dest, arg):
+                f = UN_OPS[op]
+                if local:
+                    def unop(env):
+                        env[dest] = f(env[arg])
+                else:
+                    def unop(env):
+                        self.write(env, dest, f(self.read(env, arg)))
+                return EXEC, unop
+            case IRStJump(label):
+                return JUMP, target(label)
+            case IRStCJump(check, var, label):
+                return CJUMP, check == IRCJumpType.JZ, var, target(label)
+            case IRStCall(name, args, assign_var):
+                return CALL, name, tuple(args), assign_var
+            case IRStReturn(var):
+                return RET, var
+        raise IRInterpError(f"{fun.name}: cannot interpret {st}")
+
+    def read(self, env: Dict[str, int], name: str) -> int:
+        if (v := env.get(name)) is not None:
+            return v
+        if (v := self.globals.get(name)) is not None:
+            return v
+        raise IRInterpError(f"read of undefined variable '{name}'")
+
+    def write(self, env: Dict[str, int], name: str, value: int):
+        if name in self.globals:
+            self.globals[name] = value
+        else:
+            env[name] = value
+
+    """
+    Execution
+    """
+
+    def call(self, name: str, args: List[int], assign_var: Optional[str]) -> Optional[Frame]:
+        """ frame of called function, None for runtime functions (already executed) """
+        fun = self.functions.get(name)
+        if fun is None or not fun.is_impl:
+            if (builtin := self.builtins.get(name)) is None:
+                raise IRInterpError(f"call of undefined function '{name}'")
+            return None
+        if len(args) != len(fun.params):
+            raise IRInterpError(f"'{name}' expects {len(fun.params)} arguments, got {len(args)}")
+        return Frame(name, self.compile(fun), {p.name: v for p, v in zip(fun.params, args)}, 0, assign_var)
+
+    def run(self, entry: str = "main", args: Sequence[int] = (), limit: int = DEFAULT_LIMIT) -> IRRunResult:
+        counts: Dict[str, int] = {}
+        calls: Dict[str, int] = {entry: 1}
+        stack: List[Frame] = []
+        value, error = None, None
+        # steps are attributed to the running function at each call and return
+        frame, steps, mark = None, 0, 0
+        try:
+            frame = self.call(entry, list(args), None)
+            if frame is None:
+                raise IRInterpError(f"entry '{entry}' has no body")
+            code, env, pc = frame.code, frame.env, 0
+            while True:
+                st = code[pc]
+                steps += 1
+                kind = st[0]
+                if kind == EXEC:
+                    st[1](env)
+                    pc += 1
+                elif kind == CJUMP:
+                    v = env[st[2]] if st[2] in env else self.read(env, st[2])
+                    pc = st[3] if (v == 0) == st[1] else pc + 1
+                elif kind == JUMP:
+                    pc = st[1]
+                elif kind == CALL:
+                    _, name, arg_vars, assign_var = st
+                    arg_values = [self.read(env, i) for i in arg_vars]
+                    calls[name] = calls.get(name, 0) + 1
+                    self.steps = steps
+                    callee = self.call(name, arg_values, assign_var)
+                    if callee is None:
+                        res = self.builtins[name](*arg_values)
+                        if assign_var is not None:
+                            self.write(env, assign_var, res)
+                        pc += 1
+                        continue
+                    counts[frame.fun] = counts.get(frame.fun, 0) + steps - mark
+                    mark = steps
+                    frame.pc = pc + 1
+                    stack.append(frame)
+                    frame, code, env, pc = callee, callee.code, callee.env, 0
+                else:  # RET
+                    # falling off the end returns 0, as does a void function in a0
+                    res = 0 if st[1] is None else self.read(env, st[1])
+                    if st[1] is None:
+                        steps -= pc == len(code) - 1  # implicit return is not a statement
+                    counts[frame.fun] = counts.get(frame.fun, 0) + steps - mark
+                    mark = steps
+                    if not stack:
+                        value = res
+                        break
+                    assign_var = frame.assign_var
+                    frame = stack.pop()
+                    code, env, pc = frame.code, frame.env, frame.pc
+                    if assign_var is not None:
+                        self.write(env, assign_var, res)
+                if steps >= limit:
+                    raise IRInterpError(f"statement limit {limit} exceeded")
+        except IRInterpError as e:
+            error = str(e)
+        except KeyError as e:
+            error = f"read of undefined variable {e}"
+        if error is not None and frame is not None:
+            counts[frame.fun] = counts.get(frame.fun, 0) + steps - mark
+        self.steps = steps
+        return IRRunResult(self.output.decode(errors="replace"), value, self.steps, counts, calls, error)
+
+
+def interpret(prog: IRProg, entry: str = "main", limit: int = DEFAULT_LIMIT) -> IRRunResult:
+    return IRInterpreter(prog).run(entry, limit=limit)
@@ -1,25 +1,116 @@
 from backend.ir.hir import *
 from backend.ir.ir import *
 from backend.hw.rv64 import RV64Reg
-from utils import random_string
+from middlend.constfold import drop_dead_code, fold_constants
+from middlend.passes import ALL, AnalysisManager, CFG, Calls, DefUse, Liveness, Pass, PassManager, is_terminator
+from middlend.regalloc import InterferenceGraph, LiveIntervals, color_graph, linear_scan
+
+OPT_LEVELS = ("O0", "O1", "O2")
+
+
+class ScratchCache:
+    """
+    значения переменных из памяти, загруженные во временные регистры в пределах базового блока.
+    порядок записей - от давно использованных к недавним
+    """
+
+    def __init__(self, regs: List[Reg], slots: Dict[str, HVar], names):
+        self.free = list(regs)
+        self.slots = slots
+        self.names = names
+        self.entries: Dict[str, Tuple[str, Reg, bool]] = {}  # переменная -> (временное имя, регистр, изменено)
+
+    def needed(self, name: str, live: Set[str]) -> bool:
+        """ глобальные переменные видны другим функциям, поэтому нужны всегда """
+        return isinstance(self.slots[name], HMemVar) or name in live
+
+    def store(self, name: str, out: List[IRStatement], live: Set[str]):
+        tmp, reg, dirty = self.entries[name]
+        if dirty and self.needed(name, live):
+            out.append(HIRMove(HRegVar(reg, name=name), self.slots[name]))
+        self.entries[name] = tmp, reg, False
+
+    def drop(self, name: str, out: List[IRStatement], live: Set[str]):
+        self.store(name, out, live)
+        self.free.append(self.entries.pop(name)[1])
+
+    def get(self, name: str, pinned: Set[str], out: List[IRStatement], live: Set[str], load: bool) -> str:
+        """ временное имя переменной в регистре; при нехватке регистров вытесняется самая старая запись """
+        if name in self.entries:
+            self.entries[name] = self.entries.pop(name)
+            return self.entries[name][0]
+        if not self.free:
+            self.drop(next(i for i in self.entries if i not in pinned), out, live)
+        reg = self.free.pop()
+        tmp = self.names.spill()
+        self.slots[tmp] = HRegVar(reg, name=name)
+        if load:
+            out.append(HIRMove(self.slots[name], HRegVar(reg, name=name)))
+        self.entries[name] = tmp, reg, False
+        return tmp
+
+    def define(self, name: str, pinned: Set[str], out: List[IRStatement], live: Set[str]) -> str:
+        tmp = self.get(name, pinned, out, live, load=False)
+        self.entries[name] = tmp, self.entries[name][1], True
+        return tmp
+
+    def flush(self, out: List[IRStatement], live: Set[str]):
+        for name in self.entries:
+            self.store(name, out, live)
+
+    def expire(self, live: Set[str]):
+        """ забыть мертвые значения без записи """
+        for name in [i for i in self.entries if not self.needed(i, live)]:
+            self.drop(name, [], live)
+
+    def clear(self):
+        for name in list(self.entries):
+            self.free.append(self.entries.pop(name)[1])
 
 
 class RV64IR2HIRTransformer:
-    def __init__(self, regmap: Type[Reg]):
+    def __init__(self, regmap: Type[Reg], opt: str = "O0"):
+        if opt not in OPT_LEVELS:
+            raise Exception(f"unknown optimization level {opt}")
         self.regmap = regmap
+        self.opt = opt
         self.ctx: Optional[IRProg] = None
+        self.passes = PassManager(self.pipeline(opt))
+
+    def pipeline(self, opt: str) -> List[Pass]:
+        extract = Pass("fun_extract_strings", self.fun_extract_strings, (), ALL)
+        if opt == "O0":
+            return [
+                extract,
+                Pass("fun_allocate_vars", self.fun_allocate_vars, (DefUse,), ALL),
+                Pass("fun_prepare_stack", self.fun_prepare_stack, (), ALL),
+                Pass("fun_add_var_moves", self.fun_add_var_moves),
+            ]
+        allocate = {
+            "O1": Pass("fun_allocate_vars_linear_scan", self.fun_allocate_vars_linear_scan, (Calls,), ALL),
+            "O2": Pass("fun_allocate_vars_coloring", self.fun_allocate_vars_coloring, (Calls,), ALL),
+        }[opt]
+        return [
+            extract,
+            Pass("fun_fold_constants", self.fun_fold_constants, (CFG,)),
+            Pass("fun_drop_dead_code", self.fun_drop_dead_code, (Liveness,)),
+            allocate,
+            Pass("fun_drop_self_copies", self.fun_drop_self_copies),
+            Pass("fun_prepare_frame", self.fun_prepare_frame, (Calls,), ALL),
+            Pass("fun_add_spill_code", self.fun_add_spill_code, (Liveness,)),
+        ]
 
     def __call__(self, code: IRProg):
         self.ctx = code
         self.ctx.functions = [self.process_function(i) for i in self.ctx.functions]
         return self.ctx
 
-    def fun_allocate_vars(self, fun: IRFun) -> IRFun:
+    def fun_fixed_slots(self, fun: IRFun, register_params: bool = False) -> Dict[str, HVar]:
         """
-        назначить переменным ir регистры или стек или зарезервированную память.
-        добавить псевдо-команды для перехода от одного к другому типов памяти.
+        новая раскладка функции: глобальные переменные в памяти, параметры на стеке.
+        параметры сверх регистров передаются на стеке вызывающей функции (psABI),
+        с 'register_params' параметры в регистрах распределяются наравне с локальными переменными
         """
-        if not fun.is_impl: return fun
         fun.layout = HFunLayout()
         slots = fun.layout.mem_slots
 
@@ -28,10 +119,58 @@ class RV64IR2HIRTransformer:
                 raise Exception(f"redeclared var {i}")
             slots[i.name] = HMemVar(i.name)
 
+        param_regs = self.regmap.params()
         for i, p in enumerate(fun.params):
-            slots[p.name] = HStackVar(name=p.name)
+            if i >= len(param_regs):
+                slots[p.name] = HArgVar(name=p.name, index=i - len(param_regs))
+            elif not register_params:
+                slots[p.name] = HStackVar(name=p.name)
+        return slots
+
+    def fun_param_hints(self, fun: IRFun, slots: Dict[str, HVar]) -> Dict[str, Reg]:
+        """ параметры, распределяемые по регистрам, и регистры, в которых они приходят """
+        return {p.name: r for p, r in zip(fun.params, self.regmap.params()) if p.name not in slots}
+
+    def fun_call_hints(self, fun: IRFun, slots: Dict[str, HVar]) -> Dict[str, Reg]:
+        """
+        регистры, через которые переменные передаются: аргументы вызовов, их результаты, возвращаемое значение.
+        переменная в том же регистре избавляет от копирования (emit пропускает копию в себя)
+        """
+        hints = {}
+        for i in fun.body:
+            match i:
+                case IRStCall(_, args, assign_var):
+                    hints.update((v, r) for v, r in zip(args, self.regmap.params()) if v not in hints)
+                    if assign_var is not None:
+                        hints.setdefault(assign_var, self.regmap.ret()[0])
+                case IRStReturn(var) if var is not None:
+                    hints.setdefault(var, self.regmap.ret()[0])
+        return {k: v for k, v in hints.items() if k not in slots}
 
-        all_locals = detect_locals(fun)
+    def fun_assign_slots(self, fun: IRFun, am: AnalysisManager, slots: Dict[str, HVar],
+                         hints: Dict[str, Reg], regs: Dict[str, Optional[Reg]]):
+        """ слоты в порядке появления в коде, как в fun_allocate_vars; без регистра - на стек """
+        for name in am.get(DefUse).counts:
+            if name not in regs:
+                continue
+            if regs[name] is not None:
+                slots[name] = HRegVar(regs[name], name=name)
+            else:
+                slots[name] = HStackVar(name=name)
+        # неиспользуемые параметры остаются там, где пришли
+        for name, reg in hints.items():
+            if name not in slots:
+                slots[name] = HRegVar(reg, name=name)
+
+    def fun_allocate_vars(self, fun: IRFun, am: AnalysisManager) -> IRFun:
+        """
+        назначить переменным ir регистры или стек или зарезервированную память.
+        добавить псевдо-команды для перехода от одного к другому типов памяти.
+        """
+        if not fun.is_impl: return fun
+        slots = self.fun_fixed_slots(fun)
+
+        all_locals = am.get(DefUse).counts
         local_regs_to_assign = self.regmap.locals()
 
         # в качестве простейшей оптимизации отображаем в регистры наиболее часто используемые переменные
@@ -54,12 +193,64 @@ class RV64IR2HIRTransformer:
 
         return fun
 
-    def fun_add_var_moves(self, fun: IRFun) -> IRFun:
+    def fun_register_classes(self, am: AnalysisManager) -> Tuple[List[Reg], Dict[str, List[Reg]]]:
+        """
+        регистры в порядке предпочтения: сначала не сохраняемые при вызове (их не надо сохранять в прологе),
+        переменным, живым во время вызова, - только сохраняемые вызываемой функцией
+        """
+        local_regs = self.regmap.locals()
+        return self.regmap.temporaries() + local_regs, {v: local_regs for v in am.get(Calls).crossing}
+
+    def fun_allocate_vars_linear_scan(self, fun: IRFun, am: AnalysisManager) -> IRFun:
+        """
+        регистры по интервалам жизни: переменные, которые не живут одновременно, делят регистр.
+        вытесненная переменная уходит на стек на весь интервал (интервалы не расщепляются),
+        fun_add_spill_code держит ее во временном регистре в пределах базового блока
+        """
+        if not fun.is_impl: return fun
+        slots = self.fun_fixed_slots(fun, register_params=True)
+        hints = self.fun_param_hints(fun, slots)
+        intervals = LiveIntervals(fun, am, exclude=slots.keys(), entry=hints.keys()).intervals
+        linear_scan(intervals.values(), *self.fun_register_classes(am), self.fun_call_hints(fun, slots) | hints)
+        self.fun_assign_slots(fun, am, slots, hints, {k: v.reg for k, v in intervals.items()})
+        return fun
+
+    def fun_allocate_vars_coloring(self, fun: IRFun, am: AnalysisManager) -> IRFun:
+        """
+        раскраска графа конфликтов (Chaitin-Briggs): переменные, связанные копированием,
+        по возможности сливаются в один регистр, и копия становится лишней
+        """
+        if not fun.is_impl: return fun
+        slots = self.fun_fixed_slots(fun, register_params=True)
+        hints = self.fun_param_hints(fun, slots)
+        graph = InterferenceGraph(fun, am, exclude=slots.keys(), entry=hints.keys())
+        regs = color_graph(graph, *self.fun_register_classes(am), self.fun_call_hints(fun, slots) | hints)
+        self.fun_assign_slots(fun, am, slots, hints, regs)
+        return fun
+
+    def fun_drop_self_copies(self, fun: IRFun, am: AnalysisManager) -> IRFun:
+        """ убрать копирования из регистра в него же, метка остается на месте """
+        if not fun.is_impl: return fun
+        slots = fun.layout.mem_slots
+        res = []
+        for i in fun.body:
+            if isinstance(i, IRStUnOp) and i.operation == IRUOp.COPY:
+                src, dst = slots[i.arg], slots[i.dest]
+                if isinstance(src, HRegVar) and isinstance(dst, HRegVar) and src.reg == dst.reg:
+                    if i.label is not None:
+                        res.append(IRStatement(label=i.label))
+                    continue
+            res.append(i)
+        fun.body = res
+        return fun
+
+    def fun_add_var_moves(self, fun: IRFun, am: AnalysisManager) -> IRFun:
         """
         вставить адаптеры когда надо чтобы переменная оказалась в регистре (и наоборот),
         а ее внезапно аллоцировали не в регистр, а в память (стек)
         """
         if not fun.is_impl: return fun
+        names = self.ctx.symbols.scope(fun.name)
         res = []
         for i in fun.body:
             allowed_regs = self.regmap.one_time()
@@ -68,8 +259,12 @@ class RV64IR2HIRTransformer:
             for typ, arr in [('in', i.v_inputs), ('out', i.v_outputs)]:
                 for v_name in arr:
                     v_orig = fun.layout.mem_slots[v_name]
+                    if isinstance(i, IRStCall) and not allowed_regs:
+                        # аргументы и результат вызова могут передаваться через память напрямую:
+                        # временных регистров на все аргументы не хватает
+                        continue
                     if not isinstance(v_orig, HRegVar):
-                        v_tmp_name = random_string(4)
+                        v_tmp_name = names.spill()
                         v_tmp_reg = allowed_regs.pop()
                         v_tmp = HRegVar(v_tmp_reg, name=v_name)
 
@@ -92,64 +287,123 @@ class RV64IR2HIRTransformer:
         fun.body = res
         return fun
 
-    def fun_extract_strings(self, fun: IRFun) -> IRFun:
+    def fun_add_spill_code(self, fun: IRFun, am: AnalysisManager) -> IRFun:
+        """
+        как fun_add_var_moves, но в пределах базового блока значения из памяти остаются во временных
+        регистрах: загрузка при первом чтении, запись измененного и еще нужного значения при вытеснении,
+        перед вызовом (временные регистры не сохраняются вызываемой функцией) и в конце блока
+        """
+        if not fun.is_impl: return fun
+        live = am.get(Liveness)
+        slots = fun.layout.mem_slots
+        cache = ScratchCache(self.regmap.one_time(), slots, self.ctx.symbols.scope(fun.name))
+        res = []
+        for b, (start, end) in enumerate(live.cfg.blocks):
+            live_after = dict(live.walk(b))
+            for n in range(start, end):
+                i, after = fun.body[n], live_after[n]
+                pre, post = [], []
+                in_mem = [v for v in i.v_inputs if not isinstance(slots[v], HRegVar)]
+                out_mem = [v for v in i.v_outputs if not isinstance(slots[v], HRegVar)]
+                if isinstance(i, IRStCall):
+                    # аргументы и результат вызова передаются через память напрямую
+                    cache.flush(pre, (after - set(i.v_outputs)) | set(i.v_inputs))
+                    cache.clear()
+                else:
+                    pinned = {*in_mem, *out_mem}
+                    in_repl = {v: cache.get(v, pinned, pre, after, load=True) for v in in_mem}
+                    out_repl = {v: cache.define(v, pinned, pre, after) for v in out_mem}
+                    statement_substitute_vars(i, in_repl, out_repl)
+                    if is_terminator(i):
+                        cache.flush(pre, after)
+                    elif n == end - 1:
+                        cache.flush(post, after)
+                    cache.expire(after)
+
+                if pre and i.label is not None:
+                    # переход на метку не должен пропускать загрузки
+                    res.append(IRStatement(label=i.label))
+                    i.label = None
+                res.extend(pre)
+                res.append(i)
+                res.extend(post)
+            cache.clear()
+
+        fun.body = res
+        return fun
+
+    def fun_extract_strings(self, fun: IRFun, am: AnalysisManager) -> IRFun:
         if not fun.is_impl: return fun
+        names = self.ctx.symbols.scope(fun.name)
         for i in range(len(fun.body)):
             v = fun.body[i]
             if isinstance(v, IRStStoreValue) and isinstance(v.value, IRStringValue):
-                label = random_string(16)
+                label = names.string()
                 self.ctx.globals.append(
                     IRGlobal(label, IRType.STRING, IRStringValue(v.value.value))
                 )
                 v.value.value = label  # replace actual string with label
         return fun
 
-    def fun_prepare_stack(self, fun: IRFun) -> IRFun:
+    def fun_fold_constants(self, fun: IRFun, am: AnalysisManager) -> IRFun:
+        """
+        вычислить при компиляции операции над известными значениями, в т.ч. распространенными
+        через копирования и между блоками; условные переходы по известному значению
+        становятся безусловными или исчезают
+        """
+        if not fun.is_impl: return fun
+        return fold_constants(fun, am, exclude={i.name for i in self.ctx.globals})
+
+    def fun_drop_dead_code(self, fun: IRFun, am: AnalysisManager) -> IRFun:
+        """ убрать вычисления, результат которых никто не читает (остаются после свертки констант) """
+        if not fun.is_impl: return fun
+        return drop_dead_code(fun, am, exclude={i.name for i in self.ctx.globals})
+
+    def fun_prepare_stack(self, fun: IRFun, am: AnalysisManager) -> IRFun:
         if not fun.is_impl: return fun
         used_regs = {i.reg for i in fun.layout.mem_slots.values() if isinstance(i, HRegVar)}
+        saved = [i for i in self.regmap.callee_saved() if i in {RV64Reg.RA, RV64Reg.FP} or i in used_regs]
+        return self.fun_layout_stack(fun, saved)
 
+    def fun_prepare_frame(self, fun: IRFun, am: AnalysisManager) -> IRFun:
+        """
+        минимальный кадр: ra сохраняется, только если функция что-то вызывает, fp - только если он занят
+        (кадр адресуется от sp). размер выровнен на 16 байт по ABI, пустой кадр не выделяется вовсе
+        """
+        if not fun.is_impl: return fun
+        used_regs = {i.reg for i in fun.layout.mem_slots.values() if isinstance(i, HRegVar)}
+        if am.get(Calls).sites:
+            used_regs.add(RV64Reg.RA)
+        fun.layout.align = 16
+        return self.fun_layout_stack(fun, [i for i in self.regmap.callee_saved() if i in used_regs])
+
+    def fun_layout_stack(self, fun: IRFun, saved: List[Reg]) -> IRFun:
+        """
+        снизу вверх: аргументы, передаваемые на стеке вызываемым функциям, копии сохраняемых регистров,
+        переменные на стеке. над кадром - параметры, переданные на стеке этой функции
+        """
         stack_slot_size = 8
-        stack_pos = 0
-        for reg in self.regmap.callee_saved():
-            if reg not in {RV64Reg.RA, RV64Reg.FP} and reg not in used_regs:
-                continue
+        on_stack = [len(i.arg_vars) - len(self.regmap.params()) for i in fun.body if isinstance(i, IRStCall)]
+        fun.layout.outgoing = max([0, *on_stack]) * stack_slot_size
+        stack_pos = fun.layout.outgoing
+        for reg in saved:
             fun.layout.stack.append(HStackRegCopy(stack_pos, stack_slot_size, reg.name, reg))
             stack_pos += stack_slot_size
 
         for key in fun.layout.mem_slots:
             v = fun.layout.mem_slots[key]
-            if isinstance(v, HStackVar):
+            if isinstance(v, HStackVar) and not isinstance(v, HArgVar):
                 v.pos = stack_pos
                 fun.layout.stack.append(v)
                 stack_pos += stack_slot_size
 
+        for v in fun.layout.mem_slots.values():
+            if isinstance(v, HArgVar):
+                v.pos = fun.layout.frame_size + v.index * stack_slot_size
         return fun
 
     def process_function(self, fun: IRFun) -> IRFun:
-        fun = self.fun_extract_strings(fun)
-        fun = self.fun_allocate_vars(fun)
-        fun = self.fun_prepare_stack(fun)
-        fun = self.fun_add_var_moves(fun)
-        return fun
-
-
-def detect_locals(fun: IRFun) -> Dict[str, Tuple[int, int]]:
-    """
-    найти используемые переменные, заодно оценить частоту использования
-    :return (r, w)
-    """
-    if not fun.is_impl: return {}
-
-    result = {}
-    for i in fun.body:
-        if isinstance(i, IRStatement):
-            for v in i.v_inputs:
-                if v not in result: result[v] = [0, 0]
-                result[v][0] += 1
-            for v in i.v_outputs:
-                if v not in result: result[v] = [0, 0]
-                result[v][1] += 1
-    return result
+        return self.passes.run(fun)
 
 
 def statement_substitute_vars(x: IRStatement, irepl: Dict[str, str], orepl: Dict[str, str]) -> IRStatement:
@@ -170,4 +424,5 @@ def statement_substitute_vars(x: IRStatement, irepl: Dict[str, str], orepl: Dict
         case IRStCall(_, arg_vars, assign_var):
             x.arg_vars = [irepl.get(i, i) for i in arg_vars]
             x.assign_var = orepl.get(assign_var, assign_var)
+    x.refresh()
     return x
@@ -0,0 +1,292 @@
+"""
+Pass manager for IRFun with lazily computed, cached analyses.
+
+A pass declares analyses it requires and analyses it preserves. Analyses are computed
+on first request (by the pass or by other analyses) and reused until a pass that does not
+preserve them runs. Passes that only touch layout or values, not the statements, preserve ALL.
+"""
+
+from dataclasses import dataclass
+from typing import *
+
+from backend.ir.ir import *
+from instrument import run_pass, stage
+
+
+class Analysis:
+    """ result of analysis of one function, built by AnalysisManager.get() """
+
+    def __init__(self, fun: IRFun, am: 'AnalysisManager'):
+        self.fun = fun
+
+
+class AnalysisManager:
+    def __init__(self, fun: IRFun):
+        self.fun = fun
+        self.results: Dict[Type[Analysis], Analysis] = {}
+        self.computed = 0  # number of analysis runs
+
+    def get[T: Analysis](self, analysis: Type[T]) -> T:
+        if (res := self.results.get(analysis)) is None:
+            with stage(analysis.__name__, self.fun.name):
+                res = analysis(self.fun, self)
+            self.results[analysis] = res
+            self.computed += 1
+        return res
+
+    def invalidate(self, preserved: Union[Collection[Type[Analysis]], str] = ()):
+        if preserved == ALL:
+            return
+        self.results = {k: v for k, v in self.results.items() if k in preserved}
+
+
+ALL = "all"
+
+
+@dataclass
+class Pass:
+    name: str
+    run: Callable[[IRFun, AnalysisManager], IRFun]
+    requires: Tuple[Type[Analysis], ...] = ()
+    preserves: Union[Tuple[Type[Analysis], ...], str] = ()
+
+
+class PassManager:
+    def __init__(self, passes: List[Pass]):
+        self.passes = passes
+
+    def run(self, fun: IRFun) -> IRFun:
+        """ all passes over function, each one recorded under its name """
+        am = AnalysisManager(fun)
+        for p in self.passes:
+            if fun.is_impl:
+                for i in p.requires:
+                    am.get(i)
+            res = run_pass(p.name, lambda f: p.run(f, am), fun, fun.name)
+            if res is not fun:
+                am = AnalysisManager(res)
+            else:
+                am.invalidate(p.preserves)
+            fun = res
+        return fun
+
+
+"""
+Analyses of function body
+"""
+
+
+def is_terminator(st: IRStatement) -> bool:
+    return isinstance(st, (IRStJump, IRStCJump, IRStReturn))
+
+
+class DefUse(Analysis):
+    """ variables read and written by statements, in order of first appearance """
+
+    def __init__(self, fun: IRFun, am: AnalysisManager):
+        super().__init__(fun, am)
+        self.uses: Dict[str, List[int]] = {}
+        self.defs: Dict[str, List[int]] = {}
+        # [reads, writes] of each variable
+        self.counts: Dict[str, List[int]] = {}
+        for n, st in enumerate(fun.body or ()):
+            for v in st.v_inputs:
+                self.counts.setdefault(v, [0, 0])[0] += 1
+                self.uses.setdefault(v, []).append(n)
+            for v in st.v_outputs:
+                self.counts.setdefault(v, [0, 0])[1] += 1
+                self.defs.setdefault(v, []).append(n)
+
+
+class CFG(Analysis):
+    """
+    basic blocks as [start, end) ranges of body, successors and predecessors by block index.
+    jumps to exit label and returns have no successors
+    """
+
+    def __init__(self, fun: IRFun, am: AnalysisManager):
+        super().__init__(fun, am)
+        body = fun.body or []
+        leaders = {0} if body else set()
+        for n, st in enumerate(body):
+            if st.label is not None:
+                leaders.add(n)
+            if is_terminator(st) and n + 1 < len(body):
+                leaders.add(n + 1)
+        starts = sorted(leaders)
+        self.blocks: List[Tuple[int, int]] = list(zip(starts, starts[1:] + [len(body)]))
+        self.block_of_label: Dict[str, int] = {}
+        for b, (start, _) in enumerate(self.blocks):
+            if body[start].label is not None:
+                self.block_of_label[body[start].label] = b
+
+        self.succ: List[List[int]] = []
+        for b, (start, end) in enumerate(self.blocks):
+            last = body[end - 1]
+            follow = [b + 1] if b + 1 < len(self.blocks) else []
+            match last:
+                case IRStJump(target):
+                    res = self.target(target)
+                case IRStCJump(_, _, target):
+                    res = self.target(target) + [i for i in follow if i not in self.target(target)]
+                case IRStReturn():
+                    res = []
+                case _:
+                    res = follow
+            self.succ.append(res)
+        self.pred: List[List[int]] = [[] for _ in self.blocks]
+        for b, succ in enumerate(self.succ):
+            for s in succ:
+                self.pred[s].append(b)
+
+    def target(self, label: str) -> List[int]:
+        if label == self.fun.exit_label:
+            return []
+        if label not in self.block_of_label:
+            raise Exception(f"{self.fun.name}: jump to unknown label {label}")
+        return [self.block_of_label[label]]
+
+    def postorder(self) -> List[int]:
+        """ blocks reachable from entry, iteratively in DFS postorder """
+        if not self.blocks:
+            return []
+        seen, res = {0}, []
+        stack = [(0, iter(self.succ[0]))]
+        while stack:
+            b, it = stack[-1]
+            for s in it:
+                if s not in seen:
+                    seen.add(s)
+                    stack.append((s, iter(self.succ[s])))
+                    break
+            else:
+                stack.pop()
+                res.append(b)
+        return res
+
+
+class Liveness(Analysis):
+    """ variables live at entry and exit of each block; per-statement sets are recomputed by walk() """
+
+    def __init__(self, fun: IRFun, am: AnalysisManager):
+        super().__init__(fun, am)
+        self.cfg = cfg = am.get(CFG)
+        body = fun.body or []
+        # upward exposed uses and definitions of blocks
+        self.gen: List[Set[str]] = []
+        self.kill: List[Set[str]] = []
+        for start, end in cfg.blocks:
+            gen, kill = set(), set()
+            for st in body[start:end]:
+                gen.update(v for v in st.v_inputs if v not in kill)
+                kill.update(st.v_outputs)
+            self.gen.append(gen)
+            self.kill.append(kill)
+
+        n = len(cfg.blocks)
+        self.live_in: List[Set[str]] = [set(i) for i in self.gen]
+        self.live_out: List[Set[str]] = [set() for _ in range(n)]
+        # unreachable blocks are processed too: their code is still emitted
+        order = cfg.postorder()
+        order += [b for b in range(n) if b not in set(order)]
+        changed = True
+        while changed:
+            changed = False
+            for b in order:
+                out = set().union(*(self.live_in[s] for s in cfg.succ[b])) if cfg.succ[b] else set()
+                if out != self.live_out[b]:
+                    self.live_out[b] = out
+                    self.live_in[b] = self.gen[b] | (out - self.kill[b])
+                    changed = True
+
+    def walk(self, block: int) -> Iterator[Tuple[int, Set[str]]]:
+        """ (statement index, variables live after it) from last statement of block to first """
+        start, end = self.cfg.blocks[block]
+        body = self.fun.body
+        live = set(self.live_out[block])
+        for n in range(end - 1, start - 1, -1):
+            yield n, live
+            st = body[n]
+            live = (live - set(st.v_outputs)) | set(st.v_inputs)
+
+
+class Calls(Analysis):
+    """ call statements and variables live across any of them (in registers they must survive the call) """
+
+    def __init__(self, fun: IRFun, am: AnalysisManager):
+        super().__init__(fun, am)
+        live = am.get(Liveness)
+        self.sites: List[int] = []
+        self.crossing: Set[str] = set()
+        for b in range(len(live.cfg.blocks)):
+            for n, live_after in live.walk(b):
+                st = fun.body[n]
+                if isinstance(st, IRStCall):
+                    self.sites.append(n)
+                    self.crossing.update(live_after - set(st.v_outputs))
+        self.sites.sort()
+
+
+class Dominators(Analysis):
+    """ immediate dominators of reachable blocks (Cooper, Harvey, Kennedy) """
+
+    def __init__(self, fun: IRFun, am: AnalysisManager):
+        super().__init__(fun, am)
+        cfg = am.get(CFG)
+        post = cfg.postorder()
+        number = {b: n for n, b in enumerate(post)}
+        self.idom: Dict[int, int] = {0: 0} if post else {}
+        changed = True
+        while changed:
+            changed = False
+            for b in reversed(post):
+                if b == 0:
+                    continue
+                preds = [p for p in cfg.pred[b] if p in self.idom]
+                new = preds[0]
+                for p in preds[1:]:
+                    new = self.intersect(p, new, number)
+                if self.idom.get(b) != new:
+                    self.idom[b] = new
+                    changed = True
+
+    def intersect(self, a: int, b: int, number: Dict[int, int]) -> int:
+        while a != b:
+            while number[a] < number[b]:
+                a = self.idom[a]
+            while number[b] < number[a]:
+                b = self.idom[b]
+        return a
+
+    def dominates(self, a: int, b: int) -> bool:
+        if b not in self.idom:
+            return False
+        while b != a and b != 0:
+            b = self.idom[b]
+        return b == a
+
+
+class Loops(Analysis):
+    """ natural loops from back edges; loop depth of each block """
+
+    def __init__(self, fun: IRFun, am: AnalysisManager):
+        super().__init__(fun, am)
+        cfg, dom = am.get(CFG), am.get(Dominators)
+        self.depth: List[int] = [0] * len(cfg.blocks)
+        self.headers: Set[int] = set()
+        for b, succ in enumerate(cfg.succ):
+            for h in succ:
+                if dom.dominates(h, b):
+                    self.headers.add(h)
+                    for i in self.body(cfg, h, b):
+                        self.depth[i] += 1
+
+    @staticmethod
+    def body(cfg: CFG, header: int, latch: int) -> Set[int]:
+        res, work = {header, latch}, [latch]
+        while work:
+            for p in cfg.pred[work.pop()]:
+                if p not in res:
+                    res.add(p)
+                    work.append(p)
+        return res
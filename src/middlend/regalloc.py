@@ -0,0 +1,248 @@
+"""
+Register allocation: linear scan over live intervals (fast, O1) and graph coloring
+with coalescing of copies (O2).
+
+For linear scan statement n of function body reads its inputs at position 2n and writes its outputs at 2n+1,
+so a variable last read by a statement may share register with the one this statement defines.
+Each variable gets a single interval from its first to its last live position (holes are not tracked).
+"""
+
+from dataclasses import dataclass
+from typing import *
+
+from backend.hw.reg import Reg
+from backend.ir.ir import *
+from middlend.passes import AnalysisManager, Liveness, Loops
+
+# weight of a use inside loop grows with loop depth, as it is executed more often
+LOOP_WEIGHT = 10
+
+
+@dataclass(slots=True)
+class Interval:
+    name: str
+    start: int
+    end: int
+    weight: float = 0  # spill cost: uses and defs weighted by loop depth
+    reg: Optional[Reg] = None
+
+    @property
+    def density(self) -> float:
+        """ short intervals of temporaries are cheap to keep in register, long rarely used ones are not """
+        return self.weight / (self.end - self.start + 1)
+
+
+class LiveIntervals:
+    """
+    intervals of function variables, except those in 'exclude' (globals, params on stack).
+    'entry' variables (params in registers) are defined on entry, before the first statement
+    """
+
+    def __init__(self, fun: IRFun, am: AnalysisManager, exclude: Collection[str] = (), entry: Collection[str] = ()):
+        live, loops = am.get(Liveness), am.get(Loops)
+        body = fun.body
+        self.intervals: Dict[str, Interval] = {}
+
+        def cover(name: str, pos: int):
+            if name in exclude:
+                return
+            if (i := self.intervals.get(name)) is None:
+                self.intervals[name] = Interval(name, pos, pos)
+            elif pos < i.start:
+                i.start = pos
+            elif pos > i.end:
+                i.end = pos
+
+        for b, (start, _) in enumerate(live.cfg.blocks):
+            weight = LOOP_WEIGHT ** loops.depth[b]
+            for v in live.live_in[b]:
+                cover(v, 2 * start)
+            for n, live_after in live.walk(b):
+                st = body[n]
+                for v in st.v_inputs:
+                    cover(v, 2 * n)
+                for v in st.v_outputs:
+                    cover(v, 2 * n + 1)
+                for v in live_after:
+                    cover(v, 2 * n + 1)
+                    cover(v, 2 * n + 2)
+                for v in (*st.v_inputs, *st.v_outputs):
+                    if v in self.intervals:
+                        self.intervals[v].weight += weight
+        for v in entry:
+            if v in self.intervals:
+                cover(v, 0)
+
+
+def linear_scan(intervals: Iterable[Interval], regs: List[Reg],
+                allowed: Optional[Dict[str, List[Reg]]] = None,
+                hints: Optional[Dict[str, Reg]] = None) -> List[Interval]:
+    """
+    assign registers to intervals (Poletto, Sarkar). when registers run out, the interval
+    with the least spill weight per its length among active and the new one is left without register.
+    'regs' are in order of preference, 'allowed' restricts registers of some variables,
+    'hints' are registers variables would better take (params take registers they come in).
+    :return spilled intervals
+    """
+    allowed, hints = allowed or {}, hints or {}
+    free = list(regs)
+    active: List[Interval] = []  # sorted by end
+    spilled = []
+    # hinted intervals go first among those starting together;
+    # names break ties: iteration order of live sets differs between runs
+    for cur in sorted(intervals, key=lambda i: (i.start, i.name not in hints, i.end, i.name)):
+        while active and active[0].end < cur.start:
+            free.append(active.pop(0).reg)
+        ok = allowed.get(cur.name, regs)
+        if candidates := [i for i in free if i in ok]:
+            hint = hints.get(cur.name)
+            cur.reg = hint if hint in candidates else min(candidates, key=regs.index)
+            free.remove(cur.reg)
+        else:
+            victim = min((i for i in active if i.reg in ok), key=lambda i: (i.density, -i.end), default=None)
+            if victim is None or victim.density >= cur.density:
+                spilled.append(cur)
+                continue
+            cur.reg, victim.reg = victim.reg, None
+            active.remove(victim)
+            spilled.append(victim)
+        active.append(cur)
+        active.sort(key=lambda i: i.end)
+    return spilled
+
+
+class InterferenceGraph:
+    """
+    variables (except 'exclude') that may not share a register: a definition interferes with
+    everything live after it, except the source of a copy, which holds the same value.
+    copies between variables are kept as move-related pairs for coalescing.
+    'entry' variables (params in registers) are defined on entry, before the first statement
+    """
+
+    def __init__(self, fun: IRFun, am: AnalysisManager, exclude: Collection[str] = (), entry: Collection[str] = ()):
+        live, loops = am.get(Liveness), am.get(Loops)
+        body = fun.body
+        # node order follows the body, so that allocation does not depend on order of live sets
+        self.order: Dict[str, int] = {}
+        self.adj: Dict[str, Set[str]] = {}
+        self.cost: Dict[str, float] = {}  # spill cost: uses and defs weighted by loop depth
+        self.moves: List[Tuple[str, str]] = []
+
+        for st in body:
+            for v in (*st.v_inputs, *st.v_outputs):
+                if v not in exclude and v not in self.order:
+                    self.order[v] = len(self.order)
+                    self.adj[v] = set()
+                    self.cost[v] = 0
+
+        for b in range(len(live.cfg.blocks)):
+            weight = LOOP_WEIGHT ** loops.depth[b]
+            for n, live_after in live.walk(b):
+                st = body[n]
+                for v in (*st.v_inputs, *st.v_outputs):
+                    if v in self.adj:
+                        self.cost[v] += weight
+                copied = st.arg if isinstance(st, IRStUnOp) and st.operation == IRUOp.COPY else None
+                for d in st.v_outputs:
+                    if d not in self.adj:
+                        continue
+                    for v in live_after:
+                        if v != d and v != copied and v in self.adj:
+                            self.adj[d].add(v)
+                            self.adj[v].add(d)
+                    if copied in self.adj and copied != d:
+                        self.moves.append((d, copied))
+
+        defined = [v for v in entry if v in self.adj]
+        live_in = [v for v in live.live_in[0] if v in self.adj] if live.cfg.blocks else []
+        for d in defined:
+            for v in (*defined, *live_in):
+                if v != d:
+                    self.adj[d].add(v)
+                    self.adj[v].add(d)
+
+    def sorted(self, names: Iterable[str]) -> List[str]:
+        return sorted(names, key=self.order.__getitem__)
+
+
+def color_graph(graph: InterferenceGraph, regs: List[Reg],
+                allowed: Optional[Dict[str, List[Reg]]] = None,
+                hints: Optional[Dict[str, Reg]] = None) -> Dict[str, Optional[Reg]]:
+    """
+    Chaitin-Briggs allocation: conservative coalescing of copies, simplification with optimistic
+    push of the cheapest (cost / degree) node when all have K or more neighbours, then coloring
+    in reverse, biased towards registers of still move-related variables.
+    'regs' are in order of preference, 'allowed' restricts registers of some variables,
+    K of a node is the number of its registers. a register in 'hints' is preferred over others.
+    :return register of each variable, None for spilled
+    """
+    ok = {v: (allowed or {}).get(v, regs) for v in graph.adj}
+    adj = {v: set(n) for v, n in graph.adj.items()}
+    cost = dict(graph.cost)
+    alias: Dict[str, str] = {}
+
+    def find(v: str) -> str:
+        while v in alias:
+            v = alias[v]
+        return v
+
+    # Briggs: merged node has fewer than K neighbours of significant degree, so it stays colorable
+    changed = True
+    while changed:
+        changed = False
+        for a, b in graph.moves:
+            a, b = find(a), find(b)
+            if a == b or b in adj[a]:
+                continue
+            if graph.order[b] < graph.order[a]:
+                a, b = b, a
+            merged = [r for r in ok[a] if r in ok[b]]
+            if sum(len(adj[n]) >= len(ok[n]) for n in adj[a] | adj[b]) >= len(merged):
+                continue
+            ok[a] = merged
+            for n in adj.pop(b):
+                adj[n].discard(b)
+                adj[n].add(a)
+                adj[a].add(n)
+            cost[a] += cost.pop(b)
+            alias[b] = a
+            changed = True
+
+    degree = {v: len(n) for v, n in adj.items()}
+    low = [v for v in graph.sorted(adj) if degree[v] < len(ok[v])]
+    high = {v for v in adj if degree[v] >= len(ok[v])}
+    stack, removed = [], set()
+    while low or high:
+        if low:
+            v = low.pop()
+        else:
+            v = min(high, key=lambda i: (cost[i] / degree[i], graph.order[i]))
+            high.remove(v)
+        stack.append(v)
+        removed.add(v)
+        for n in graph.sorted(adj[v] - removed):
+            degree[n] -= 1
+            if degree[n] == len(ok[n]) - 1:
+                high.discard(n)
+                low.append(n)
+
+    partners: Dict[str, List[str]] = {v: [] for v in adj}
+    for a, b in graph.moves:
+        a, b = find(a), find(b)
+        if a != b:
+            partners[a].append(b)
+            partners[b].append(a)
+
+    hinted: Dict[str, Reg] = {}
+    for v, reg in (hints or {}).items():
+        if v in graph.adj:
+            hinted.setdefault(find(v), reg)
+
+    colors: Dict[str, Optional[Reg]] = {}
+    for v in reversed(stack):
+        used = {colors[n] for n in adj[v] if n in colors}
+        free = [r for r in ok[v] if r not in used]
+        preferred = [hinted[v]] if hinted.get(v) in free else []
+        preferred += [colors[p] for p in partners[v] if colors.get(p) in free]
+        colors[v] = (preferred or free or [None])[0]
+    return {v: colors[find(v)] for v in graph.adj}
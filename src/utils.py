@@ -3,14 +3,11 @@ import os
 import re
 import shlex
 import signal
-import string
 import subprocess
 from collections.abc import generator
 from os.path import dirname, realpath
 from typing import Optional, Tuple, List, Type, Any
-import random
 
-random.seed(42)
 
 def dirpath(f):
     return dirname(realpath(f))
@@ -56,19 +53,29 @@ def string_unescape(s: str) -> str:
     return codecs.escape_decode(s)[0].decode("ascii")
 
 
-def class_hierarchy(x) -> List[Type]:
-    res = [x.__class__]
+def type_hierarchy(t: Type) -> List[Type]:
+    res = [t]
     while (base := res[-1].__base__) is not None: res.append(base)
     return res
 
 
+def class_hierarchy(x) -> List[Type]:
+    return type_hierarchy(x.__class__)
+
+
 def str_class_hierarchy(x) -> List[str]:
     return [i.__name__ for i in class_hierarchy(x)]
 
-def random_string(n: int=6) -> str:
-    return ''.join(random.choices(string.ascii_lowercase, k=n))
-
 def flatten(x: Any) -> List:
+    res = []
+    _flatten_into(x, res)
+    return res
+
+
+def _flatten_into(x: Any, res: List):
     if isinstance(x, list | tuple | generator | set):
-        return sum([flatten(i) for i in x], start=[])
-    return [x]
+        for i in x:
+            _flatten_into(i, res)
+    else:
+        res.append(x)
+
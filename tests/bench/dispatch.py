@@ -0,0 +1,96 @@
+"""
+Visits per second of BaseTransformer/BaseVisitor dispatch on a large synthetic program:
+per-visit hierarchy walk (before) vs cached per-class dispatch tables (after).
+
+usage: python tests/bench/dispatch.py [-f FUNCTIONS] [-s STATEMENTS]
+"""
+import argparse
+import copy
+import sys
+import time
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.realpath(__file__)), "..", "..", "src"))
+
+from backend.base.base_transformer import Dispatcher
+from backend.hw.rv64 import RV64Reg
+from backend.ir2asm import RV64IR2ASMTransformer
+from frontend.astdef import do_parse_ast
+from middlend.ast2ir import AST2IR
+from middlend.opt import RV64IR2HIRTransformer
+from utils import str_class_hierarchy
+
+
+def synthetic_source(functions: int, statements: int) -> str:
+    res = ["void putc(char c);"]
+    for f in range(functions):
+        body = []
+        for s in range(statements):
+            body.append(f"  int v{s} = (a + {s}) * b - (a << 2) / (b + 1);")
+            body.append(f"  if (v{s} < a) {{ a = a + v{s}; }} else {{ b = b - 1; }}")
+        res.append(f"int f{f}(int a, int b) {{\n" + "\n".join(body) + "\n  return a;\n}")
+    return "\n".join(res)
+
+
+def legacy_handlers(self, node):
+    """ dispatch as it was done before: hierarchy walk and name lookups on each visit """
+    return tuple(getattr(type(self), i) for i in str_class_hierarchy(node)[::-1] if hasattr(self, i))
+
+
+cached_handlers = Dispatcher.handlers
+
+
+def count_visits(fn) -> int:
+    visits = 0
+
+    def counting(self, node):
+        nonlocal visits
+        visits += 1
+        return cached_handlers(self, node)
+
+    Dispatcher.handlers = counting
+    try:
+        fn()
+    finally:
+        Dispatcher.handlers = cached_handlers
+    return visits
+
+
+def measure(fn, handlers, repeat: int) -> float:
+    Dispatcher.handlers = handlers
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            t = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t)
+        return best
+    finally:
+        Dispatcher.handlers = cached_handlers
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-f", "--functions", type=int, default=50)
+    ap.add_argument("-s", "--statements", type=int, default=100)
+    ap.add_argument("-r", "--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    ast = do_parse_ast(synthetic_source(args.functions, args.statements))
+    ir = AST2IR()(ast)
+    hir = RV64IR2HIRTransformer(RV64Reg)(copy.deepcopy(ir))
+
+    cases = {
+        "AST2IR": lambda: AST2IR()(ast),
+        "RV64IR2ASMTransformer": lambda: RV64IR2ASMTransformer()(hir),
+    }
+    print(f"{'':<24}{'visits':>10}{'before, v/s':>14}{'after, v/s':>14}{'speedup':>9}")
+    for name, fn in cases.items():
+        visits = count_visits(fn)
+        before = measure(fn, legacy_handlers, args.repeat)
+        after = measure(fn, cached_handlers, args.repeat)
+        print(f"{name:<24}{visits:>10}{visits / before:>14.0f}{visits / after:>14.0f}{before / after:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
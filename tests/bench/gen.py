@@ -0,0 +1,140 @@
+"""
+Generator of valid, terminating programs in the supported C subset, for throughput benchmarks.
+
+usage: python tests/bench/gen.py [-f FUNCTIONS] [-s STATEMENTS] [-d DEPTH] [-n NESTING] [-g GLOBALS] [--seed SEED]
+"""
+import argparse
+import random
+from dataclasses import dataclass
+from typing import List
+
+BINARY = ["+", "-", "*", "&", "|", "<<", ">>", "<", "<=", "==", "!=", "&&", "||"]
+UNARY = ["-", "~", "!"]
+
+
+@dataclass
+class GenParams:
+    functions: int = 10  # besides main
+    statements: int = 20  # per function body, nested ones included
+    depth: int = 3  # max expression depth
+    nesting: int = 2  # max loop nesting
+    globals: int = 4
+    seed: int = 0
+
+
+class Generator:
+    def __init__(self, p: GenParams):
+        self.p = p
+        self.rng = random.Random(p.seed)
+        self.lines: List[str] = []
+        self.globals = [f"g{i}" for i in range(p.globals)]
+        self.functions: List[str] = []  # callable ones: defined before, so there is no recursion
+        self.vars: List[str] = []
+        self.counter = 0
+        self.budget = 0
+
+    def emit(self, indent: int, line: str):
+        self.lines.append("  " * indent + line)
+
+    def fresh(self) -> str:
+        self.counter += 1
+        return f"v{self.counter}"
+
+    def expr(self, depth: int) -> str:
+        rng = self.rng
+        readable = self.vars + self.globals
+        if depth <= 0 or rng.random() < 0.2:
+            if readable and rng.random() < 0.7:
+                return rng.choice(readable)
+            return str(rng.randint(0, 100))
+        match rng.randrange(8):
+            case 0:
+                return f"{rng.choice(UNARY)}({self.expr(depth - 1)})"
+            case 1:
+                # divisor is odd, never zero
+                return f"({self.expr(depth - 1)} {rng.choice('/%')} ({self.expr(depth - 1)} | 1))"
+            case 2 if self.functions:
+                return f"{rng.choice(self.functions)}({self.expr(depth - 1)}, {self.expr(depth - 1)})"
+            case _:
+                return f"({self.expr(depth - 1)} {rng.choice(BINARY)} {self.expr(depth - 1)})"
+
+    def block(self, indent: int, nesting: int):
+        scope = len(self.vars)
+        while self.budget > 0:
+            self.budget -= 1
+            self.statement(indent, nesting)
+            if self.rng.random() < 0.15 and indent > 1:
+                break
+        del self.vars[scope:]
+
+    def statement(self, indent: int, nesting: int):
+        rng = self.rng
+        depth = self.p.depth
+        match rng.randrange(7):
+            case 0 | 1:
+                name = self.fresh()
+                self.emit(indent, f"int {name} = {self.expr(depth)};")
+                self.vars.append(name)
+            case 2 if self.vars or self.globals:
+                self.emit(indent, f"{rng.choice(self.vars + self.globals)} = {self.expr(depth)};")
+            case 3:
+                self.emit(indent, f"if ({self.expr(depth)}) {{")
+                self.block(indent + 1, nesting)
+                self.emit(indent, "} else {")
+                self.block(indent + 1, nesting)
+                self.emit(indent, "}")
+            case 4 if nesting > 0:
+                # loop counter is assigned only here
+                i = self.fresh()
+                self.emit(indent, f"int {i} = 0;")
+                self.emit(indent, f"while ({i} < {rng.randint(1, 4)}) {{")
+                self.block(indent + 1, nesting - 1)
+                self.emit(indent + 1, f"{i}++;")
+                self.emit(indent, "}")
+            case 5 if self.functions:
+                self.emit(indent, f"{rng.choice(self.functions)}({self.expr(depth)}, {self.expr(depth)});")
+            case _:
+                self.emit(indent, f"putc('a' + ({self.expr(depth)} & 15));")
+
+    def function(self, name: str):
+        self.emit(0, f"int {name}(int a, int b) {{")
+        self.vars = ["a", "b"]
+        self.budget = self.p.statements
+        self.block(1, self.p.nesting)
+        self.emit(1, f"return {self.expr(self.p.depth)};")
+        self.emit(0, "}")
+        self.emit(0, "")
+
+    def program(self) -> str:
+        self.emit(0, "void putc(char c);")
+        for g in self.globals:
+            self.emit(0, f"int {g} = {self.rng.randint(0, 100)};")
+        self.emit(0, "")
+        for i in range(self.p.functions):
+            name = f"f{i}"
+            self.function(name)
+            self.functions.append(name)
+        self.emit(0, "void main() {")
+        for name in self.functions:
+            self.emit(1, f"{name}({self.rng.randint(0, 9)}, {self.rng.randint(0, 9)});")
+        self.emit(0, "}")
+        return "\n".join(self.lines) + "\n"
+
+
+def generate_program(p: GenParams) -> str:
+    return Generator(p).program()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-f", "--functions", type=int, default=GenParams.functions)
+    ap.add_argument("-s", "--statements", type=int, default=GenParams.statements)
+    ap.add_argument("-d", "--depth", type=int, default=GenParams.depth)
+    ap.add_argument("-n", "--nesting", type=int, default=GenParams.nesting)
+    ap.add_argument("-g", "--globals", type=int, default=GenParams.globals)
+    ap.add_argument("--seed", type=int, default=GenParams.seed)
+    print(generate_program(GenParams(**vars(ap.parse_args()))), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+// shifts and masks, many live values
+// expect: 12642605
+
+int popcount(int x) {
+  int c = 0;
+  while (x != 0) {
+    c = c + (x & 1);
+    x = x >> 1;
+  }
+  return c;
+}
+
+int kernel() {
+  int s = 0;
+  int h = 5381;
+  int i = 0;
+  while (i < 2000) {
+    s = s + popcount(i);
+    h = ((h << 5) + h + (i & 255)) & 16777215;
+    i++;
+  }
+  return s * 31 + h;
+}
@@ -0,0 +1,25 @@
+// data-dependent branches
+// expect: 14167
+
+int steps(int n) {
+  int s = 0;
+  while (n != 1) {
+    if (n % 2 == 0) {
+      n = n / 2;
+    } else {
+      n = 3 * n + 1;
+    }
+    s++;
+  }
+  return s;
+}
+
+int kernel() {
+  int total = 0;
+  int n = 1;
+  while (n <= 300) {
+    total = total + steps(n);
+    n++;
+  }
+  return total;
+}
@@ -0,0 +1,11 @@
+// recursion: calls, frames, returns
+// expect: 2584
+
+int fib(int n) {
+  if (n < 2) return n;
+  return fib(n - 1) + fib(n - 2);
+}
+
+int kernel() {
+  return fib(18);
+}
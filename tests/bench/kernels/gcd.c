@@ -0,0 +1,25 @@
+// Euclid's algorithm: short loops around remainder
+// expect: 3832
+
+int gcd(int a, int b) {
+  while (b != 0) {
+    int t = a % b;
+    a = b;
+    b = t;
+  }
+  return a;
+}
+
+int kernel() {
+  int s = 0;
+  int i = 1;
+  while (i < 40) {
+    int j = 1;
+    while (j < 40) {
+      s = s + gcd(i, j);
+      j++;
+    }
+    i++;
+  }
+  return s;
+}
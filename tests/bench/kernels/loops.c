@@ -0,0 +1,16 @@
+// nested counted loops with arithmetic in the body
+// expect: 291524
+
+int kernel() {
+  int s = 0;
+  int i = 0;
+  while (i < 120) {
+    int j = 0;
+    while (j < 120) {
+      s = (s + i * j + (i | j)) % 1000003;
+      j++;
+    }
+    i++;
+  }
+  return s;
+}
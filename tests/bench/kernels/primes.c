@@ -0,0 +1,22 @@
+// trial division: division, remainder and early loop exits
+// expect: 303
+
+int is_prime(int n) {
+  if (n < 2) return 0;
+  int d = 2;
+  while (d * d <= n) {
+    if (n % d == 0) return 0;
+    d++;
+  }
+  return 1;
+}
+
+int kernel() {
+  int count = 0;
+  int n = 0;
+  while (n < 2000) {
+    count = count + is_prime(n);
+    n++;
+  }
+  return count;
+}
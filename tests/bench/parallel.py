@@ -0,0 +1,58 @@
+"""
+Speedup curve of parallel per-function backend: compilation time of a large synthetic program
+for growing number of worker processes (pool startup included).
+
+usage: python tests/bench/parallel.py [-f FUNCTIONS] [-s STATEMENTS] [-j MAX_JOBS]
+"""
+import argparse
+import os
+import sys
+import time
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.realpath(__file__)), "..", "..", "src"))
+sys.path.insert(0, path.dirname(path.realpath(__file__)))
+
+from dispatch import synthetic_source
+from driver.pipeline import do_compile
+from frontend.astdef import do_parse_ast
+
+
+def measure(prog, jobs: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        do_compile(prog, jobs=jobs)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-f", "--functions", type=int, default=200)
+    ap.add_argument("-s", "--statements", type=int, default=20)
+    ap.add_argument("-j", "--max-jobs", type=int, default=os.cpu_count())
+    ap.add_argument("-r", "--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    prog = do_parse_ast(synthetic_source(args.functions, args.statements))
+    reference = do_compile(prog)
+
+    jobs = [1]
+    while jobs[-1] * 2 <= args.max_jobs:
+        jobs.append(jobs[-1] * 2)
+    if jobs[-1] != args.max_jobs:
+        jobs.append(args.max_jobs)
+
+    print(f"{args.functions} functions, {os.cpu_count()} cpus")
+    print(f"{'jobs':>6}{'time, s':>10}{'speedup':>9}")
+    base = None
+    for j in jobs:
+        assert do_compile(prog, jobs=j) == reference, "output depends on number of jobs"
+        t = measure(prog, j, args.repeat)
+        base = base or t
+        print(f"{j:>6}{t:>10.3f}{base / t:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Runtime cost of generated code: compute kernels from tests/bench/kernels
+run under QEMU with exact counters (-icount), instructions retired and cycles
+are read around the kernel call via zicsr (rdinstret/rdcycle from cpu_testbench/stdlib.c).
+With '--runner sim' programs run on the in-process simulator (backend.asm.sim), which also
+counts loads, stores and taken branches of the kernel call.
+Results are tracked per kernel and per optimization setting against a stored baseline
+(runtime_baseline.json); counters are exact, so by default any growth of instructions retired,
+loads or stores of a kernel is a regression and fails the run. Each record keeps the runner it was
+measured with, and is compared only with results of the same runner.
+
+Each kernel defines 'int kernel()' and states its result in a '// expect: N' comment.
+
+usage: python tests/bench/runtime.py [-k KERNEL ...] [-O SETTING ...] [--runner sim|qemu] [-j JOBS]
+                                    [--tolerance 0] [--update-baseline]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from typing import *
+
+BENCH = path.dirname(path.realpath(__file__))
+sys.path.insert(0, path.join(BENCH, "..", "..", "src"))
+sys.path.insert(0, path.join(BENCH, "..", ".."))
+
+from driver.pipeline import compile_text
+from tests.qemu import run_qemu, simulate
+
+KERNELS = path.join(BENCH, "kernels")
+BASELINE = path.join(BENCH, "runtime_baseline.json")
+
+# measured part is the kernel() call only
+HARNESS = """
+int rdinstret();
+int rdcycle();
+void putn(int n);
+void putc(char c);
+
+void main() {
+  int i0 = rdinstret();
+  int c0 = rdcycle();
+  int r = kernel();
+  int c1 = rdcycle();
+  int i1 = rdinstret();
+  putn(r);
+  putc(32);
+  putn(i1 - i0);
+  putc(32);
+  putn(c1 - c0);
+  putc(10);
+}
+"""
+
+# optimization setting -> source to assembly
+SETTINGS = {
+    "O0": compile_text,
+    "O1": lambda text: compile_text(text, opt="O1"),
+    "O2": lambda text: compile_text(text, opt="O2"),
+}
+
+
+def run_qemu_counted(asm: str, timeout: float) -> Tuple[str, dict]:
+    return run_qemu(asm, timeout=timeout, qemu_opts="-icount shift=0"), {}
+
+
+def run_simulated(asm: str, timeout: float) -> Tuple[str, dict]:
+    res = simulate(asm)
+    if res.error is not None:
+        return res.output + res.error, {}
+    # counter snapshots of the two rdcycle calls around kernel() in HARNESS
+    (_, l0, s0, b0), (_, l1, s1, b1) = res.marks[1:3]
+    return res.output, {"loads": l1 - l0, "stores": s1 - s0, "branches": b1 - b0}
+
+
+# runner: assembly -> (program output, extra counters of kernel call)
+RUNNERS = {
+    "qemu": run_qemu_counted,
+    "sim": run_simulated,
+}
+
+
+def load_kernel(file: str):
+    with open(file) as f:
+        text = f.read()
+    expect = re.search(r"//\s*expect:\s*(-?\d+)", text)
+    return text, int(expect.group(1)) if expect else None
+
+
+def run_kernel(text: str, setting: str, runner: str, timeout: float) -> dict:
+    asm = SETTINGS[setting](text + HARNESS)
+    out, extra = RUNNERS[runner](asm, timeout)
+    match = re.search(r"(-?\d+) (\d+) (\d+)", out or "")
+    if match is None:
+        raise Exception(f"no counters in output: {out!r}")
+    result, instret, cycles = map(int, match.groups())
+    return {"runner": runner, "result": result, "instret": instret, "cycles": cycles, **extra}
+
+
+# counters compared with baseline; cycles depend on the runner
+TRACKED = ("instret", "loads", "stores")
+
+
+def delta(cur: int, old: int) -> str:
+    return f"{100 * (cur - old) / old:+.1f}%" if old else ""
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    problems = []
+    for name, settings in results.items():
+        for setting, cur in settings.items():
+            old = baseline.get(name, {}).get(setting, {})
+            if old and old.get("runner") != cur["runner"]:
+                problems.append(f"{name} {setting}: baseline measured with runner {old.get('runner')}")
+                continue
+            for counter in TRACKED:
+                if counter in cur and counter in old and cur[counter] > old[counter] * (1 + tolerance):
+                    problems.append(f"{name} {setting}: {counter} {cur[counter]}, baseline {old[counter]}")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-k", "--kernel", nargs="+", help="kernel names (default: all)")
+    ap.add_argument("-O", "--setting", nargs="+", default=list(SETTINGS), choices=list(SETTINGS))
+    ap.add_argument("--runner", default="sim", choices=list(RUNNERS))
+    ap.add_argument("--timeout", type=float, default=10)
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="programs run concurrently")
+    ap.add_argument("--tolerance", type=float, default=0, help="allowed relative growth of counters")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args()
+
+    files = sorted(glob.glob(path.join(KERNELS, "*.c")))
+    if args.kernel:
+        files = [i for i in files if path.splitext(path.basename(i))[0] in args.kernel]
+
+    baseline = {}
+    if path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    def run(case):
+        name, text, expect, setting = case
+        try:
+            return run_kernel(text, setting, args.runner, args.timeout)
+        except Exception as e:
+            return e
+
+    cases = []
+    for file in files:
+        text, expect = load_kernel(file)
+        cases.extend((path.splitext(path.basename(file))[0], text, expect, i) for i in args.setting)
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        outcomes = list(pool.map(run, cases))
+
+    results, failed = {}, False
+    print(f"{'kernel':<12}{'opt':<6}{'instret':>12}{'cycles':>12}{'vs baseline':>13}")
+    for (name, text, expect, setting), res in zip(cases, outcomes):
+        if isinstance(res, Exception):
+            print(f"{name:<12}{setting:<6}FAILED: {res}")
+            failed = True
+            continue
+        if expect is not None and res["result"] != expect:
+            print(f"{name:<12}{setting:<6}WRONG RESULT {res['result']}, expected {expect}")
+            failed = True
+            continue
+        results.setdefault(name, {})[setting] = res
+        old = baseline.get(name, {}).get(setting, {})
+        old = old.get("instret", 0) if old.get("runner") == args.runner else 0
+        extra = "".join(f"  {i} {res[i]}" for i in ("loads", "stores", "branches") if i in res)
+        print(f"{name:<12}{setting:<6}{res['instret']:>12}{res['cycles']:>12}{delta(res['instret'], old):>13}{extra}")
+
+    if args.update_baseline:
+        for name, settings in results.items():
+            baseline.setdefault(name, {}).update(settings)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+    elif problems := compare(results, baseline, args.tolerance):
+        print("\nREGRESSIONS:\n" + "\n".join(problems))
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Cold vs warm import time of compiler modules.
+
+cold: empty grammar cache, grammar is analysed and cache is written
+warm: grammar and LALR tables are loaded from cache written by previous run
+
+usage: python tests/bench/startup.py [-n RUNS]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from os import path
+
+SRC = path.join(path.dirname(path.realpath(__file__)), "..", "..", "src")
+MODULES = ["frontend.parser", "middlend.ast2ir", "backend.ir2asm"]
+
+CHILD = f"""
+import json, time
+res = {{}}
+for m in {MODULES!r}:
+    t = time.perf_counter()
+    __import__(m)
+    res[m] = time.perf_counter() - t
+print(json.dumps(res))
+"""
+
+
+def run_child(cache_dir: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=path.realpath(SRC), CC_CACHE_DIR=cache_dir)
+    t = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", CHILD], env=env, check=True, capture_output=True, text=True).stdout
+    res = json.loads(out)
+    res["process"] = time.perf_counter() - t
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", "--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as d:
+            cold.append(run_child(d))
+            warm.append(run_child(d))
+
+    print(f"{'':<18}{'cold, ms':>10}{'warm, ms':>10}")
+    for key in [*MODULES, "process"]:
+        c = min(i[key] for i in cold) * 1000
+        w = min(i[key] for i in warm) * 1000
+        print(f"{key:<18}{c:>10.1f}{w:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
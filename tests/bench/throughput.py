@@ -0,0 +1,165 @@
+"""
+Compile throughput of each pipeline stage over growing synthetic programs.
+Reports lines per second and peak memory per stage, scaling exponent of each stage
+(time ~ size^k, k noticeably above 1 means superlinear behaviour),
+and fails on regressions against stored baseline.
+
+usage: python tests/bench/throughput.py [--sizes 1 2 4 8] [--update-baseline] [--tolerance 0.3]
+"""
+import argparse
+import gc
+import json
+import math
+import sys
+from dataclasses import replace
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.realpath(__file__)), "..", "..", "src"))
+sys.path.insert(0, path.dirname(path.realpath(__file__)))
+
+from backend.ir2asm import do_asm
+from frontend.astdef import do_ast
+from frontend.parser import do_parse
+from gen import GenParams, generate_program
+from instrument import recording
+from middlend.ast2ir import do_ir
+
+BASELINE = path.join(path.dirname(path.realpath(__file__)), "throughput_baseline.json")
+
+# each sweep grows one dimension of the program by the size factor
+SWEEPS = {
+    "functions": lambda p, n: replace(p, functions=p.functions * n),
+    "statements": lambda p, n: replace(p, statements=p.statements * n),
+    "depth": lambda p, n: replace(p, depth=p.depth + n - 1),
+}
+BASE = GenParams(functions=8, statements=25, depth=3, nesting=2, globals=4)
+
+
+def compile_stages(text: str):
+    do_asm(do_ir(do_ast(do_parse(text))))
+
+
+def stage_stats(text: str, repeat: int) -> dict:
+    """ {stage: (best wall time, peak bytes)}, sub-passes are named 'stage/pass' """
+
+    def names(records):
+        parents, res = [], []
+        for i in records:
+            del parents[i.depth:]
+            parents.append(i.name)
+            res.append("/".join(parents))
+        return res
+
+    walls = {}
+    for _ in range(repeat):
+        gc.collect()
+        with recording(memory=False) as rec:
+            compile_stages(text)
+        run = {}
+        for name, i in zip(names(rec.records), rec.records):
+            run[name] = run.get(name, 0) + i.wall
+        for name, t in run.items():
+            walls[name] = min(walls.get(name, math.inf), t)
+
+    # memory tracing slows everything down, so it is a separate run
+    with recording(memory=True) as rec:
+        compile_stages(text)
+    peaks = {}
+    for name, i in zip(names(rec.records), rec.records):
+        peaks[name] = max(peaks.get(name, 0), i.peak)
+    return {name: (walls[name], peaks[name]) for name in walls}
+
+
+def run_sweeps(sizes, repeat: int) -> dict:
+    res = {}
+    for sweep, scale in SWEEPS.items():
+        res[sweep] = points = []
+        for n in sizes:
+            text = generate_program(scale(BASE, n))
+            lines = text.count("\n")
+            stats = stage_stats(text, repeat)
+            points.append({
+                "size": n,
+                "lines": lines,
+                "bytes": len(text),
+                "stages": {
+                    name: {"lines_per_s": lines / wall, "peak_kib": peak / 1024, "wall_s": wall}
+                    for name, (wall, peak) in stats.items()
+                },
+            })
+    return res
+
+
+def exponent(points, stage: str) -> float:
+    """ k of wall ~ size^k between the smallest and the largest program, size is in bytes """
+    a, b = points[0], points[-1]
+    ta, tb = a["stages"][stage]["wall_s"], b["stages"][stage]["wall_s"]
+    if ta <= 0 or tb <= 0 or a["bytes"] == b["bytes"]:
+        return 1.0
+    return math.log(tb / ta) / math.log(b["bytes"] / a["bytes"])
+
+
+def report(results: dict, max_exponent: float) -> list:
+    problems = []
+    for sweep, points in results.items():
+        print(f"\n== sweep: {sweep}")
+        header = f"{'stage':<32}" + "".join(f"{p['lines']:>10}" for p in points) + f"{'k':>7}{'peak KiB':>10}"
+        print(header + "\n" + f"{'':<32}" + "".join(f"{'lines/s':>10}" for _ in points))
+        for stage in points[0]["stages"]:
+            k = exponent(points, stage)
+            row = f"{stage:<32}" + "".join(f"{p['stages'][stage]['lines_per_s']:>10.0f}" for p in points)
+            mark = ""
+            # sub-passes are too short for a reliable estimate
+            if k > max_exponent and "/" not in stage:
+                mark = "  <- superlinear"
+                problems.append(f"{sweep}/{stage}: time grows as size^{k:.2f}")
+            print(f"{row}{k:>7.2f}{points[-1]['stages'][stage]['peak_kib']:>10.0f}{mark}")
+    return problems
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    problems = []
+    for sweep, points in results.items():
+        for point, base in zip(points, baseline.get(sweep, [])):
+            if point["size"] != base["size"]:
+                continue
+            for stage, cur in point["stages"].items():
+                if (old := base["stages"].get(stage)) is None or "/" in stage:
+                    continue
+                if cur["lines_per_s"] < old["lines_per_s"] * (1 - tolerance):
+                    problems.append(f"{sweep}={point['size']} {stage}: {cur['lines_per_s']:.0f} lines/s, "
+                                    f"baseline {old['lines_per_s']:.0f}")
+                if cur["peak_kib"] > old["peak_kib"] * (1 + tolerance) + 64:
+                    problems.append(f"{sweep}={point['size']} {stage}: peak {cur['peak_kib']:.0f} KiB, "
+                                    f"baseline {old['peak_kib']:.0f}")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("-r", "--repeat", type=int, default=3)
+    ap.add_argument("--tolerance", type=float, default=0.3, help="allowed relative regression")
+    ap.add_argument("--max-exponent", type=float, default=1.3)
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args()
+
+    results = run_sweeps(args.sizes, args.repeat)
+    problems = report(results, args.max_exponent)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"\nbaseline written to {args.baseline}")
+    elif path.exists(args.baseline):
+        with open(args.baseline) as f:
+            problems += compare(results, json.load(f), args.tolerance)
+
+    if problems:
+        print("\nREGRESSIONS:\n" + "\n".join(problems))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
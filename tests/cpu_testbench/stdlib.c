@@ -13,3 +13,25 @@ void putc(char c) {
 void puts(const char *str) {
     while (*str) putc(*str++);
 }
+
+// counters of zicsr, for runtime benchmarks
+int64_t rdinstret(void) {
+    int64_t x;
+    asm volatile ("csrr %0, instret" : "=r"(x));
+    return x;
+}
+
+int64_t rdcycle(void) {
+    int64_t x;
+    asm volatile ("csrr %0, cycle" : "=r"(x));
+    return x;
+}
+
+void putn(int64_t n) {
+    char buf[24];
+    int i = 0;
+    uint64_t u = n < 0 ? -(uint64_t)n : n;
+    do buf[i++] = '0' + u % 10; while (u /= 10);
+    if (n < 0) putc('-');
+    while (i) putc(buf[--i]);
+}
@@ -0,0 +1,78 @@
+# runtime of cpu_testbench/stdlib.c for the in-process assembler (backend.asm),
+# used when programs are built without the GNU toolchain
+
+.section .text
+
+.global putc
+.global puts
+.global rdinstret
+.global rdcycle
+.global putn
+
+# void putc(char c): wait for space in UART TX FIFO, then write
+putc:
+li t0, 0x10010000
+.Lputc.wait:
+lw t1, 0(t0)
+bltz t1, .Lputc.wait
+sw a0, 0(t0)
+ret
+
+# void puts(const char *str)
+puts:
+addi sp, sp, -16
+sd ra, 0(sp)
+sd s1, 8(sp)
+mv s1, a0
+.Lputs.loop:
+lbu a0, 0(s1)
+beqz a0, .Lputs.end
+call putc
+addi s1, s1, 1
+j .Lputs.loop
+.Lputs.end:
+ld ra, 0(sp)
+ld s1, 8(sp)
+addi sp, sp, 16
+ret
+
+rdinstret:
+csrr a0, instret
+ret
+
+rdcycle:
+csrr a0, cycle
+ret
+
+# void putn(int64_t n): decimal, digits are collected in reverse on stack
+putn:
+addi sp, sp, -48
+sd ra, 24(sp)
+sd s1, 32(sp)
+sd s2, 40(sp)
+mv s1, a0
+li s2, 0
+bgez s1, .Lputn.digits
+li a0, 45
+call putc
+neg s1, s1
+.Lputn.digits:
+li t0, 10
+remu t1, s1, t0
+divu s1, s1, t0
+addi t1, t1, 48
+add t2, sp, s2
+sb t1, 0(t2)
+addi s2, s2, 1
+bnez s1, .Lputn.digits
+.Lputn.print:
+addi s2, s2, -1
+add t2, sp, s2
+lbu a0, 0(t2)
+call putc
+bnez s2, .Lputn.print
+ld ra, 24(sp)
+ld s1, 32(sp)
+ld s2, 40(sp)
+addi sp, sp, 48
+ret
@@ -1,22 +1,116 @@
+import fcntl
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from os import path
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List
 
+from backend.asm.assembler import Object, assemble, link
+from backend.asm.elf import write_elf
+from backend.asm.sim import SimResult, run_asm
 from utils import run_command, dirpath
 
+TB_PATH = path.join(dirpath(__file__), "cpu_testbench")
+CROSS = os.environ.get("CROSS", "riscv64-unknown-elf-")
+ARCH_OPTS = "-march=rv64imzicsr -mabi=lp64"
+# 'internal': backend.asm with runtime from stdlib.s, 'gnu': CROSS toolchain with stdlib.c
+ASSEMBLER = os.environ.get("CC_ASSEMBLER", "internal")
+# 'sim': in-process simulator (backend.asm.sim), 'qemu': qemu-system-riscv64
+RUNNER = os.environ.get("CC_RUNNER", "sim")
 
-def run_qemu(asm_text: str) -> Optional[str]:
-    base_path = dirpath(__file__)
-    tb_path = path.join(base_path, "cpu_testbench")
 
-    with open(path.join(tb_path, "kernel.s"), "w") as f:
+@cache
+def prebuilt_stdlib() -> str:
+    """
+    build cpu_testbench/build/stdlib.o once per process;
+    the lock serializes concurrent test processes building it
+    """
+    os.makedirs(path.join(TB_PATH, "build"), exist_ok=True)
+    with open(path.join(TB_PATH, "build", ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        status, stdout, stderr = run_command("make -s build/stdlib.o", timeout=60, cwd=TB_PATH)
+    if not status:
+        raise Exception(f"failed to build stdlib.o: {stdout}{stderr}")
+    return path.join(TB_PATH, "build", "stdlib.o")
+
+
+@cache
+def runtime_object() -> Object:
+    with open(path.join(TB_PATH, "stdlib.s")) as f:
+        return assemble(f.read())
+
+
+def build_kernel_internal(asm_text: str, build_dir: str) -> Tuple[Optional[str], str]:
+    kernel = path.join(build_dir, "kernel")
+    try:
+        write_elf(link([assemble(asm_text), runtime_object()]), kernel)
+    except Exception as e:
+        return None, str(e)
+    return kernel, ""
+
+
+def build_kernel(asm_text: str, build_dir: str) -> Tuple[Optional[str], str]:
+    """ assemble and link in build_dir, same as 'make build/kernel'. returns path to kernel or error text """
+    if ASSEMBLER == "internal":
+        return build_kernel_internal(asm_text, build_dir)
+    with open(path.join(build_dir, "kernel.s"), "w") as f:
         f.write(asm_text)
+    stdlib = prebuilt_stdlib()
+    kernel = path.join(build_dir, "kernel")
+    for cmd in (
+            f"{CROSS}as {ARCH_OPTS} -o {build_dir}/kernel.o {build_dir}/kernel.s",
+            f"{CROSS}ld -w -T{TB_PATH}/kernel.ld -o {kernel} {build_dir}/kernel.o {stdlib}",
+    ):
+        status, stdout, stderr = run_command(cmd, timeout=30)
+        if not status:
+            return None, stdout + stderr
+    return kernel, ""
+
+
+def run_qemu(asm_text: str, timeout: float = 1, qemu_opts: str = "") -> Optional[str]:
+    """ build and run program in its own scratch directory, safe to call concurrently """
+    with tempfile.TemporaryDirectory(prefix="qemu-") as build_dir:
+        try:
+            kernel, error = build_kernel(asm_text, build_dir)
+        except Exception as e:
+            kernel, error = None, str(e)
+        if kernel is None:
+            print("-" * 5 + " build " + "-" * 5)
+            print(error)
+            return error.strip()
 
-    status, stdout, stderr = run_command(
-        "make -s qemu",
-        timeout=1, cwd=tb_path
-    )
+        status, stdout, stderr = run_command(
+            f"qemu-system-riscv64 -smp 2 -machine sifive_u -nographic -bios none {qemu_opts} -kernel {kernel}",
+            timeout=timeout
+        )
     stderr = stderr.strip()
     if len(stderr) > 0:
         print("-" * 5 + " stderr " + "-" * 5)
         print(stderr)
     return stdout + stderr
+
+
+def simulate(asm_text: str) -> SimResult:
+    """ run program with the runtime on the in-process simulator, with exact counters """
+    return run_asm(asm_text, [runtime_object()])
+
+
+def run_sim(asm_text: str) -> str:
+    res = simulate(asm_text)
+    if res.error is not None:
+        print("-" * 5 + " sim " + "-" * 5)
+        print(res.error)
+        return res.output + res.error
+    return res.output
+
+
+def run_program(asm_text: str) -> Optional[str]:
+    """ output of program on the configured runner """
+    return run_sim(asm_text) if RUNNER == "sim" else run_qemu(asm_text)
+
+
+def run_qemu_many(asm_texts: List[str], jobs: int = os.cpu_count(), **options) -> List[Optional[str]]:
+    """ run programs on a bounded pool of concurrent QEMU instances, outputs are in order of programs """
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(lambda i: run_qemu(i, **options), asm_texts))
@@ -3,11 +3,12 @@ import pprint
 import pytest
 from pytest_golden.plugin import GoldenTestFixture
 
-from frontend.parser import do_parse
+from frontend import grammar_tables
+from frontend.parser import do_parse, grammar_hash
 from backend.ir2asm import do_asm
-from frontend.astdef import do_ast
+from frontend.astdef import do_ast, do_parse_ast
 from middlend.ast2ir import do_ir
-from tests.qemu import run_qemu
+from tests.qemu import run_program
 
 
 @pytest.mark.golden_test("golden/*.yml")
@@ -23,6 +24,7 @@ def test_golden(golden: GoldenTestFixture):
 
     if 'ast' in test_level:
         ast = do_ast(tree)
+        assert do_parse_ast(text) == ast, "Single-pass AST mismatch"
         if 'asm' not in test_level:
             assert pprint.pformat(ast, width=30) == golden.out['ast_tree'], "AST mismatch"
     else:
@@ -38,5 +40,10 @@ def test_golden(golden: GoldenTestFixture):
         asm = do_asm(ir)
         assert str(asm) == golden.out['asm'], "ASM mismatch"
 
-        stdout = run_qemu(asm)
+        stdout = run_program(asm)
         assert stdout.strip() == golden.out['qemu_output'], "QEMU run mismatch"
+
+
+def test_grammar_tables_match_grammar():
+    """ tables built from an older grammar are not loaded, and parser is built at every startup """
+    assert grammar_tables.GRAMMAR_HASH == grammar_hash(), "regenerate tables: python -m frontend.parser"
@@ -0,0 +1,113 @@
+import struct
+
+import yaml
+
+from backend.asm.assembler import assemble, link, TEXT_BASE
+from backend.asm.elf import elf_bytes
+from backend.asm.sim import run_asm, run_elf
+from tests.qemu import runtime_object, simulate
+
+
+def words(text: str) -> list:
+    data = assemble(text).sections[".text"].data
+    return [f"{i:08x}" for i in struct.unpack(f"<{len(data) // 4}I", data)]
+
+
+def test_encoding_matches_reference_assembler():
+    # reference words from llvm-mc -triple=riscv64 -mattr=+m
+    assert words("""
+        li a1, 0x10010000
+        li a3, 0x123456789abcdef0
+        sd s1, -8(sp)
+        ld s11, 2040(sp)
+        srai a0, a0, 3
+        csrr t0, mhartid
+        seqz a0, a1
+        snez a0, a1
+        not a0, a1
+        neg a0, a1
+        rem a0, a1, a2
+        sb t1, 0(t2)
+        ret
+    """) == [
+        "100105b7",
+        "002476b7", "8ad6869b", "00e69693", "c4d68693", "00c69693", "5e768693", "00d69693", "ef068693",
+        "fe913c23", "7f813d83", "40355513", "f14022f3", "0015b513", "00b03533", "fff5c513", "40b00533",
+        "02c5e533", "00638023", "00008067",
+    ]
+
+
+def test_references_are_resolved_at_link():
+    image = link([assemble("""
+        .global _start
+        _start:
+        la a0, msg
+        call puts
+        bnez a0, _start
+        .section .data
+        msg:
+        .string "hi"
+        ptr:
+        .dword msg
+    """), runtime_object()])
+    text = image.sections[0][2]
+    auipc, addi, call_hi, call_lo, bnez = struct.unpack("<5I", text[:20])
+    msg = image.symbols["msg"]
+    assert TEXT_BASE + (auipc >> 12 << 12) + (addi >> 20) == msg
+    assert (bnez >> 31) & 1  # backward branch
+    data = image.sections[1][2]
+    assert data[:3] == b"hi\0" and int.from_bytes(data[3:11], "little") == msg
+
+
+def test_golden_program_links_into_elf():
+    golden = yaml.safe_load(open("tests/golden/3_asm.yml"))
+    image = link([assemble(golden["asm"]), runtime_object()])
+    elf = elf_bytes(image)
+    assert elf[:4] == b"\x7fELF" and struct.unpack_from("<HHIQ", elf, 16)[3] == image.symbols["_start"] == TEXT_BASE
+    assert image.section_of(image.symbols["stack_top"]) == ".bss"
+
+
+def test_simulator_semantics_and_counters():
+    # each result is printed by putn, expected values as on hardware (RISC-V spec for division corner cases)
+    checks = [
+        ("li a0, -7\nli a1, 2\ndiv a0, a0, a1", -3),
+        ("li a0, -7\nli a1, 2\nrem a0, a0, a1", -1),
+        ("li a0, 5\ndiv a0, a0, zero", -1),
+        ("li a0, 5\nremu a0, a0, zero", 5),
+        ("li a0, -1\nli a1, -1\nmulhu a0, a0, a1", -2),
+        ("li a0, 0x7fffffff\naddiw a0, a0, 1", -(1 << 31)),
+        ("li a0, -16\nsrai a0, a0, 2", -4),
+        ("li a0, -16\nsrli a0, a0, 60", 15),
+        ("li a0, -1\nli a1, 1\nslt a0, a0, a1", 1),
+        ("li a0, -1\nli a1, 1\nsltu a0, a0, a1", 0),
+        ("la t0, cell\nli a0, -2\nsw a0, 0(t0)\nlwu a0, 0(t0)", 0xfffffffe),
+        ("la t0, cell\nli a0, 0x80\nsb a0, 0(t0)\nlb a0, 0(t0)", -128),
+    ]
+    body = "\n".join(f"{code}\ncall putn\nli a0, 32\ncall putc" for code, _ in checks)
+    res = simulate(f".section .data\ncell:\n.dword 0\n.section .text\n.global _start\n_start:\n"
+                   f"la sp, stack\n{body}\nhalt:\nj halt\n.section .bss\n.space 256\nstack:\n")
+    assert res.error is None
+    assert [int(i) for i in res.output.split()] == [v for _, v in checks]
+
+    res = run_asm(".global _start\n_start:\nli a0, 5\nloop:\naddi a0, a0, -1\nbnez a0, loop\nret\n")
+    assert (res.instret, res.branches, res.error) == (12, 4, None)
+    res = run_asm(".global _start\n_start:\nloop:\naddi a0, a0, 1\nj loop\n", limit=1000)
+    assert res.error == "instruction limit 1000 exceeded"
+    res = run_asm(".global _start\n_start:\nli a0, 64\nld a0, 0(a0)\n")
+    assert res.error == "load from unmapped address 0x40"
+
+
+def test_golden_program_runs_on_simulator_from_elf():
+    golden = yaml.safe_load(open("tests/golden/3_asm.yml"))
+    image = link([assemble(golden["asm"]), runtime_object()])
+    res = run_elf(elf_bytes(image))
+    assert res.error is None and res.output.strip() == golden["qemu_output"]
+    assert 0 < res.loads + res.stores + res.branches < res.instret
+
+
+def test_out_of_reach_branches_are_relaxed():
+    res = simulate(".global _start\n_start:\nla sp, stack\nli a0, 1\nbnez a0, far\n.space 8192\nfar:\n"
+                   "li a0, 7\ncall putn\nhalt:\nj halt\n.section .bss\n.space 256\nstack:\n")
+    assert (res.output, res.error) == ("7", None)
+    words = assemble("start:\nbnez a0, far\n.space 8192\nfar:\n").sections[".text"].data[:8]
+    assert struct.unpack("<I", words[:4])[0] == 0x00050463  # beqz a0, +8 over 'j far'
@@ -0,0 +1,37 @@
+import yaml
+
+from driver.pipeline import compile_text
+from frontend.astdef import do_parse_ast
+from middlend.ast2ir import do_ir
+from middlend.interp import interpret
+from tests.bench.gen import GenParams, generate_program
+from tests.qemu import simulate
+
+
+def run_ir(text: str, **options):
+    return interpret(do_ir(do_parse_ast(text)), **options)
+
+
+def test_interpreter_runs_golden_program():
+    golden = yaml.safe_load(open("tests/golden/3_asm.yml"))
+    res = run_ir(golden["text"])
+    assert res.error is None and res.output.strip() == golden["qemu_output"]
+    assert res.calls["fibonacci"] > 1 and res.counts["fibonacci"] > res.counts["main"]
+    assert sum(res.counts.values()) == res.steps
+
+
+def test_interpreter_agrees_with_generated_code():
+    for seed in range(5):
+        text = generate_program(GenParams(functions=3, statements=10, seed=seed))
+        ir, asm = run_ir(text), simulate(compile_text(text))
+        assert (ir.error, asm.error) == (None, None)
+        assert ir.output == asm.output, f"seed {seed}"
+
+
+def test_interpreter_reports_errors():
+    res = run_ir("void f(); void main() { putc(1); f(); }\nvoid putc(char c);")
+    assert res.error == "call of undefined function 'f'" and res.output == "\x01"
+    res = run_ir("void main() { int i = 0; while (1) { i = i + 1; } }", limit=1000)
+    assert res.error == "statement limit 1000 exceeded" and res.counts["main"] == 1000
+    res = run_ir("int main() { int x; return x + 1; }")
+    assert res.error == "read of undefined variable 'x'"
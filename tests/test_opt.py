@@ -0,0 +1,199 @@
+from backend.hw.rv64 import RV64Reg
+from backend.ir.hir import HMemVar, HRegVar, HStackRegCopy, HStackVar
+from backend.ir.ir import HIRMove, IRBOp, IRStBinOp, IRStCall, IRStCJump, IRStStoreValue
+from driver.cache import function_key
+from driver.pipeline import compile_text
+from frontend.astdef import do_parse_ast
+from middlend.ast2ir import do_ir
+from middlend.interp import interpret
+from middlend.opt import RV64IR2HIRTransformer, statement_substitute_vars
+from middlend.passes import ALL, CFG, AnalysisManager, DefUse, Liveness, Loops, Pass, PassManager
+from tests.bench.gen import GenParams, generate_program
+from tests.qemu import simulate
+
+LOOP = """
+int sum(int n) {
+  int s = 0;
+  while (n > 0) {
+    s = s + n;
+    n--;
+  }
+  return s;
+}
+"""
+
+# more live variables than s1..s11, most of them short-lived temporaries
+MANY = """
+void putn(int n);
+int main() {
+  int a = 1; int b = 2; int c = 3; int d = 4; int e = 5; int f = 6; int g = 7;
+  int i = 0; int s = 0;
+  while (i < 100) {
+    s = s + a * b + c * d + e * f + g * i;
+    a = b; b = c; c = d; d = e; e = f; f = g; g = s % 7;
+    i = i + 1;
+  }
+  putn(s);
+  return 0;
+}
+"""
+
+
+def lowered(text: str, name: str):
+    return next(i for i in do_ir(do_parse_ast(text)).functions if i.name == name)
+
+
+def test_def_use_tuples_follow_substitution():
+    st = IRStBinOp(IRBOp.ADD, "a", "b", "b")
+    assert st.v_inputs is st.v_inputs and st.v_inputs == ("b", "b")
+    statement_substitute_vars(st, {"b": "x"}, {"a": "y"})
+    assert (st.v_inputs, st.v_outputs) == (("x", "x"), ("y",))
+    call = statement_substitute_vars(IRStCall("f", ["a", "b"]), {"a": "x"}, {})
+    assert (call.v_inputs, call.v_outputs) == (("x", "b"), ())
+
+
+def test_analyses_are_cached_until_invalidated():
+    fun = lowered(LOOP, "sum")
+    am = AnalysisManager(fun)
+    live = am.get(Liveness)
+    assert am.get(CFG) is live.cfg and am.get(Liveness) is live and am.computed == 2
+    loop = [b for b, d in enumerate(am.get(Loops).depth) if d == 1]
+    assert loop and all("n" in live.live_in[b] and "s" in live.live_in[b] for b in loop)
+    assert live.live_out[-1] == set()
+
+    runs = []
+    passes = PassManager([
+        Pass("look", lambda f, am: runs.append(am.get(DefUse)) or f, (), ALL),
+        Pass("again", lambda f, am: runs.append(am.get(DefUse)) or f),
+        Pass("after change", lambda f, am: runs.append(am.get(DefUse)) or f),
+    ])
+    passes.run(fun)
+    assert runs[0] is runs[1] and runs[1] is not runs[2]
+
+
+def test_linear_scan_shares_registers():
+    hir = RV64IR2HIRTransformer(RV64Reg, "O1")
+    hir.ctx = do_ir(do_parse_ast(MANY))
+    fun = hir.process_function(next(i for i in hir.ctx.functions if i.name == "main"))
+    names = {i for st in fun.body for i in (*st.v_inputs, *st.v_outputs)}
+    slots = [fun.layout.mem_slots[i] for i in names]
+    regs = [i.reg for i in slots if isinstance(i, HRegVar)]
+    assert len(regs) > len(set(regs)) and not any(isinstance(i, HStackVar) for i in slots)
+
+
+def test_coloring_coalesces_copies():
+    text = "int f(int n) { int s = 0; int i = 0; while (i < n) { int t = s + i; s = t; i = i + 1; } return s; }"
+    assert "mv" in compile_text(text).split() and "mv" not in compile_text(text, opt="O2").split()
+
+
+def test_spilled_values_stay_in_scratch_registers_within_block():
+    def loads(opt: str, text: str):
+        hir = RV64IR2HIRTransformer(RV64Reg, opt)(do_ir(do_parse_ast(text)))
+        body = next(i for i in hir.functions if i.name == "f").body
+        return sum(isinstance(i, HIRMove) and isinstance(i.src, HStackVar | HMemVar) for i in body)
+
+    # global read three times in one block is loaded once
+    text = "int g; int f() { int x = g * g + g; return x; }"
+    assert loads("O0", text) == 3 and loads("O1", text) == loads("O2", text) == 1
+    # after a call scratch registers are clobbered
+    text = "int g; int h(); int f() { int a = g + 1; h(); return a + g; }"
+    assert loads("O1", text) == 2
+
+
+def test_values_live_across_calls_get_callee_saved_registers():
+    text = "int h(int x); int f(int n) { int a = n + 1; int b = h(a); int c = b * 2; return h(c) + b; }"
+    for opt in ("O1", "O2"):
+        hir = RV64IR2HIRTransformer(RV64Reg, opt)(do_ir(do_parse_ast(text)))
+        fun = next(i for i in hir.functions if i.name == "f")
+        slots = fun.layout.mem_slots
+        assert slots["b"].reg in RV64Reg.locals() and slots["a"].reg in RV64Reg.temporaries(), opt
+        saved = [i.reg for i in fun.layout.stack if isinstance(i, HStackRegCopy)]
+        assert saved == [RV64Reg.RA, slots["b"].reg], opt
+
+
+def test_leaf_functions_get_minimal_frames():
+    text = "int sq(int x) { return x * x; } int f() { int a = 3; return a * a; } int main() { return sq(f()); }"
+    asm = compile_text(text, opt="O1")
+    f = asm[asm.index("\nf:"):asm.index("\nmain:")]
+    assert "sp" not in f and "ra" not in f.replace("jr ra", "")
+    hir = RV64IR2HIRTransformer(RV64Reg, "O1")(do_ir(do_parse_ast(text)))
+    sizes = {i.name: i.layout.frame_size for i in hir.functions}
+    assert sizes == {"sq": 0, "f": 0, "main": 16}
+
+
+def test_params_stay_in_argument_registers():
+    text = "int h(int x); int f(int a, int b) { return a * b; } int g(int a, int b) { int c = h(b); return a + c; }"
+    hir = RV64IR2HIRTransformer(RV64Reg, "O2")(do_ir(do_parse_ast(text)))
+    f, g = (next(i for i in hir.functions if i.name == name) for name in "fg")
+    assert [f.layout.mem_slots[i].reg for i in "ab"] == [RV64Reg.A0, RV64Reg.A1]
+    # 'a' is live across call
+    assert g.layout.mem_slots["a"].reg in RV64Reg.locals()
+
+
+def test_call_arguments_are_computed_in_argument_registers():
+    text = "int h(int x, int y); int f(int n) { int a = n * 3; int b = a + 1; return h(b, a); }"
+    for opt in ("O1", "O2"):
+        hir = RV64IR2HIRTransformer(RV64Reg, opt)(do_ir(do_parse_ast(text)))
+        slots = next(i for i in hir.functions if i.name == "f").layout.mem_slots
+        assert [slots[i].reg for i in "ba"] == [RV64Reg.A0, RV64Reg.A1], opt
+        # nothing to shuffle before call
+        asm = compile_text(text, opt=opt)
+        assert "t1" not in asm[asm.index("\nf:"):asm.index("call h")], opt
+
+
+def test_arguments_beyond_registers_are_passed_on_stack():
+    params = ", ".join(f"int p{i}" for i in range(11))
+    text = (f"void putn(int n); int f({params}) {{ return p0 + p8 * 10 + p9 * 100 + p10 * 1000; }}"
+            "int g(int x) { return f(1, 2, 3, 4, 5, 6, 7, 8, x, x + 1, x + 2); }"
+            "int main() { putn(g(5)); putn(f(0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1)); return 0; }")
+    for opt in ("O0", "O1", "O2"):
+        assert simulate(compile_text(text, opt=opt)).output == "76511110", opt
+
+
+def test_parameters_are_forwarded_to_calls():
+    params = ", ".join(f"int p{i}" for i in range(10))
+    args = ", ".join(f"p{i}" for i in range(10))
+    text = (f"void putn(int n); int f({params}) {{ return p0 + p1 * 2 + p5 * 10 + p8 * 100 + p9 * 1000; }}"
+            f"int h({params}) {{ return f({args}); }}"
+            "int main() { putn(h(1, 2, 3, 4, 5, 6, 7, 8, 9, 10)); return 0; }")
+    for opt in ("O0", "O1", "O2"):
+        assert simulate(compile_text(text, opt=opt)).output == "10965", opt
+
+
+def test_call_arguments_are_moved_in_parallel():
+    text = ("void putn(int n); int g(int x, int y, int z) { return x * 100 + y * 10 + z; }"
+            "int main() { int a = 1; int b = 2; int c = 3; putn(g(c, a, b)); putn(g(b, c, a)); return 0; }")
+    for opt in ("O0", "O1", "O2"):
+        assert simulate(compile_text(text, opt=opt)).output == "312231", opt
+
+
+def test_optimized_code_agrees_with_interpreter():
+    texts = [MANY] + [generate_program(GenParams(functions=3, statements=20, seed=i)) for i in range(5)]
+    for text in texts:
+        expected = interpret(do_ir(do_parse_ast(text))).output
+        o0 = simulate(compile_text(text))
+        for opt in ("O1", "O2"):
+            res = simulate(compile_text(text, opt=opt))
+            assert (o0.error, res.error) == (None, None)
+            assert res.output == o0.output == expected, opt
+            assert res.loads + res.stores < o0.loads + o0.stores
+
+
+def test_constants_are_folded_across_blocks():
+    text = ("void putn(int n); int f(int n) { int k = 2 * 3 + 1; int s = 0; int i = 0;"
+            "while (i < n) { s = s + k * 10; i = i + 1; } if (k > 5) { return s; } return 0 - 1; }"
+            "int main() { putn(f(3)); putn(0 - 9223372036854775807 - 1 - 1); return 0; }")
+    hir = RV64IR2HIRTransformer(RV64Reg, "O1")(do_ir(do_parse_ast(text)))
+    body = next(i for i in hir.functions if i.name == "f").body
+    # k * 10 inside loop is known, as k is not changed there; 'if' is gone, 'while' check is not
+    assert [i.operation for i in body if isinstance(i, IRStBinOp)] == ["clt", "add", "add"]
+    assert sum(isinstance(i, IRStCJump) for i in body) == 1
+    assert 70 in [i.value.value for i in body if isinstance(i, IRStStoreValue)]
+    for opt in ("O1", "O2"):
+        assert simulate(compile_text(text, opt=opt)).output == "2109223372036854775807", opt
+
+
+def test_cache_key_depends_on_optimization_level():
+    prog = do_parse_ast(LOOP)
+    decl = prog.functions["sum"]
+    assert function_key(decl, prog) == function_key(decl, prog, "O0") != function_key(decl, prog, "O1")
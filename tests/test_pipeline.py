@@ -0,0 +1,194 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.ir2asm import do_asm
+from driver.batch import run_batch
+from driver.cache import FunctionCache
+from driver.client import CompilerClient, compile_text as client_compile
+from driver.daemon import CompilerServer
+from driver.pipeline import do_compile
+from frontend.astdef import do_parse_ast
+from instrument import recording
+from tests.bench.gen import GenParams, generate_program
+from middlend.ast2ir import do_ir
+
+FUN = """
+int sum(int n) {
+  int s = 0;
+  while (n > 0) {
+    s = s + n;
+    n--;
+  }
+  puts("sum");
+  return s;
+}
+"""
+
+
+def compile_text(text: str) -> str:
+    return do_asm(do_ir(do_parse_ast(text)))
+
+
+def fun_asm(asm: str, name: str) -> str:
+    lines = asm.splitlines()
+    start = lines.index(f"{name}:")
+    end = next(i for i in range(start + 1, len(lines)) if lines[i] == "jr ra")
+    return '\n'.join(lines[start:end + 1])
+
+
+def test_generated_names_do_not_depend_on_other_functions():
+    alone = compile_text("void puts(string s);" + FUN)
+    other = compile_text("""
+        void puts(string s);
+        int other(int a) {
+          if (a < 2) { puts("x"); return a; }
+          return other(a - 1) * 2;
+        }
+    """ + FUN)
+    assert fun_asm(alone, "sum") == fun_asm(other, "sum")
+
+
+def test_function_cache_reuses_unchanged_functions(tmp_path):
+    text = "void puts(string s);" + FUN + "void main() { sum(10); }"
+    cache = FunctionCache(path=str(tmp_path))
+    assert do_compile(do_parse_ast(text), cache) == compile_text(text)
+    assert (cache.stats.hits, cache.stats.misses) == (0, 3)
+
+    # other process, body of 'main' changed
+    cache = FunctionCache(path=str(tmp_path))
+    changed = text.replace("sum(10)", "sum(20)")
+    assert do_compile(do_parse_ast(changed), cache) == compile_text(changed)
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+
+def test_function_cache_evicts_least_recently_used():
+    text = "void puts(string s);" + FUN + "void main() { sum(10); }"
+    cache = FunctionCache(max_bytes=1)
+    do_compile(do_parse_ast(text), cache)
+    assert cache.stats.entries == 1
+    assert cache.stats.evictions == 2
+
+
+def test_function_cache_is_shared_between_processes(tmp_path):
+    text = "void puts(string s);" + FUN + "void main() { sum(10); }"
+    first = FunctionCache(path=str(tmp_path))
+    do_compile(do_parse_ast(text), first)
+    # files are read on request, not on start
+    second = FunctionCache(max_bytes=1, path=str(tmp_path))
+    assert second.stats.entries == 0
+    do_compile(do_parse_ast(text), second)
+    assert (second.stats.hits, second.stats.misses) == (3, 0)
+
+    # 'second' removes files 'first' still holds in memory
+    changed = text.replace("sum(10)", "sum(20)")
+    do_compile(do_parse_ast(changed), second)
+    assert len(list(tmp_path.iterdir())) == 1
+    assert do_compile(do_parse_ast(text), first) == compile_text(text)
+    assert (first.stats.hits, first.stats.misses) == (3, 3)
+
+
+def test_parallel_compilation_is_deterministic():
+    text = "void puts(string s);" + FUN + "".join(
+        f'int f{i}(int a) {{ puts("f{i}"); return sum(a) + {i}; }}' for i in range(6)
+    ) + "void main() { f5(10); }"
+    assert do_compile(do_parse_ast(text), jobs=3) == compile_text(text)
+
+
+def test_batch_writes_outputs_and_reports_errors(tmp_path):
+    good = tmp_path / "good.c"
+    good.write_text("void puts(string s);" + FUN)
+    bad = tmp_path / "bad.c"
+    bad.write_text("int main( {")
+    summary = run_batch([str(good), str(bad)], str(tmp_path / "out"))
+    assert [i.ok for i in summary.files] == [True, False]
+    assert (tmp_path / "out" / "good.s").read_text() == compile_text(good.read_text())
+    assert summary.to_json()["failed"] == 1
+
+    # layout of sources is kept
+    for name in ("a/x.c", "b/x.c", "b/x.h"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(f"int {name[0]}() {{ return 1; }}")
+    summary = run_batch([str(tmp_path / i) for i in ("a/x.c", "b/x.c", "b/x.h")], str(tmp_path / "out"), jobs=2)
+    assert [i.ok for i in summary.files] == [True, True, False]
+    assert "already written for" in summary.files[2].error
+    assert "b:" in (tmp_path / "out" / "b" / "x.s").read_text()
+
+    # sources are never overwritten
+    asm = tmp_path / "a" / "x.s"
+    asm.write_text("int main() { return 0; }")
+    summary = run_batch([str(asm)])
+    assert not summary.files[0].ok and "would overwrite an input" in summary.files[0].error
+    assert asm.read_text() == "int main() { return 0; }"
+
+
+def test_daemon_serves_concurrent_clients(tmp_path):
+    sock = str(tmp_path / "cc.sock")
+    server = CompilerServer(sock)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        text = "void puts(string s);" + FUN
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda t: client_compile(t, sock), [text] * 4))
+        assert results == [compile_text(text)] * 4
+
+        with CompilerClient(sock) as client:
+            assert not client.request(op="compile", source="int main( {")["ok"]
+            assert client.request(op="stats")["served"] == 5
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_daemon_does_not_take_over_live_socket(tmp_path):
+    sock = str(tmp_path / "cc.sock")
+    server = CompilerServer(sock)
+    try:
+        with pytest.raises(Exception, match="already listens"):
+            CompilerServer(sock)
+    finally:
+        # closed without removing the path, as by a killed daemon
+        server.socket.close()
+        server.executor.shutdown()
+    CompilerServer(sock).server_close()
+
+
+def test_daemon_collects_cache_stats_of_workers(tmp_path):
+    sock = str(tmp_path / "cc.sock")
+    server = CompilerServer(sock, jobs=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        text = "void puts(string s);" + FUN
+        with CompilerClient(sock) as client:
+            for _ in range(3):
+                assert client.request(op="compile", source=text)["ok"]
+            stats = client.request(op="stats")
+        # one of workers compiled the text at least twice
+        assert 1 <= stats["workers"] <= 2 and not stats["cache"].startswith("function cache: 0 hits")
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_recording_reports_each_pass():
+    with recording() as rec:
+        compile_text("void puts(string s);" + FUN)
+    names = [i.name for i in rec.records]
+    assert names[:3] == ["parse+ast", "ast2ir", "ir2hir"]
+    assert names.count("fun_allocate_vars") == 2 and names[-1] == "emit"
+    moves = next(i for i in rec.records if i.name == "fun_add_var_moves" and i.fun == "sum")
+    assert moves.depth == 1 and moves.ir_after >= moves.ir_before > 0
+    assert all(i.peak >= 0 for i in rec.records)
+    assert len(rec.chrome_trace()["traceEvents"]) == len(rec.records)
+    assert "fun_prepare_stack" in rec.table()
+
+
+def test_generated_programs_compile():
+    for seed in range(3):
+        text = generate_program(GenParams(functions=3, statements=15, depth=4, nesting=3, seed=seed))
+        assert do_compile(do_parse_ast(text)) == compile_text(text)